@@ -0,0 +1,109 @@
+"""add embedding model to info blob chunks and vector indexes
+Revision ID: 8075416213ca
+Revises: 16ed8ac3ef47
+Create Date: 2026-10-18 10:12:31.418202
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from intric.database.vector_index import (
+    MAX_INDEXABLE_DIMENSIONS,
+    create_vector_index_statement,
+)
+from intric.main.config import get_settings
+
+# revision identifiers, used by Alembic
+revision = "8075416213ca"
+down_revision = "16ed8ac3ef47"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    op.add_column(
+        "info_blob_chunks", sa.Column("embedding_model_id", sa.UUID(), nullable=True)
+    )
+    op.create_foreign_key(
+        "info_blob_chunks_embedding_model_id_fkey",
+        "info_blob_chunks",
+        "embedding_models",
+        ["embedding_model_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+    # Every batch, and every index, is committed on its own. The indexes
+    # are built concurrently, so the chunks can be written meanwhile
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+
+        # Backfill from the info blobs
+        last_id = "00000000-0000-0000-0000-000000000000"
+        while last_id is not None:
+            last_id = conn.execute(
+                sa.text(
+                    """
+                    WITH batch AS (
+                        SELECT id FROM info_blob_chunks
+                        WHERE id > CAST(:last_id AS uuid)
+                        ORDER BY id
+                        LIMIT :batch_size
+                    ), updated AS (
+                        UPDATE info_blob_chunks
+                        SET embedding_model_id = info_blobs.embedding_model_id
+                        FROM info_blobs
+                        WHERE info_blob_chunks.info_blob_id = info_blobs.id
+                        AND info_blob_chunks.id IN (SELECT id FROM batch)
+                    )
+                    SELECT id FROM batch ORDER BY id DESC LIMIT 1
+                    """
+                ),
+                dict(last_id=last_id, batch_size=BACKFILL_BATCH_SIZE),
+            ).scalar()
+
+        # One partial index per embedding model, with the dimension of its
+        # embeddings. Models without embeddings get theirs from the worker
+        models = conn.execute(
+            sa.text("SELECT id, dimensions FROM embedding_models")
+        ).all()
+
+        for embedding_model_id, dimensions in models:
+            dimensions = (
+                dimensions
+                or conn.execute(
+                    sa.text(
+                        """
+                    SELECT vector_dims(embedding) FROM info_blob_chunks
+                    WHERE embedding_model_id = :embedding_model_id
+                    LIMIT 1
+                    """
+                    ),
+                    dict(embedding_model_id=embedding_model_id),
+                ).scalar()
+            )
+
+            if dimensions is None or dimensions > MAX_INDEXABLE_DIMENSIONS:
+                continue
+
+            conn.execute(
+                create_vector_index_statement(
+                    embedding_model_id=embedding_model_id,
+                    dimensions=dimensions,
+                    index_type=get_settings().vector_index_type,
+                    ivfflat_lists=get_settings().ivfflat_lists,
+                    concurrently=True,
+                )
+            )
+
+
+def downgrade() -> None:
+    # Dropping the column also drops the partial vector indexes
+    op.drop_constraint(
+        "info_blob_chunks_embedding_model_id_fkey",
+        "info_blob_chunks",
+        type_="foreignkey",
+    )
+    op.drop_column("info_blob_chunks", "embedding_model_id")
@@ -0,0 +1,52 @@
+"""add search mode to assistants and full-text index on info blob chunks
+Revision ID: 3b9e2d61f0c4
+Revises: 8075416213ca
+Create Date: 2026-10-18 14:33:08.512940
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic
+revision = "3b9e2d61f0c4"
+down_revision = "8075416213ca"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "assistants",
+        sa.Column(
+            "search_mode", sa.String(), server_default="semantic", nullable=False
+        ),
+    )
+
+    # Stored, so that matching chunks are ranked without parsing their text
+    # again. Must use the text search config of `InfoBlobChunkRepo`.
+    # Adding it rewrites the table.
+    op.add_column(
+        "info_blob_chunks",
+        sa.Column(
+            "text_search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple'::regconfig, text)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_info_blob_chunks_text_search_vector",
+        "info_blob_chunks",
+        ["text_search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_info_blob_chunks_text_search_vector", table_name="info_blob_chunks"
+    )
+    op.drop_column("info_blob_chunks", "text_search_vector")
+    op.drop_column("assistants", "search_mode")
@@ -0,0 +1,35 @@
+"""add content hash and http validators to info blobs
+Revision ID: 5c1f3a9d7e28
+Revises: 3b9e2d61f0c4
+Create Date: 2026-10-18 16:20:44.173095
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = "5c1f3a9d7e28"
+down_revision = "3b9e2d61f0c4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("info_blobs", sa.Column("content_hash", sa.String(), nullable=True))
+    op.add_column("info_blobs", sa.Column("etag", sa.String(), nullable=True))
+    op.add_column("info_blobs", sa.Column("last_modified", sa.String(), nullable=True))
+
+    # Same as `intric.info_blobs.text_processor.hash_text`,
+    # so the first re-crawl can already skip unchanged pages
+    op.execute(
+        "UPDATE info_blobs "
+        "SET content_hash = encode(sha256(convert_to(text, 'UTF8')), 'hex') "
+        "WHERE website_id IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("info_blobs", "last_modified")
+    op.drop_column("info_blobs", "etag")
+    op.drop_column("info_blobs", "content_hash")
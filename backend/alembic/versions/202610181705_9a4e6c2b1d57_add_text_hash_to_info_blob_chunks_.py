@@ -0,0 +1,36 @@
+"""add text hash to info blob chunks
+Revision ID: 9a4e6c2b1d57
+Revises: 5c1f3a9d7e28
+Create Date: 2026-10-18 17:05:12.662918
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = "9a4e6c2b1d57"
+down_revision = "5c1f3a9d7e28"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Not backfilled, as that would rewrite every chunk with its embedding.
+    # Only chunks added from now on have their embeddings reused.
+    op.add_column(
+        "info_blob_chunks", sa.Column("text_hash", sa.String(), nullable=True)
+    )
+    op.create_index(
+        "ix_info_blob_chunks_embedding_model_id_text_hash",
+        "info_blob_chunks",
+        ["embedding_model_id", "text_hash"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_info_blob_chunks_embedding_model_id_text_hash",
+        table_name="info_blob_chunks",
+    )
+    op.drop_column("info_blob_chunks", "text_hash")
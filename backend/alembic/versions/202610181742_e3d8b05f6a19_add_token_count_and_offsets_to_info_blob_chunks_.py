@@ -0,0 +1,45 @@
+"""add token count and offsets to info blob chunks
+Revision ID: e3d8b05f6a19
+Revises: 9a4e6c2b1d57
+Create Date: 2026-10-18 17:42:37.518204
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = "e3d8b05f6a19"
+down_revision = "9a4e6c2b1d57"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "info_blob_chunks", sa.Column("token_count", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "info_blob_chunks", sa.Column("start_offset", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "info_blob_chunks", sa.Column("end_offset", sa.Integer(), nullable=True)
+    )
+
+    # Backfilled by a cron job in the worker, which finds the chunks
+    # left to backfill through this index
+    op.create_index(
+        "ix_info_blob_chunks_missing_token_count",
+        "info_blob_chunks",
+        ["info_blob_id"],
+        postgresql_where=sa.text("token_count IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_info_blob_chunks_missing_token_count", table_name="info_blob_chunks"
+    )
+    op.drop_column("info_blob_chunks", "end_offset")
+    op.drop_column("info_blob_chunks", "start_offset")
+    op.drop_column("info_blob_chunks", "token_count")
@@ -0,0 +1,25 @@
+"""add num tokens input to questions
+Revision ID: 7f2a91c4d3e6
+Revises: e3d8b05f6a19
+Create Date: 2026-10-18 18:16:05.241870
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = "7f2a91c4d3e6"
+down_revision = "e3d8b05f6a19"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "questions", sa.Column("num_tokens_input", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("questions", "num_tokens_input")
@@ -0,0 +1,26 @@
+"""add index for listing sessions
+Revision ID: b41e6d0a8c53
+Revises: 7f2a91c4d3e6
+Create Date: 2026-10-18 18:51:29.903417
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = "b41e6d0a8c53"
+down_revision = "7f2a91c4d3e6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_sessions_assistant_id_user_id_created_at",
+        "sessions",
+        ["assistant_id", "user_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sessions_assistant_id_user_id_created_at", table_name="sessions")
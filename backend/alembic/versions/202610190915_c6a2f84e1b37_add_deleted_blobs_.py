@@ -0,0 +1,33 @@
+"""add deleted blobs
+Revision ID: c6a2f84e1b37
+Revises: b41e6d0a8c53
+Create Date: 2026-10-19 09:15:42.518309
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = "c6a2f84e1b37"
+down_revision = "b41e6d0a8c53"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "deleted_blobs",
+        sa.Column("checksum", sa.String(), nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("checksum"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("deleted_blobs")
@@ -2,7 +2,7 @@ from enum import Enum
 from typing import Any, Optional, Union
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from intric.files.file_models import File
 from intric.logging.logging import LoggingDetails
@@ -76,11 +76,28 @@ class CompletionModelPublic(CompletionModel):
     is_locked: bool = True
 
 
+class TokenUsage(BaseModel):
+    """The tokens of a completion as reported by the provider, None if it
+    did not report them. Filled in when a streamed completion ends."""
+
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+
 class CompletionModelResponse(BaseModel):
     completion: Union[str, Any]  # Pydantic doesn't support AsyncIterable
     model: CompletionModel
     extended_logging: Optional[LoggingDetails] = None
     total_token_count: int
+    input_token_count: Optional[int] = None
+    usage: TokenUsage = Field(default_factory=TokenUsage)
+
+    def get_input_token_count(self) -> int:
+        """The tokens of the whole context sent to the model."""
+        if self.usage.input_tokens is not None:
+            return self.usage.input_tokens
+
+        return self.total_token_count
 
 
 class Message(BaseModel):
@@ -92,6 +109,7 @@ class Message(BaseModel):
 class Context(BaseModel):
     input: str
     token_count: int = 0
+    input_token_count: int = 0
     prompt: str = ""
     messages: list[Message] = []
     images: list[File] = []
@@ -5,29 +5,30 @@ from intric.ai_models.completion_models.completion_model import (
     CompletionModel,
     Context,
     ModelKwargs,
+    TokenUsage,
 )
 from intric.ai_models.completion_models.completion_model_adapters.openai_model_adapter import (
     OpenAIModelAdapter,
 )
-from intric.main.config import get_settings
+from intric.ai_models.model_clients import model_clients
 
 
 class AzureOpenAIModelAdapter(OpenAIModelAdapter):
+    # Depends on the API version
+    STREAM_USAGE = False
+
     def __init__(
         self,
         model: CompletionModel,
     ):
         self.model = model
-        self.client: AsyncAzureOpenAI = AsyncAzureOpenAI(
-            api_key=get_settings().azure_api_key,
-            azure_endpoint=get_settings().azure_endpoint,
-            api_version=get_settings().azure_api_version,
-        )
+        self.client: AsyncAzureOpenAI = model_clients.azure()
 
     async def get_response(
         self,
         context: Context,
         model_kwargs: ModelKwargs | None = None,
+        usage: TokenUsage | None = None,
     ):
         query = self.create_query_from_context(context=context)
         return await get_response_open_ai.get_response(
@@ -35,12 +36,14 @@ class AzureOpenAIModelAdapter(OpenAIModelAdapter):
             model_name=self.model.deployment_name,
             messages=query,
             model_kwargs=self._get_kwargs(model_kwargs),
+            usage=usage,
         )
 
     def get_response_streaming(
         self,
         context: Context,
         model_kwargs: ModelKwargs | None = None,
+        usage: TokenUsage | None = None,
     ):
         query = self.create_query_from_context(context=context)
         return get_response_open_ai.get_response_streaming(
@@ -48,4 +51,5 @@ class AzureOpenAIModelAdapter(OpenAIModelAdapter):
             model_name=self.model.deployment_name,
             messages=query,
             model_kwargs=self._get_kwargs(model_kwargs),
+            usage=usage if self.STREAM_USAGE else None,
         )
@@ -7,9 +7,10 @@ from intric.ai_models.completion_models.completion_model import (
     CompletionModel,
     Context,
     ModelKwargs,
+    TokenUsage,
 )
+from intric.ai_models.model_clients import model_clients
 from intric.files.file_models import File
-from intric.main.config import get_settings
 from intric.main.logging import get_logger
 
 logger = get_logger(__name__)
@@ -21,12 +22,10 @@ class ClaudeModelAdapter:
     def __init__(
         self,
         model: CompletionModel,
-        async_client: AsyncAnthropic = AsyncAnthropic(
-            api_key=get_settings().anthropic_api_key
-        ),
+        async_client: AsyncAnthropic | None = None,
     ):
         self.model = model
-        self.async_client = async_client
+        self.async_client = async_client or model_clients.anthropic()
 
     def _get_kwargs(self, kwargs: ModelKwargs | None):
         if kwargs is None:
@@ -105,6 +104,7 @@ class ClaudeModelAdapter:
         self,
         context: Context,
         model_kwargs: ModelKwargs | None = None,
+        usage: TokenUsage | None = None,
     ):
         query = self.create_query_from_context(context=context)
         return await get_response_claude.get_response(
@@ -114,12 +114,14 @@ class ClaudeModelAdapter:
             prompt=context.prompt,
             messages=query,
             model_kwargs=self._get_kwargs(model_kwargs),
+            usage=usage,
         )
 
     def get_response_streaming(
         self,
         context: Context,
         model_kwargs: ModelKwargs | None = None,
+        usage: TokenUsage | None = None,
     ):
         query = self.create_query_from_context(context=context)
         return get_response_claude.get_response_streaming(
@@ -129,4 +131,5 @@ class ClaudeModelAdapter:
             prompt=context.prompt,
             messages=query,
             model_kwargs=self._get_kwargs(model_kwargs),
+            usage=usage,
         )
@@ -8,10 +8,11 @@ from intric.ai_models.completion_models.completion_model import (
     CompletionModel,
     Context,
     ModelKwargs,
+    TokenUsage,
 )
+from intric.ai_models.model_clients import model_clients
 from intric.files.file_models import File
 from intric.logging.logging import LoggingDetails
-from intric.main.config import get_settings
 from intric.main.logging import get_logger
 
 logger = get_logger(__name__)
@@ -21,13 +22,16 @@ TOKENS_RESERVED_FOR_COMPLETION = 1000
 
 
 class OpenAIModelAdapter:
+    # Whether the API reports the usage of streamed completions
+    STREAM_USAGE = True
+
     def __init__(
         self,
         model: CompletionModel,
-        client: AsyncOpenAI = AsyncOpenAI(api_key=get_settings().openai_api_key),
+        client: AsyncOpenAI | None = None,
     ):
         self.model = model
-        self.client = client
+        self.client = client or model_clients.openai()
 
     def _get_kwargs(self, kwargs: ModelKwargs | None):
         if kwargs is None:
@@ -106,6 +110,7 @@ class OpenAIModelAdapter:
         self,
         context: Context,
         model_kwargs: ModelKwargs | None = None,
+        usage: TokenUsage | None = None,
     ):
         query = self.create_query_from_context(context=context)
         return await get_response_open_ai.get_response(
@@ -113,12 +118,14 @@ class OpenAIModelAdapter:
             model_name=self.model.name,
             messages=query,
             model_kwargs=self._get_kwargs(model_kwargs),
+            usage=usage,
         )
 
     def get_response_streaming(
         self,
         context: Context,
         model_kwargs: ModelKwargs | None = None,
+        usage: TokenUsage | None = None,
     ):
         query = self.create_query_from_context(context=context)
         return get_response_open_ai.get_response_streaming(
@@ -126,4 +133,5 @@ class OpenAIModelAdapter:
             model_name=self.model.name,
             messages=query,
             model_kwargs=self._get_kwargs(model_kwargs),
+            usage=usage if self.STREAM_USAGE else None,
         )
@@ -11,23 +11,24 @@ from intric.ai_models.completion_models.completion_model import (
 from intric.ai_models.completion_models.completion_model_adapters.openai_model_adapter import (
     OpenAIModelAdapter,
 )
+from intric.ai_models.model_clients import model_clients
 from intric.logging.logging import LoggingDetails
 from intric.logging.logging_templates import LLAMA_TEMPLATE
-from intric.main.config import get_settings
 
 JINJA_TEMPLATE = jinja2.Environment().from_string(LLAMA_TEMPLATE)
 
 
 class VLMMModelAdapter(OpenAIModelAdapter):
+    # Depends on the version of vLLM
+    STREAM_USAGE = False
+
     def __init__(
         self,
         model: CompletionModel,
-        client: AsyncOpenAI = AsyncOpenAI(
-            api_key="EMPTY", base_url=get_settings().vllm_model_url
-        ),
+        client: AsyncOpenAI | None = None,
     ):
         self.model = model
-        self.client = client
+        self.client = client or model_clients.vllm()
 
     def get_token_limit_of_model(self):
         return self.model.token_limit
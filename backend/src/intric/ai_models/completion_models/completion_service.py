@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from intric.ai_models.completion_models.completion_model import (
     CompletionModel,
     CompletionModelFamily,
     CompletionModelResponse,
+    Context,
     ModelKwargs,
+    TokenUsage,
 )
 from intric.ai_models.completion_models.completion_model_adapters import (
     AzureOpenAIModelAdapter,
@@ -16,6 +18,7 @@ from intric.ai_models.completion_models.completion_model_adapters import (
 )
 from intric.ai_models.completion_models.context_builder import ContextBuilder
 from intric.files.file_models import File
+from intric.files.file_repo import FileRepository
 from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
 from intric.main.logging import get_logger
 from intric.sessions.session import SessionInDB
@@ -31,9 +34,31 @@ class CompletionService:
         self,
         model_adapter: OpenAIModelAdapter | ClaudeModelAdapter | VLMMModelAdapter,
         context_builder: ContextBuilder,
+        file_repo: Optional[FileRepository] = None,
     ):
         self.model_adapter = model_adapter
         self.context_builder = context_builder
+        self.file_repo = file_repo
+
+    async def _load_images_of_messages(self, context: Context) -> Context:
+        # The earlier questions come without the blobs of their images,
+        # which are only loaded for the questions that fit in the context
+        if self.file_repo is None:
+            return context
+
+        images = [image for message in context.messages for image in message.images]
+        if not images:
+            return context
+
+        loaded_images = iter(await self.file_repo.load_images(images))
+        messages = [
+            message.model_copy(
+                update={"images": [next(loaded_images) for _ in message.images]}
+            )
+            for message in context.messages
+        ]
+
+        return context.model_copy(update={"messages": messages})
 
     async def get_response(
         self,
@@ -63,6 +88,7 @@ class CompletionService:
             transcription_inputs=transcription_inputs,
             version=version,
         )
+        context = await self._load_images_of_messages(context)
 
         if extended_logging:
             logging_details = self.model_adapter.get_logging_details(
@@ -71,16 +97,21 @@ class CompletionService:
         else:
             logging_details = None
 
+        # Set by the adapter, when the stream ends if streaming
+        usage = TokenUsage()
+
         if not stream:
             completion = await self.model_adapter.get_response(
                 context=context,
                 model_kwargs=model_kwargs,
+                usage=usage,
             )
         else:
             # Will be an async generator - not awaitable
             completion = self.model_adapter.get_response_streaming(
                 context=context,
                 model_kwargs=model_kwargs,
+                usage=usage,
             )
 
         return CompletionModelResponse(
@@ -88,6 +119,8 @@ class CompletionService:
             model=self.model_adapter.model,
             extended_logging=logging_details,
             total_token_count=context.token_count,
+            input_token_count=context.input_token_count,
+            usage=usage,
         )
 
 
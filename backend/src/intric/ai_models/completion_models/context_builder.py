@@ -1,10 +1,14 @@
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Optional
 
 import tiktoken
 
-from intric.ai_models.completion_models.completion_model import Context, Message
+from intric.ai_models.completion_models.completion_model import (
+    CompletionModelResponse,
+    Context,
+    Message,
+)
 from intric.ai_models.completion_models.static_prompts import (
     HALLUCINATION_GUARD,
     SHOW_REFERENCES_PROMPT,
@@ -23,6 +27,14 @@ CONTEXT_SIZE_BUFFER = 1000  # Counting tokens is not an exakt science, leave som
 MIN_PERCENTAGE_KNOWLEDGE = (
     0.8  # Strive towards a minimum of 80% of the context as knowledge
 )
+FILE_TOKEN_COUNT_CACHE_SIZE = 1024
+METADATA_TOKEN_COUNT_CACHE_SIZE = 4096
+
+# Tokens of the text of files, by checksum
+_file_token_counts: OrderedDict[str, int] = OrderedDict()
+
+# Tokens of the source metadata of info blobs, by title and id
+_metadata_token_counts: OrderedDict[tuple[str, str], int] = OrderedDict()
 
 
 def count_tokens(text: str):
@@ -30,6 +42,52 @@ def count_tokens(text: str):
     return len(encoding.encode(text))
 
 
+def count_output_tokens(response: CompletionModelResponse, completion: str) -> int:
+    """The tokens of the completion as reported by the provider, or else
+    counted."""
+    if response.usage.output_tokens is not None:
+        return response.usage.output_tokens
+
+    return count_tokens(completion)
+
+
+def count_file_tokens(file: File):
+    if file.checksum in _file_token_counts:
+        _file_token_counts.move_to_end(file.checksum)
+        return _file_token_counts[file.checksum]
+
+    tokens = count_tokens(file.text)
+
+    _file_token_counts[file.checksum] = tokens
+    if len(_file_token_counts) > FILE_TOKEN_COUNT_CACHE_SIZE:
+        _file_token_counts.popitem(last=False)
+
+    return tokens
+
+
+def _build_metadata_string(info_blob_title: str, info_blob_id: "UUID"):
+    return "source_title: {}, source_id: {}\n".format(
+        info_blob_title, str(info_blob_id)[:8]
+    )
+
+
+def count_metadata_tokens(info_blob_title: str, info_blob_id: "UUID"):
+    key = (info_blob_title, str(info_blob_id))
+    if key in _metadata_token_counts:
+        _metadata_token_counts.move_to_end(key)
+        return _metadata_token_counts[key]
+
+    tokens = count_tokens(
+        f'"""{_build_metadata_string(info_blob_title, info_blob_id)}"""'
+    )
+
+    _metadata_token_counts[key] = tokens
+    if len(_metadata_token_counts) > METADATA_TOKEN_COUNT_CACHE_SIZE:
+        _metadata_token_counts.popitem(last=False)
+
+    return tokens
+
+
 def _build_files_string(files: list[File]):
     if files:
         files_string = "\n".join(
@@ -106,15 +164,31 @@ class _Prompt:
         result_string = chunks[0].text
 
         for i in range(1, len(chunks)):
-            prev_chunk = chunks[i - 1].text
-            current_chunk = chunks[i].text
-
-            overlap = self._common_overlap(prev_chunk, current_chunk)
+            prev_chunk = chunks[i - 1]
+            current_chunk = chunks[i]
+
+            # Chunks split from the text with offsets are joined by them
+            if prev_chunk.end_offset is None or current_chunk.start_offset is None:
+                overlap = self._common_overlap(prev_chunk.text, current_chunk.text)
+            else:
+                overlap = prev_chunk.end_offset - current_chunk.start_offset
+
+            # Only whitespace, stripped off the chunks, between them
+            if overlap < 0:
+                result_string = f"{result_string}\n{current_chunk.text}"
+                continue
 
-            result_string = f"{result_string}{current_chunk[overlap:]}"
+            result_string = f"{result_string}{current_chunk.text[overlap:]}"
 
         return result_string
 
+    @staticmethod
+    def _count_chunk_tokens(chunk: "InfoBlobChunkInDBWithScore"):
+        if chunk.token_count is not None:
+            return chunk.token_count
+
+        return count_tokens(chunk.text)
+
     def _reconstruct_and_order_chunks(
         self,
         chunks: list["InfoBlobChunkInDBWithScore"],
@@ -128,16 +202,14 @@ class _Prompt:
         chunks_by_info_blob = {}
         used_tokens = 0
         for chunk in chunks:
-            chunk_tokens = count_tokens(chunk.text)
+            chunk_tokens = self._count_chunk_tokens(chunk)
 
             if chunks_by_info_blob.get(chunk.info_blob_id) is None:
                 chunks_by_info_blob[chunk.info_blob_id] = []
 
                 # Count the tokens for the metadata
-                chunk_tokens += count_tokens(
-                    '"""source_title: {}, source_id: {}\n"""'.format(
-                        chunk.info_blob_title, str(chunk.info_blob_id)[:8]
-                    )
+                chunk_tokens += count_metadata_tokens(
+                    chunk.info_blob_title, chunk.info_blob_id
                 )
 
             if chunk_tokens + used_tokens > max_tokens:
@@ -206,9 +278,10 @@ class _Prompt:
 
         elif version == 2:
             return "\n".join(
-                '"""source_title: {}, source_id: {}\n{}"""'.format(
-                    chunk_grouping.info_blob_title,
-                    str(chunk_grouping.info_blob_id)[:8],
+                '"""{}{}"""'.format(
+                    _build_metadata_string(
+                        chunk_grouping.info_blob_title, chunk_grouping.info_blob_id
+                    ),
                     chunk_grouping.text,
                 )
                 for chunk_grouping in chunk_groupings
@@ -280,7 +353,7 @@ class ContextBuilder:
             # which means that we don't have to worry about what
             # happens with follow-up questions.
             transcription_string = "\n".join(
-                map(lambda t: f"transcription: \"\"{t}\"\"", transcription_inputs)
+                map(lambda t: f'transcription: ""{t}""', transcription_inputs)
             )
             input_str = f"{transcription_string}\n\n{input_str}"
 
@@ -300,18 +373,25 @@ class ContextBuilder:
         total_tokens = 0
 
         for message in reversed(session.questions):
-            question = self._build_input(
-                message.question,
-                self._get_files_by_type(message.files, FileType.TEXT),
-            )
-            answer = message.answer
-            images = self._get_files_by_type(message.files, FileType.IMAGE)
+            text_files = self._get_files_by_type(message.files, FileType.TEXT)
+
+            # Counted when the question was asked, except for older questions
+            if message.num_tokens_input is not None:
+                question_tokens = message.num_tokens_input
+            else:
+                question_tokens = count_tokens(message.question) + sum(
+                    count_file_tokens(file) for file in text_files
+                )
 
-            message_tokens = count_tokens(question) + count_tokens(answer)
+            message_tokens = question_tokens + message.num_tokens_answer
 
             if len(messages) > min_len and total_tokens + message_tokens > max_tokens:
                 break
 
+            question = self._build_input(message.question, text_files)
+            answer = message.answer
+            images = self._get_files_by_type(message.files, FileType.IMAGE)
+
             messages.insert(
                 0,
                 Message(
@@ -391,4 +471,5 @@ class ContextBuilder:
             messages=messages,
             images=self._get_files_by_type(files, FileType.IMAGE),
             token_count=tokens_used,
+            input_token_count=tokens_used_input,
         )
@@ -1,3 +1,5 @@
+from typing import Optional
+
 import anthropic
 from anthropic import AsyncAnthropic
 from tenacity import (
@@ -7,6 +9,7 @@ from tenacity import (
     wait_random_exponential,
 )
 
+from intric.ai_models.completion_models.completion_model import TokenUsage
 from intric.main.exceptions import BadRequestException, ClaudeException
 from intric.main.logging import get_logger
 
@@ -26,6 +29,7 @@ async def get_response(
     messages: list,
     model_kwargs: dict,
     max_tokens: int,
+    usage: Optional[TokenUsage] = None,
 ):
     try:
         message = await client.messages.create(
@@ -35,6 +39,11 @@ async def get_response(
             model=model_name,
             **model_kwargs,
         )
+
+        if usage is not None:
+            usage.input_tokens = message.usage.input_tokens
+            usage.output_tokens = message.usage.output_tokens
+
         return message.content[0].text
     except anthropic.APIConnectionError as exc:
         logger.exception("Connection error:")
@@ -62,6 +71,7 @@ async def get_response_streaming(
     messages: list,
     model_kwargs: dict,
     max_tokens: int,
+    usage: Optional[TokenUsage] = None,
 ):
     try:
         stream = await client.messages.create(
@@ -77,6 +87,13 @@ async def get_response_streaming(
             if event.type == "content_block_delta":
                 yield event.delta.text
 
+            # The input tokens come first, the output tokens when the
+            # message ends
+            elif usage is not None and event.type == "message_start":
+                usage.input_tokens = event.message.usage.input_tokens
+            elif usage is not None and event.type == "message_delta":
+                usage.output_tokens = event.usage.output_tokens
+
     except anthropic.APIConnectionError as exc:
         logger.exception("Connection error:")
         raise ClaudeException("The server could not be reached") from exc
@@ -1,3 +1,5 @@
+from typing import Optional
+
 import openai
 from openai import AsyncOpenAI
 from tenacity import (
@@ -7,6 +9,7 @@ from tenacity import (
     wait_random_exponential,
 )
 
+from intric.ai_models.completion_models.completion_model import TokenUsage
 from intric.main.exceptions import BadRequestException, OpenAIException
 from intric.main.logging import get_logger
 
@@ -20,7 +23,11 @@ logger = get_logger(__name__)
     reraise=True,
 )
 async def get_response(
-    client: AsyncOpenAI, model_name: str, messages: list, model_kwargs: dict
+    client: AsyncOpenAI,
+    model_name: str,
+    messages: list,
+    model_kwargs: dict,
+    usage: Optional[TokenUsage] = None,
 ):
     try:
         response = await client.chat.completions.create(
@@ -28,6 +35,11 @@ async def get_response(
         )
         choices = response.choices  # type: ignore
         completion = choices[0].message.content.strip()
+
+        if usage is not None and response.usage is not None:
+            usage.input_tokens = response.usage.prompt_tokens
+            usage.output_tokens = response.usage.completion_tokens
+
         return completion
     except openai.BadRequestError as exc:
         raise BadRequestException("Invalid model kwargs") from exc
@@ -46,13 +58,24 @@ async def get_response(
     reraise=True,
 )
 async def get_response_streaming(
-    client: AsyncOpenAI, model_name: str, messages: list, model_kwargs: dict
+    client: AsyncOpenAI,
+    model_name: str,
+    messages: list,
+    model_kwargs: dict,
+    usage: Optional[TokenUsage] = None,
 ):
+    """Streams the completion. If `usage` is given, the usage is asked for
+    and set after the last chunk, which has no choices."""
+    stream_options = (
+        {"stream_options": {"include_usage": True}} if usage is not None else {}
+    )
+
     try:
         stream = await client.chat.completions.create(
             model=model_name,
             messages=messages,
             stream=True,
+            **stream_options,
             **model_kwargs,
         )
 
@@ -62,6 +85,10 @@ async def get_response_streaming(
                 if delta.content:
                     yield delta.content
 
+            if usage is not None and getattr(chunk, "usage", None) is not None:
+                usage.input_tokens = chunk.usage.prompt_tokens
+                usage.output_tokens = chunk.usage.completion_tokens
+
     except openai.BadRequestError as exc:
         raise BadRequestException("Invalid model kwargs") from exc
     except openai.RateLimitError as exc:
@@ -1,19 +1,23 @@
+import asyncio
+import itertools
 import time
-from typing import Optional
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import Optional, TypeVar
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from pydantic_settings import BaseSettings
 
-from intric.ai_models.completion_models.context_builder import count_tokens
+from intric.ai_models.embedding_models.datastore.datastore_models import SearchMode
+from intric.ai_models.embedding_models.datastore.text_splitter import TextSplitter
 from intric.ai_models.embedding_models.embedding_model_adapters.base import (
     EmbeddingModelAdapter,
 )
-from intric.files.chunk_embedding_list import ChunkEmbeddingList
+from intric.ai_models.embedding_models.query_embedding_cache import (
+    QueryEmbeddingCache,
+)
 from intric.groups.api.group_models import Group
 from intric.info_blobs.info_blob import (
     InfoBlobChunk,
     InfoBlobChunkInDBWithScore,
-    InfoBlobChunkWithEmbedding,
     InfoBlobInDB,
 )
 from intric.info_blobs.info_blob_chunk_repo import InfoBlobChunkRepo
@@ -23,6 +27,8 @@ from intric.websites.website_models import Website
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
 
 class ChunkSettings(BaseSettings):
     chunk_size: int = 200
@@ -31,6 +37,18 @@ class ChunkSettings(BaseSettings):
 
 settings = ChunkSettings()
 
+# Chunks split off, and looked up for embeddings to reuse, at a time
+EMBEDDING_BATCH_SIZE = 256
+
+# Embedded batches waiting to be inserted
+EMBEDDED_BATCHES_QUEUE_SIZE = 4
+
+
+def _batched(iterable: Iterable[T], n: int) -> Iterator[list[T]]:
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, n)):
+        yield batch
+
 
 def autocut(y_values: list[float], cutoff: int = 2) -> int:
     # Written by GPT-4, fact-checked by GPT-4
@@ -72,68 +90,171 @@ class Datastore:
         user: UserInDB,
         info_blob_chunk_repo: InfoBlobChunkRepo,
         embedding_model_adapter: EmbeddingModelAdapter,
+        query_embedding_cache: Optional[QueryEmbeddingCache] = None,
     ):
         self.user = user
         self.chunk_repo = info_blob_chunk_repo
         self.model_adapter = embedding_model_adapter
+        self.query_embedding_cache = query_embedding_cache
 
-    def _chunk_text(self, info_blob: InfoBlobInDB):
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.chunk_size,
-            chunk_overlap=settings.chunk_overlap,
-            length_function=count_tokens,
+        # The session can not run more than one statement at a time
+        self._session_lock = asyncio.Lock()
+
+    def _chunk_text(self, info_blob: InfoBlobInDB) -> Iterator[InfoBlobChunk]:
+        splitter = TextSplitter(
+            chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap
         )
 
-        info_blob_chunks = [
-            InfoBlobChunk(
+        for i, chunk in enumerate(splitter.split(info_blob.text)):
+            yield InfoBlobChunk(
                 chunk_no=i,
-                text=chunk.strip(),
+                text=chunk.text,
+                token_count=chunk.token_count,
+                start_offset=chunk.start,
+                end_offset=chunk.end,
                 info_blob_id=info_blob.id,
                 tenant_id=self.user.tenant_id,
+                embedding_model_id=self.model_adapter.model.id,
+            )
+
+    async def _get_existing_embeddings(
+        self, chunks: list[InfoBlobChunk]
+    ) -> dict[str, list[float]]:
+        # Chunks with the same text, and the same embedding model, have the
+        # same embedding. Reuse it if the text is already in the datastore.
+        async with self._session_lock:
+            return await self.chunk_repo.get_embeddings_by_text_hash(
+                list({chunk.text_hash for chunk in chunks}),
+                embedding_model_id=self.model_adapter.model.id,
+                tenant_id=self.user.tenant_id,
             )
-            for i, chunk in enumerate(splitter.split_text(info_blob.text))
-            if chunk.strip()
-        ]
 
-        return info_blob_chunks
+    async def _embed(self, info_blob: InfoBlobInDB, queue: asyncio.Queue):
+        # Chunks waiting for the embedding of their text, by its hash.
+        # The same text is only embedded once while it is waited for.
+        waiting: dict[str, list[InfoBlobChunk]] = {}
+        num_reused = 0
+
+        async def _chunks_to_embed() -> AsyncIterator[InfoBlobChunk]:
+            nonlocal num_reused
+
+            for chunks in _batched(self._chunk_text(info_blob), EMBEDDING_BATCH_SIZE):
+                embeddings_by_hash = await self._get_existing_embeddings(chunks)
+
+                reused = [
+                    chunk for chunk in chunks if chunk.text_hash in embeddings_by_hash
+                ]
+                if reused:
+                    num_reused += len(reused)
+                    await queue.put(
+                        (reused, [embeddings_by_hash[c.text_hash] for c in reused])
+                    )
+
+                for chunk in chunks:
+                    if chunk.text_hash in embeddings_by_hash:
+                        continue
+
+                    if chunk.text_hash in waiting:
+                        waiting[chunk.text_hash].append(chunk)
+                    else:
+                        waiting[chunk.text_hash] = [chunk]
+                        yield chunk
+
+        try:
+            # The chunks are streamed into the embedding model, which keeps
+            # its requests in flight across the batches split off here
+            async for batch, embeddings in self.model_adapter.get_embeddings(
+                _chunks_to_embed()
+            ):
+                chunks = []
+                chunk_embeddings = []
+                for chunk, embedding in zip(batch, embeddings):
+                    for waiting_chunk in waiting.pop(chunk.text_hash):
+                        chunks.append(waiting_chunk)
+                        chunk_embeddings.append(embedding)
+
+                await queue.put((chunks, chunk_embeddings))
+        except Exception as e:
+            # Handed over to be raised where the pipeline is awaited
+            await queue.put(e)
+            return
 
-    async def _add(
-        self, chunk_embedding_list: ChunkEmbeddingList, batch_size: int = 100
-    ):
+        logger.debug(f"Reused the embeddings of {num_reused} chunks.")
+
+        await queue.put(None)
+
+    async def _insert(self, queue: asyncio.Queue, batch_size: int) -> int:
+        num_chunks = 0
         chunks = []
-        for chunk, embedding in chunk_embedding_list:
-            chunks.append(
-                InfoBlobChunkWithEmbedding(
-                    **chunk.model_dump(exclude_none=True), embedding=embedding
-                )
-            )
+        embeddings = []
+
+        while (item := await queue.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+
+            batch, batch_embeddings = item
+            chunks.extend(batch)
+            embeddings.extend(batch_embeddings)
 
             if len(chunks) >= batch_size:
                 logger.debug(f"Adding {len(chunks)} chunks to datastore.")
-                await self.chunk_repo.add(chunks)
+                async with self._session_lock:
+                    await self.chunk_repo.add(chunks, embeddings)
 
-                chunks.clear()
+                num_chunks += len(chunks)
+                chunks = []
+                embeddings = []
 
         # Last batch
         if chunks:
             logger.debug(f"Last batch. Adding {len(chunks)} chunks to datastore.")
-            await self.chunk_repo.add(chunks)
+            async with self._session_lock:
+                await self.chunk_repo.add(chunks, embeddings)
+
+            num_chunks += len(chunks)
+
+        return num_chunks
+
+    async def add(self, info_blob: InfoBlobInDB, batch_size: int = 500):
+        # Splitting, embedding and inserting overlap: the text is split lazily,
+        # a batch of chunks at a time, and the embedded batches are inserted
+        # while the next ones are embedded. The queue bounds how many embedded
+        # chunks wait for insertion.
+        queue = asyncio.Queue(maxsize=EMBEDDED_BATCHES_QUEUE_SIZE)
 
-    async def add(self, info_blob: InfoBlobInDB):
-        logger.debug("Chunking text.")
-        info_blob_chunks = self._chunk_text(info_blob)
+        embed_task = asyncio.create_task(self._embed(info_blob, queue))
+        try:
+            num_chunks = await self._insert(queue, batch_size=batch_size)
+        except BaseException:
+            embed_task.cancel()
+            raise
 
-        if not info_blob_chunks:
+        await embed_task
+
+        if not num_chunks:
             logger.warning(
                 f"Info Blob {info_blob.id} did not yield any chunks after splitting."
             )
             return
 
-        logger.debug(f"Embedding {len(info_blob_chunks)} info-blob chunks.")
-        chunk_embedding_list = await self.model_adapter.get_embeddings(info_blob_chunks)
+        logger.debug(f"Added {num_chunks} info-blob chunks to datastore.")
+
+    async def embed_query(self, search_string: str) -> list[float]:
+        if self.query_embedding_cache is None:
+            return await self.model_adapter.get_embedding_for_query(search_string)
 
-        logger.debug(f"Adding {len(info_blob_chunks)} info-blob chunks to datastore.")
-        await self._add(chunk_embedding_list)
+        embedding_model_id = self.model_adapter.model.id
+
+        embedding = await self.query_embedding_cache.get(
+            embedding_model_id, search_string
+        )
+        if embedding is None:
+            embedding = await self.model_adapter.get_embedding_for_query(search_string)
+            await self.query_embedding_cache.set(
+                embedding_model_id, search_string, embedding
+            )
+
+        return embedding
 
     async def semantic_search(
         self,
@@ -142,27 +263,47 @@ class Datastore:
         websites: list[Website] = [],
         num_chunks: Optional[int] = 30,
         autocut_cutoff: Optional[int] = None,
+        search_mode: SearchMode = SearchMode.SEMANTIC,
+        keyword_search_string: Optional[str] = None,
+        search_string_embedding: Optional[list[float]] = None,
     ) -> list[InfoBlobChunkInDBWithScore]:
+        """Search with the embedding of the search string, computed unless
+        it is given."""
         group_ids = [group.id for group in groups]
         website_ids = [website.id for website in websites]
 
         start = time.time()
-        search_string_embedding = await self.model_adapter.get_embedding_for_query(
-            search_string
-        )
+        if search_string_embedding is None:
+            search_string_embedding = await self.embed_query(search_string)
         step_1 = time.time()
-        semantic_results = await self.chunk_repo.semantic_search(
-            search_string_embedding,
-            group_ids=group_ids,
-            website_ids=website_ids,
-            limit=num_chunks,
-        )
+        if search_mode == SearchMode.HYBRID:
+            semantic_results = await self.chunk_repo.hybrid_search(
+                search_string_embedding,
+                keyword_search_string or search_string,
+                embedding_model_id=self.model_adapter.model.id,
+                group_ids=group_ids,
+                website_ids=website_ids,
+                limit=num_chunks,
+            )
+        else:
+            semantic_results = await self.chunk_repo.semantic_search(
+                search_string_embedding,
+                embedding_model_id=self.model_adapter.model.id,
+                group_ids=group_ids,
+                website_ids=website_ids,
+                limit=num_chunks,
+            )
         end = time.time()
 
         logger.debug(
             f"Time to get results: Embed step: {step_1 - start},"
             f" Search step: {end - step_1}, Total: {end - start}"
         )
+        if self.query_embedding_cache is not None:
+            logger.debug(
+                f"Query embedding cache: {self.query_embedding_cache.stats}, "
+                f"hit rate: {self.query_embedding_cache.stats.hit_rate:.2f}"
+            )
 
         scores = [res.score for res in semantic_results]
 
@@ -1,10 +1,16 @@
 from datetime import datetime
+from enum import Enum
 from typing import Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 
 
+class SearchMode(str, Enum):
+    SEMANTIC = "semantic"
+    HYBRID = "hybrid"
+
+
 class SemanticSearchRequest(BaseModel):
     search_string: str
     num_chunks: int = 30
@@ -14,6 +20,7 @@ class SemanticSearchRequest(BaseModel):
         "Set to null (or omit completely) to not use this feature",
         default=None,
     )
+    search_mode: SearchMode = SearchMode.SEMANTIC
 
 
 class SemanticSearchResponse(BaseModel):
@@ -0,0 +1,135 @@
+import functools
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import numpy as np
+import tiktoken
+
+ENCODING = "cl100k_base"
+
+# Where to cut a chunk, in order of preference
+SEPARATORS = ["\n\n", "\n", ". ", " "]
+
+
+@dataclass
+class TextChunk:
+    text: str
+    start: int
+    end: int
+    token_count: int
+
+
+@functools.cache
+def _token_byte_lengths(encoding: tiktoken.Encoding) -> np.ndarray:
+    lengths = np.zeros(encoding.n_vocab, dtype=np.int64)
+
+    for token in range(encoding.n_vocab):
+        try:
+            lengths[token] = len(encoding.decode_single_token_bytes(token))
+        except KeyError:
+            # Unused token
+            pass
+
+    return lengths
+
+
+def _token_offsets(
+    encoding: tiktoken.Encoding, text: str, tokens: list[int]
+) -> list[int]:
+    """The character offset in the text where each token starts.
+
+    A token that starts in the middle of a multi-byte character gets the
+    offset of that character.
+    """
+    # Lone surrogates are replaced by tiktoken, with as many bytes
+    data = np.frombuffer(text.encode(errors="surrogatepass"), dtype=np.uint8)
+    chars_so_far = np.cumsum((data & 0xC0) != 0x80)
+
+    byte_lengths = _token_byte_lengths(encoding)[np.asarray(tokens)]
+    byte_starts = np.cumsum(byte_lengths) - byte_lengths
+
+    return (chars_so_far[byte_starts] - 1).tolist()
+
+
+class TextSplitter:
+    """Splits text into chunks of at most `chunk_size` tokens.
+
+    The text is tokenized once, chunks are cut on token boundaries.
+    A chunk is cut after a paragraph, line, sentence or word if there is
+    one in the second half of the chunk, in that order of preference.
+    Consecutive chunks share about `chunk_overlap` tokens.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding = tiktoken.get_encoding(ENCODING)
+
+    def _find_cut(self, text: str, offsets: list[int], start: int, end: int) -> int:
+        """The token to end the chunk before, at most `end`."""
+        lowest = offsets[start + self.chunk_size // 2]
+        highest = offsets[end]
+
+        for separator in SEPARATORS:
+            index = text.rfind(separator, lowest, highest)
+            if index != -1:
+                # Whitespace starts the next token, so cut before the token
+                # that the text after the separator starts in
+                cut = bisect_right(offsets, index + len(separator), start, end + 1) - 1
+                return bisect_left(offsets, offsets[cut], start, cut)
+
+        return end
+
+    def _make_chunk(
+        self, text: str, offsets: list[int], start: int, end: int
+    ) -> TextChunk:
+        start_char = offsets[start]
+        end_char = offsets[end] if end < len(offsets) else len(text)
+
+        chunk_text = text[start_char:end_char]
+        stripped = chunk_text.lstrip()
+        start_char += len(chunk_text) - len(stripped)
+        stripped = stripped.rstrip()
+        end_char = start_char + len(stripped)
+
+        # Tokens of only whitespace are stripped off with it
+        token_count = (
+            bisect_left(offsets, end_char, start, end)
+            - bisect_right(offsets, start_char, start, end)
+            + 1
+        )
+
+        return TextChunk(
+            text=stripped, start=start_char, end=end_char, token_count=token_count
+        )
+
+    def split(self, text: str) -> Iterator[TextChunk]:
+        """Chunks of the text, except those with only whitespace."""
+        tokens = self.encoding.encode_ordinary(text)
+        if not tokens:
+            return
+
+        offsets = _token_offsets(self.encoding, text, tokens)
+        num_tokens = len(tokens)
+
+        start = 0
+        while start < num_tokens:
+            end = start + self.chunk_size
+
+            if end >= num_tokens:
+                end = num_tokens
+            else:
+                end = self._find_cut(text, offsets, start, end)
+
+            chunk = self._make_chunk(text, offsets, start, end)
+            if chunk.text:
+                yield chunk
+
+            if end == num_tokens:
+                return
+
+            start = max(end - self.chunk_overlap, start + 1)
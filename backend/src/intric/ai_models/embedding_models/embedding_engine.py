@@ -0,0 +1,343 @@
+import asyncio
+import random
+import re
+import time
+from collections import deque
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Mapping,
+)
+from dataclasses import dataclass
+from typing import Optional, TypeVar
+from uuid import UUID
+
+import redis.asyncio as aioredis
+
+from intric.ai_models.completion_models.context_builder import count_tokens
+from intric.ai_models.embedding_models.embedding_model import EmbeddingModel
+from intric.info_blobs.info_blob import InfoBlobChunk
+from intric.main.config import get_settings
+from intric.main.exceptions import BadRequestException
+from intric.main.logging import get_logger
+from intric.worker.redis import r
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+KEY_PREFIX = "embedding_tpm"
+
+# OpenAI does not accept more inputs than this in one request
+MAX_BATCH_SIZE = 2048
+
+MIN_BACKOFF = 1
+MAX_BACKOFF = 60
+
+# Someone is waiting for the embedding of a query
+QUERY_RETRY_DELAY = 0.5
+
+# Matches durations like "1s", "6m0s", "20ms" and "1h2m3.5s"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+
+class EmbeddingRateLimitException(Exception):
+    def __init__(self, message: str = "", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds to wait before retrying, according to the rate limit headers."""
+    if not headers:
+        return None
+
+    headers = {key.lower(): value for key, value in headers.items()}
+
+    if "retry-after-ms" in headers:
+        delay = _parse_duration(headers["retry-after-ms"])
+        if delay is not None:
+            return delay / 1000
+
+    delays = [
+        _parse_duration(headers[key])
+        for key in (
+            "retry-after",
+            "x-ratelimit-reset-tokens",
+            "x-ratelimit-reset-requests",
+        )
+        if key in headers
+    ]
+    delays = [delay for delay in delays if delay is not None]
+
+    return max(delays) if delays else None
+
+
+async def _aiter(iterable: Iterable[T] | AsyncIterable[T]) -> AsyncIterator[T]:
+    if isinstance(iterable, AsyncIterable):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+def _backoff(attempt: int) -> float:
+    return min(MIN_BACKOFF * 2**attempt, MAX_BACKOFF) * random.uniform(0.5, 1)
+
+
+class TokenBudget:
+    """Tokens per minute per embedding model, shared between processes in redis.
+
+    The budget is counted in fixed one minute windows. A batch larger than the
+    whole budget is still let through in an otherwise empty window. Redis is
+    best effort: if it is unavailable the budget is not enforced.
+    """
+
+    def __init__(self, redis: aioredis.Redis, tokens_per_minute: Optional[int]):
+        self.redis = redis
+        self.tokens_per_minute = tokens_per_minute
+
+    async def acquire(self, embedding_model_id: UUID, tokens: int):
+        if not self.tokens_per_minute:
+            return
+
+        while True:
+            window = int(time.time() // 60)
+            key = f"{KEY_PREFIX}:{embedding_model_id}:{window}"
+
+            try:
+                used = await self.redis.incrby(key, tokens)
+                if used == tokens:
+                    await self.redis.expire(key, 120)
+
+                if used <= self.tokens_per_minute or used == tokens:
+                    return
+
+                await self.redis.decrby(key, tokens)
+            except Exception:
+                logger.warning("Could not use the token budget in redis", exc_info=True)
+                return
+
+            await asyncio.sleep((window + 1) * 60 - time.time())
+
+
+@dataclass
+class _ModelState:
+    semaphore: asyncio.Semaphore
+    resume_at: float = 0
+    rate_limited: int = 0
+
+
+class EmbeddingEngine:
+    """Embeds batches of texts with bounded concurrency per embedding model.
+
+    Rate limit errors pause every request to the model for as long as the
+    provider asks, or with exponential backoff if it does not say.
+    Other errors, except bad requests, are retried with exponential backoff.
+
+    Queries are embedded outside of all this, see `embed_query`.
+    """
+
+    def __init__(
+        self,
+        token_budget: TokenBudget,
+        max_concurrency: int,
+        max_retries: int,
+        max_tokens_per_request: Optional[int] = None,
+    ):
+        self.token_budget = token_budget
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.max_tokens_per_request = max_tokens_per_request
+
+        self._states: dict[UUID, _ModelState] = {}
+
+    def _get_state(self, embedding_model_id: UUID) -> _ModelState:
+        if embedding_model_id not in self._states:
+            self._states[embedding_model_id] = _ModelState(
+                semaphore=asyncio.Semaphore(self.max_concurrency)
+            )
+
+        return self._states[embedding_model_id]
+
+    @staticmethod
+    async def pack_batches(
+        chunks: Iterable[InfoBlobChunk] | AsyncIterable[InfoBlobChunk],
+        max_tokens: Optional[int],
+    ) -> AsyncIterator[tuple[list[InfoBlobChunk], int]]:
+        """Group consecutive chunks into batches of at most `max_tokens` tokens.
+
+        A chunk larger than `max_tokens` gets a batch of its own.
+        Yields the batches together with their token counts.
+        """
+        batch = []
+        batch_tokens = 0
+
+        async for chunk in _aiter(chunks):
+            tokens = (
+                chunk.token_count
+                if chunk.token_count is not None
+                else count_tokens(chunk.text)
+            )
+
+            if batch and (
+                (max_tokens is not None and batch_tokens + tokens > max_tokens)
+                or len(batch) >= MAX_BATCH_SIZE
+            ):
+                yield batch, batch_tokens
+                batch = []
+                batch_tokens = 0
+
+            batch.append(chunk)
+            batch_tokens += tokens
+
+        if batch:
+            yield batch, batch_tokens
+
+    async def embed(
+        self,
+        model: EmbeddingModel,
+        texts: list[str],
+        embed_func: Callable[[list[str]], Awaitable[list[list[float]]]],
+        tokens: Optional[int] = None,
+    ) -> list[list[float]]:
+        """`tokens` is the token count of the texts. It is only counted here,
+        if not given, when there is a token budget to count it against."""
+        state = self._get_state(model.id)
+
+        if tokens is None and self.token_budget.tokens_per_minute:
+            tokens = sum(count_tokens(text) for text in texts)
+
+        attempt = 0
+        async with state.semaphore:
+            while True:
+                delay = state.resume_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                await self.token_budget.acquire(model.id, tokens)
+
+                try:
+                    embeddings = await embed_func(texts)
+                except BadRequestException:
+                    raise
+                except EmbeddingRateLimitException as e:
+                    if attempt >= self.max_retries:
+                        raise
+
+                    delay = (
+                        e.retry_after
+                        if e.retry_after is not None
+                        else _backoff(state.rate_limited)
+                    )
+                    state.rate_limited += 1
+                    state.resume_at = max(state.resume_at, time.monotonic() + delay)
+
+                    logger.warning(
+                        f"Rate limited by {model.name}, pausing for {delay:.1f}s"
+                    )
+                except Exception:
+                    if attempt >= self.max_retries:
+                        raise
+
+                    logger.warning(
+                        f"Embedding with {model.name} failed, retrying", exc_info=True
+                    )
+                    await asyncio.sleep(_backoff(attempt))
+                else:
+                    state.rate_limited = 0
+                    return embeddings
+
+                attempt += 1
+
+    async def embed_query(
+        self,
+        model: EmbeddingModel,
+        text: str,
+        embed_func: Callable[[list[str]], Awaitable[list[list[float]]]],
+    ) -> list[float]:
+        """Embed a query, which someone is waiting for.
+
+        It does not wait for the batches being embedded, nor for the pauses
+        and token budget of the model, and is only retried once, shortly.
+        """
+        try:
+            embeddings = await embed_func([text])
+        except BadRequestException:
+            raise
+        except Exception:
+            logger.warning(
+                f"Embedding a query with {model.name} failed, retrying", exc_info=True
+            )
+            await asyncio.sleep(QUERY_RETRY_DELAY)
+            embeddings = await embed_func([text])
+
+        return embeddings[0]
+
+    async def embed_chunks(
+        self,
+        model: EmbeddingModel,
+        chunks: Iterable[InfoBlobChunk] | AsyncIterable[InfoBlobChunk],
+        embed_func: Callable[[list[str]], Awaitable[list[list[float]]]],
+    ) -> AsyncIterator[tuple[list[InfoBlobChunk], list[list[float]]]]:
+        """Embed the chunks in concurrent batches, yielding them in order.
+
+        The chunks are consumed lazily, and may be produced asynchronously. At most `max_concurrency` batches are
+        in flight at once, which also bounds how many embeddings are held
+        in memory.
+        """
+
+        async def _embed_batch(batch: list[InfoBlobChunk], tokens: int):
+            return await self.embed(
+                model, [chunk.text for chunk in batch], embed_func, tokens=tokens
+            )
+
+        in_flight: deque[tuple[list[InfoBlobChunk], asyncio.Task]] = deque()
+
+        try:
+            # `max_input` is the limit of every input, not of the request
+            async for batch, tokens in self.pack_batches(
+                chunks, self.max_tokens_per_request
+            ):
+                if len(in_flight) >= self.max_concurrency:
+                    done_batch, task = in_flight.popleft()
+                    yield done_batch, await task
+
+                in_flight.append(
+                    (batch, asyncio.create_task(_embed_batch(batch, tokens)))
+                )
+
+            while in_flight:
+                done_batch, task = in_flight.popleft()
+                yield done_batch, await task
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+
+
+embedding_engine = EmbeddingEngine(
+    token_budget=TokenBudget(
+        redis=r, tokens_per_minute=get_settings().embedding_tokens_per_minute
+    ),
+    max_concurrency=get_settings().embedding_max_concurrency,
+    max_retries=get_settings().embedding_max_retries,
+    max_tokens_per_request=get_settings().embedding_max_tokens_per_request,
+)
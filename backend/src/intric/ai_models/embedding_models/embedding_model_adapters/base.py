@@ -1,19 +1,41 @@
 import abc
 from abc import abstractmethod
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
 
+from intric.ai_models.embedding_models.embedding_engine import (
+    EmbeddingEngine,
+    embedding_engine,
+)
 from intric.ai_models.embedding_models.embedding_model import EmbeddingModel
-from intric.files.chunk_embedding_list import ChunkEmbeddingList
 from intric.info_blobs.info_blob import InfoBlobChunk
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class EmbeddingModelAdapter(abc.ABC):
-    def __init__(self, model: EmbeddingModel):
+    def __init__(
+        self, model: EmbeddingModel, engine: EmbeddingEngine = embedding_engine
+    ):
         self.model = model
+        self.engine = engine
 
     @abstractmethod
     async def get_embedding_for_query(self, query: str):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_embeddings(self, chunks: list[InfoBlobChunk]) -> ChunkEmbeddingList:
+    async def _get_embeddings(self, texts: list[str]) -> list[list[float]]:
         raise NotImplementedError
+
+    async def _get_passage_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return await self._get_embeddings(texts)
+
+    async def get_embeddings(
+        self, chunks: Iterable[InfoBlobChunk] | AsyncIterable[InfoBlobChunk]
+    ) -> AsyncIterator[tuple[list[InfoBlobChunk], list[list[float]]]]:
+        async for batch, embeddings in self.engine.embed_chunks(
+            self.model, chunks, self._get_passage_embeddings
+        ):
+            logger.debug(f"Embedded a batch of {len(batch)} chunks")
+            yield batch, embeddings
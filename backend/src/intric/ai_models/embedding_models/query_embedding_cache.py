@@ -0,0 +1,119 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+import numpy as np
+import redis.asyncio as aioredis
+
+from intric.main.config import get_settings
+from intric.main.logging import get_logger
+from intric.worker.redis import r
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "query_embedding"
+
+
+@dataclass
+class QueryEmbeddingCacheStats:
+    local_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return (self.local_hits + self.redis_hits) / lookups if lookups else 0.0
+
+
+class QueryEmbeddingCache:
+    """Embeddings of search queries, keyed by embedding model and text.
+
+    The first tier is an in-process LRU, the second is redis, which is shared
+    between all processes. Both tiers expire entries after `ttl` seconds.
+    Redis is best effort: if it is unavailable the cache only misses.
+    """
+
+    def __init__(self, redis: aioredis.Redis, max_size: int, ttl: int):
+        self.redis = redis
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = QueryEmbeddingCacheStats()
+
+        self._local: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(text.split())
+
+    def _key(self, embedding_model_id: UUID, text: str) -> str:
+        digest = hashlib.sha256(self._normalize(text).encode()).hexdigest()
+        return f"{KEY_PREFIX}:{embedding_model_id}:{digest}"
+
+    def _get_local(self, key: str) -> Optional[list[float]]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+
+        expires_at, embedding = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+
+        self._local.move_to_end(key)
+        return embedding
+
+    def _set_local(self, key: str, embedding: list[float]):
+        if self.max_size <= 0:
+            return
+
+        self._local[key] = (time.monotonic() + self.ttl, embedding)
+        self._local.move_to_end(key)
+
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def get(self, embedding_model_id: UUID, text: str) -> Optional[list[float]]:
+        key = self._key(embedding_model_id, text)
+
+        embedding = self._get_local(key)
+        if embedding is not None:
+            self.stats.local_hits += 1
+            return embedding
+
+        try:
+            value = await self.redis.get(key)
+        except Exception:
+            logger.warning("Could not read query embedding from redis", exc_info=True)
+            value = None
+
+        if value is None:
+            self.stats.misses += 1
+            return None
+
+        embedding = np.frombuffer(value, dtype=np.float32).tolist()
+        self._set_local(key, embedding)
+        self.stats.redis_hits += 1
+
+        return embedding
+
+    async def set(self, embedding_model_id: UUID, text: str, embedding: list[float]):
+        key = self._key(embedding_model_id, text)
+        self._set_local(key, embedding)
+
+        try:
+            await self.redis.set(
+                key, np.asarray(embedding, dtype=np.float32).tobytes(), ex=self.ttl
+            )
+        except Exception:
+            logger.warning("Could not write query embedding to redis", exc_info=True)
+
+
+query_embedding_cache = QueryEmbeddingCache(
+    redis=r,
+    max_size=get_settings().query_embedding_cache_size,
+    ttl=get_settings().query_embedding_cache_ttl,
+)
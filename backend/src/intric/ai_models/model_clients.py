@@ -0,0 +1,164 @@
+from typing import Callable, TypeVar
+
+import httpx
+from anthropic import AsyncAnthropic
+from openai import AsyncAzureOpenAI, AsyncOpenAI
+
+from intric.main.config import get_settings
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class Provider:
+    OPENAI = "openai"
+    AZURE = "azure"
+    ANTHROPIC = "anthropic"
+    VLLM = "vllm"
+
+
+class ModelClients:
+    """The clients of the model providers, shared by every model adapter
+    of the process.
+
+    Every provider has its own pool of kept-alive connections, sized by
+    the settings. The pools of the configured providers are created by
+    `start`, other clients when first used, and all are closed by `stop`.
+    """
+
+    def __init__(self):
+        self._http_clients: dict[str, httpx.AsyncClient] = {}
+        self._clients: dict[str, object] = {}
+
+    def _get_http_client(self, provider: str) -> httpx.AsyncClient:
+        if provider not in self._http_clients:
+            settings = get_settings()
+            max_connections = settings.model_client_max_connections_per_provider.get(
+                provider, settings.model_client_max_connections
+            )
+
+            self._http_clients[provider] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=settings.model_client_keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(
+                    settings.model_client_timeout,
+                    connect=settings.model_client_connect_timeout,
+                ),
+                http2=settings.model_client_http2,
+                proxy=settings.model_client_proxy,
+            )
+
+        return self._http_clients[provider]
+
+    def _get_client(self, name: str, create: Callable[[], T]) -> T:
+        if name not in self._clients:
+            self._clients[name] = create()
+
+        return self._clients[name]
+
+    def start(self):
+        """Create the pools of the configured providers."""
+        settings = get_settings()
+        configured = {
+            Provider.OPENAI: settings.openai_api_key is not None,
+            Provider.AZURE: settings.using_azure_models,
+            Provider.ANTHROPIC: settings.anthropic_api_key is not None,
+            Provider.VLLM: settings.vllm_model_url is not None,
+        }
+
+        for provider, is_configured in configured.items():
+            if is_configured:
+                self._get_http_client(provider)
+
+    async def stop(self):
+        logger.info(f"Model provider connections: {self.get_pool_stats()}")
+
+        http_clients, self._http_clients = self._http_clients, {}
+        self._clients = {}
+
+        for http_client in http_clients.values():
+            await http_client.aclose()
+
+    def get_pool_stats(self) -> dict[str, dict[str, int]]:
+        """The open and idle connections of every provider."""
+        stats = {}
+
+        for provider, http_client in self._http_clients.items():
+            # httpx does not expose its connection pool
+            pool = getattr(http_client._transport, "_pool", None)
+            connections = getattr(pool, "connections", [])
+
+            stats[provider] = dict(
+                connections=len(connections),
+                idle=sum(connection.is_idle() for connection in connections),
+            )
+
+        return stats
+
+    def openai(self) -> AsyncOpenAI:
+        return self._get_client(
+            "openai",
+            lambda: AsyncOpenAI(
+                api_key=get_settings().openai_api_key,
+                http_client=self._get_http_client(Provider.OPENAI),
+            ),
+        )
+
+    def openai_embeddings(self) -> AsyncOpenAI:
+        # Rate limits are retried by the embedding engine
+        return self._get_client(
+            "openai_embeddings",
+            lambda: AsyncOpenAI(
+                api_key=get_settings().openai_api_key,
+                max_retries=0,
+                http_client=self._get_http_client(Provider.OPENAI),
+            ),
+        )
+
+    def whisper(self) -> AsyncOpenAI:
+        return self._get_client(
+            "whisper",
+            lambda: AsyncOpenAI(
+                api_key=get_settings().openai_api_key,
+                base_url=get_settings().whisper_model_url,
+                http_client=self._get_http_client(Provider.OPENAI),
+            ),
+        )
+
+    def azure(self) -> AsyncAzureOpenAI:
+        return self._get_client(
+            "azure",
+            lambda: AsyncAzureOpenAI(
+                api_key=get_settings().azure_api_key,
+                azure_endpoint=get_settings().azure_endpoint,
+                api_version=get_settings().azure_api_version,
+                http_client=self._get_http_client(Provider.AZURE),
+            ),
+        )
+
+    def vllm(self) -> AsyncOpenAI:
+        return self._get_client(
+            "vllm",
+            lambda: AsyncOpenAI(
+                api_key="EMPTY",
+                base_url=get_settings().vllm_model_url,
+                http_client=self._get_http_client(Provider.VLLM),
+            ),
+        )
+
+    def anthropic(self) -> AsyncAnthropic:
+        return self._get_client(
+            "anthropic",
+            lambda: AsyncAnthropic(
+                api_key=get_settings().anthropic_api_key,
+                http_client=self._get_http_client(Provider.ANTHROPIC),
+            ),
+        )
+
+
+model_clients = ModelClients()
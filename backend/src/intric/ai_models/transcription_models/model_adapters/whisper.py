@@ -1,5 +1,8 @@
 # MIT License
 
+import asyncio
+import re
+from collections import deque
 from pathlib import Path
 
 import openai
@@ -11,33 +14,127 @@ from tenacity import (
     wait_random_exponential,
 )
 
-from intric.files.audio import AudioFile
+from intric.ai_models.model_clients import model_clients
+from intric.files import audio
 from intric.main.config import get_settings
 from intric.main.exceptions import BadRequestException, OpenAIException
 from intric.main.logging import get_logger
 
 logger = get_logger(__name__)
 
+SEGMENT_SECONDS = 60 * 5
+# A segment is cut in the quietest moment of its last seconds
+SILENCE_SEARCH_SECONDS = 30
+# Audio that is sent both at the end of a segment and the start of the next
+OVERLAP_SECONDS = 1
+
+# Words at the seams of transcripts that are compared to find the overlap,
+# more than are spoken during the overlap
+MAX_OVERLAP_WORDS = 10
+
+_WORD = re.compile(r"\S+")
+
+
+def _normalize(word: str) -> str:
+    # The end of a sentence is kept, so that a sentence that is repeated
+    # after one ends is not mistaken for the overlap
+    return re.sub(r"[^\w.?!]", "", word.lower())
+
+
+def stitch_transcripts(transcripts: list[str]) -> str:
+    """Join the transcripts of overlapping segments.
+
+    The longest run of words that ends one transcript and starts the next
+    is kept only once. Words are compared without case and punctuation,
+    except for the ends of sentences.
+    """
+    text = ""
+
+    for transcript in transcripts:
+        previous_words = [
+            _normalize(match.group())
+            for match in list(_WORD.finditer(text))[-MAX_OVERLAP_WORDS:]
+        ]
+        matches = list(_WORD.finditer(transcript))[:MAX_OVERLAP_WORDS]
+        words = [_normalize(match.group()) for match in matches]
+
+        overlap = next(
+            (
+                n
+                for n in range(min(len(previous_words), len(words)), 0, -1)
+                if previous_words[-n:] == words[:n]
+            ),
+            0,
+        )
+        if overlap:
+            transcript = transcript[matches[overlap - 1].end() :]
+
+        transcript = transcript.strip()
+        if transcript:
+            text = f"{text} {transcript}" if text else transcript
+
+    return text
+
 
 class OpenAISTTModelAdapter:
+    """Transcribes audio in segments, with at most `max_concurrency`
+    segments being transcribed at once.
+
+    The audio is decoded and split into segments as a stream, while the
+    segments before are transcribed.
+    """
+
     def __init__(
         self,
-        client: AsyncOpenAI = AsyncOpenAI(
-            api_key=get_settings().openai_api_key,
-            base_url=get_settings().whisper_model_url,
-        ),
+        client: AsyncOpenAI | None = None,
+        max_concurrency: int = get_settings().transcription_max_concurrency,
     ):
-        self.client = client
+        self.client = client or model_clients.whisper()
+        self.max_concurrency = max_concurrency
+
+    async def _transcribe_segment(self, path: Path) -> str:
+        try:
+            return await self._get_text_from_file(path)
+        finally:
+            path.unlink(missing_ok=True)
+
+    async def _next_segment(self, segments) -> Path | None:
+        segment = await asyncio.to_thread(next, segments, None)
+        if segment is None:
+            return None
+
+        return await asyncio.to_thread(audio.write_mp3, *segment)
+
+    async def get_text_from_filepath(self, filepath: Path) -> str:
+        segments = audio.split_at_silence(
+            filepath,
+            seconds=SEGMENT_SECONDS,
+            overlap_seconds=OVERLAP_SECONDS,
+            search_seconds=SILENCE_SEARCH_SECONDS,
+        )
+        in_flight: deque[tuple[Path, asyncio.Task]] = deque()
+        transcripts = []
+
+        try:
+            while (path := await self._next_segment(segments)) is not None:
+                if len(in_flight) >= self.max_concurrency:
+                    transcripts.append(await in_flight.popleft()[1])
+
+                in_flight.append(
+                    (path, asyncio.create_task(self._transcribe_segment(path)))
+                )
+
+            while in_flight:
+                transcripts.append(await in_flight.popleft()[1])
+        finally:
+            for path, task in in_flight:
+                task.cancel()
+                path.unlink(missing_ok=True)
+            await asyncio.to_thread(segments.close)
 
-    async def get_text_from_file(self, audio_file: AudioFile):
-        text = ""
-        five_minutes = 60 * 5
-        async with audio_file.asplit_file(seconds=five_minutes) as files:
-            for path in files:
-                block_text = await self._get_text_from_file(path)
-                text = f"{text}{block_text}"
+        logger.debug(f"Transcribed {filepath} in {len(transcripts)} segments")
 
-        return text
+        return stitch_transcripts(transcripts)
 
     @retry(
         wait=wait_random_exponential(min=1, max=20),
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from intric.ai_models.completion_models.context_builder import count_tokens
+from intric.ai_models.completion_models.context_builder import count_output_tokens
 from intric.apps.app_runs.api.app_run_models import AppRunParams
 from intric.apps.app_runs.app_run_factory import AppRunFactory
 from intric.apps.app_runs.app_run_repo import AppRunRepository
@@ -99,12 +99,11 @@ class AppRunService:
 
         response = await self.app_service.run_app(app_id, file_ids=file_ids, text=text)
 
-        # Count the output tokens
-        total_output_tokens = count_tokens(response.completion)
+        total_output_tokens = count_output_tokens(response, response.completion)
 
         app_run.update(
             output=response.completion,
-            num_tokens_input=response.total_token_count,
+            num_tokens_input=response.get_input_token_count(),
             num_tokens_output=total_output_tokens,
         )
 
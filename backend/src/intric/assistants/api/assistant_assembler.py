@@ -84,6 +84,7 @@ class AssistantAssembler:
             completion_model=assistant.completion_model,
             completion_model_kwargs=assistant.completion_model_kwargs,
             logging_enabled=assistant.logging_enabled,
+            search_mode=assistant.search_mode,
             published=assistant.published,
             tools=tools,
             permissions=permissions,
@@ -15,12 +15,14 @@ from intric.ai_models.completion_models.completion_model import (
     CompletionModelSparse,
     ModelKwargs,
 )
+from intric.ai_models.embedding_models.datastore.datastore_models import SearchMode
 from intric.ai_models.embedding_models.embedding_model import EmbeddingModel
 from intric.files.file_models import File, FilePublic, FileRestrictions
 from intric.groups.api.group_models import GroupInDBBase, GroupPublicWithMetadata
-from intric.info_blobs.info_blob import InfoBlobInDBNoText
+from intric.info_blobs.info_blob import InfoBlobReferenceWithScore
 from intric.main.config import get_settings
 from intric.main.models import InDB, ModelId, ResourcePermissionsMixin, partial_model
+from intric.main.timings import Timings
 from intric.prompts.api.prompt_models import PromptCreate, PromptPublic
 from intric.questions.question import Tools, UseTools
 from intric.sessions.session import SessionInDB
@@ -44,6 +46,11 @@ class AssistantBase(BaseModel):
     name: str
     completion_model_kwargs: ModelKwargs = ModelKwargs()
     logging_enabled: bool = False
+    search_mode: SearchMode = Field(
+        description="'hybrid' combines the semantic search with a full-text "
+        "search, which finds exact terms such as case numbers and street names",
+        default=SearchMode.SEMANTIC,
+    )
 
     @field_validator("completion_model_kwargs", mode="before")
     @classmethod
@@ -105,9 +112,10 @@ class AssistantResponse(BaseModel):
     question: str
     files: list[File]
     answer: str | AsyncIterable[str]
-    info_blobs: list[InfoBlobInDBNoText]
+    info_blobs: list[InfoBlobReferenceWithScore]
     completion_model: CompletionModel
     tools: UseTools
+    timings: Optional[Timings] = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -123,6 +131,7 @@ class AssistantPublic(InDB, ResourcePermissionsMixin):
     space_id: UUID
     completion_model_kwargs: ModelKwargs
     logging_enabled: bool
+    search_mode: SearchMode = SearchMode.SEMANTIC
     attachments: list[FilePublic]
     allowed_attachments: FileRestrictions
     groups: list[GroupPublicWithMetadata]
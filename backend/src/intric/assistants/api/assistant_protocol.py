@@ -8,8 +8,8 @@ from intric.database.transaction import gen_transaction
 from intric.files.file_models import File, FilePublic
 from intric.info_blobs.info_blob import (
     InfoBlobAskAssistantPublic,
-    InfoBlobInDB,
     InfoBlobMetadata,
+    InfoBlobReferenceWithScore,
 )
 from intric.main.logging import get_logger
 from intric.questions.question import UseTools
@@ -26,7 +26,7 @@ def to_ask_response(
     files: list[File],
     session: SessionInDB,
     answer: str,
-    info_blobs: list[InfoBlobInDB],
+    info_blobs: list[InfoBlobReferenceWithScore],
     completion_model: Optional[CompletionModel] = None,
     tools: "UseTools" = None,
 ):
@@ -56,18 +56,36 @@ async def to_response(
 
         @gen_transaction(db_session)
         async def event_stream():
+            ask_response = None
+            last_references = None
+
             async for references, chunk in response.answer:
-                yield to_ask_response(
-                    question=response.question,
-                    files=response.files,
-                    session=response.session,
-                    answer=chunk,
-                    info_blobs=references,
-                    completion_model=response.completion_model,
-                    tools=response.tools,
-                ).model_dump_json()
+                # The references are a new list only when they change, and
+                # are converted only then
+                if references is not last_references:
+                    ask_response = to_ask_response(
+                        question=response.question,
+                        files=response.files,
+                        session=response.session,
+                        answer=chunk,
+                        info_blobs=references,
+                        completion_model=response.completion_model,
+                        tools=response.tools,
+                    )
+                    last_references = references
+                else:
+                    ask_response.answer = chunk
+
+                yield ask_response.model_dump_json()
+
+        # The stages before the answer starts streaming
+        headers = (
+            {"Server-Timing": response.timings.to_server_timing()}
+            if response.timings is not None
+            else None
+        )
 
-        return EventSourceResponse(event_stream())
+        return EventSourceResponse(event_stream(), headers=headers)
 
     return to_ask_response(
         question=response.question,
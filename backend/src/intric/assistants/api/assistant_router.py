@@ -54,6 +54,7 @@ async def create_assistant(
         space_id=assistant.space_id,
         completion_model_kwargs=assistant.completion_model_kwargs,
         logging_enabled=assistant.logging_enabled,
+        search_mode=assistant.search_mode,
         groups=[group.id for group in assistant.groups],
         websites=[website.id for website in assistant.websites],
         completion_model_id=assistant.completion_model.id,
@@ -141,6 +142,7 @@ async def update_assistant(
         completion_model_id=completion_model_id,
         completion_model_kwargs=completion_model_kwargs,
         logging_enabled=assistant.logging_enabled,
+        search_mode=assistant.search_mode,
         attachment_ids=attachment_ids,
         groups=groups,
         websites=websites,
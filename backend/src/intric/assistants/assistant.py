@@ -7,6 +7,7 @@ from intric.ai_models.completion_models.completion_model import (
     ModelKwargs,
 )
 from intric.ai_models.completion_models.completion_service import CompletionService
+from intric.ai_models.embedding_models.datastore.datastore_models import SearchMode
 from intric.files.file_models import File, FileInfo, FileType
 from intric.files.text import TextMimeTypes
 from intric.groups.api.group_models import Group
@@ -16,6 +17,7 @@ from intric.main.exceptions import (
     NoModelSelectedException,
     UnauthorizedException,
 )
+from intric.main.timings import Timings
 from intric.prompts.prompt import Prompt
 from intric.sessions.session import SessionInDB
 from intric.users.user import UserSparse
@@ -51,6 +53,7 @@ class Assistant:
         references_service: Optional["ReferencesService"] = None,
         is_default: bool = False,
         tool_assistants: list["Assistant"] = None,
+        search_mode: SearchMode = SearchMode.SEMANTIC,
     ):
         self.id = id
         self.user = user
@@ -71,6 +74,7 @@ class Assistant:
         self.published = published
         self.is_default = is_default
         self.tool_assistants = tool_assistants or []
+        self.search_mode = search_mode
 
     def _validate_embedding_model(self, items: list[Group] | list[WebsiteSparse]):
         embedding_model_id_set = set([item.embedding_model.id for item in items])
@@ -178,6 +182,7 @@ class Assistant:
         groups: list[Group] | None = None,
         websites: list[WebsiteSparse] | None = None,
         published: bool | None = None,
+        search_mode: SearchMode | None = None,
     ):
         if name is not None:
             self.name = name
@@ -200,6 +205,9 @@ class Assistant:
         if published is not None:
             self.published = published
 
+        if search_mode is not None:
+            self.search_mode = search_mode
+
         self._set_groups_and_websites(groups=groups, websites=websites)
 
     def get_prompt_text(self):
@@ -234,6 +242,18 @@ class Assistant:
             model_kwargs=model_kwargs,
         )
 
+    async def embed_question(
+        self, question: str, session: Optional["SessionInDB"] = None
+    ) -> Optional[list[float]]:
+        """The embedding to search the knowledge of the assistant with,
+        or None if it has no knowledge."""
+        return await self.references_service.embed_question(
+            question=question,
+            session=session,
+            groups=self.groups,
+            websites=self.websites,
+        )
+
     async def ask(
         self,
         question: str,
@@ -241,6 +261,8 @@ class Assistant:
         files: list["File"] = [],
         stream: bool = False,
         version: int = 1,
+        question_embedding: Optional[list[float]] = None,
+        timings: Optional["Timings"] = None,
     ):
         if any([file.file_type == FileType.IMAGE for file in files]):
             if not self.completion_model.vision:
@@ -248,31 +270,37 @@ class Assistant:
                     f"Completion model {self.completion_model.name} do not support vision."
                 )
 
+        timings = timings or Timings()
+
         # Fill half the context
         num_chunks = (
             self.completion_model.token_limit // 200 // 2 if version == 2 else 30
         )
 
-        datastore_result = await self.references_service.get_references(
-            question=question,
-            session=session,
-            groups=self.groups,
-            websites=self.websites,
-            num_chunks=num_chunks,
-            version=version,
-        )
+        with timings.measure("retrieval"):
+            datastore_result = await self.references_service.get_references(
+                question=question,
+                session=session,
+                groups=self.groups,
+                websites=self.websites,
+                num_chunks=num_chunks,
+                version=version,
+                search_mode=self.search_mode,
+                question_embedding=question_embedding,
+            )
 
-        response = await self.completion_service.get_response(
-            text_input=question,
-            files=files,
-            prompt=self.get_prompt_text(),
-            prompt_files=self.attachments,
-            info_blob_chunks=datastore_result.chunks,
-            session=session,
-            stream=stream,
-            extended_logging=self.logging_enabled,
-            model_kwargs=self.completion_model_kwargs,
-            version=version,
-        )
+        with timings.measure("completion"):
+            response = await self.completion_service.get_response(
+                text_input=question,
+                files=files,
+                prompt=self.get_prompt_text(),
+                prompt_files=self.attachments,
+                info_blob_chunks=datastore_result.chunks,
+                session=session,
+                stream=stream,
+                extended_logging=self.logging_enabled,
+                model_kwargs=self.completion_model_kwargs,
+                version=version,
+            )
 
         return response, datastore_result
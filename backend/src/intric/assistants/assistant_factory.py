@@ -14,6 +14,7 @@ from intric.ai_models.completion_models.completion_model_adapters import (
     OpenAIModelAdapter,
     VLMMModelAdapter,
 )
+from intric.ai_models.embedding_models.datastore.datastore_models import SearchMode
 from intric.ai_models.embedding_models.embedding_model import (
     EmbeddingModel,
     EmbeddingModelFamily,
@@ -112,6 +113,7 @@ class AssistantFactory:
         groups: list["Group"] | None = None,
         template: AssistantTemplate | None = None,
         is_default: bool = False,
+        search_mode: SearchMode = SearchMode.SEMANTIC,
     ) -> Assistant:
         return Assistant(
             id=None,
@@ -128,6 +130,7 @@ class AssistantFactory:
             published=False,
             source_template=template,
             is_default=is_default,
+            search_mode=search_mode,
         )
 
     def create_assistant_from_db(
@@ -214,4 +217,5 @@ class AssistantFactory:
             published=assistant_in_db.published,
             source_template=source_template,
             is_default=assistant_in_db.is_default,
+            search_mode=assistant_in_db.search_mode,
         )
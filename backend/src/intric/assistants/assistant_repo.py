@@ -235,6 +235,7 @@ class AssistantRepository:
                 completion_model_id=completion_model_id,
                 completion_model_kwargs=assistant.completion_model_kwargs.model_dump(),
                 logging_enabled=assistant.logging_enabled,
+                search_mode=assistant.search_mode,
                 guardrail_active=False,
                 space_id=assistant.space_id,
                 is_default=assistant.is_default,
@@ -310,6 +311,7 @@ class AssistantRepository:
                 completion_model_id=assistant.completion_model.id,
                 completion_model_kwargs=assistant.completion_model_kwargs.model_dump(),
                 logging_enabled=assistant.logging_enabled,
+                search_mode=assistant.search_mode,
                 space_id=assistant.space_id,
                 published=assistant.published,
             )
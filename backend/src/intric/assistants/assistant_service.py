@@ -1,10 +1,12 @@
+import asyncio
 import re
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
 from intric.ai_models.completion_models.completion_model import ModelKwargs
-from intric.ai_models.completion_models.context_builder import count_tokens
+from intric.ai_models.completion_models.context_builder import count_output_tokens
+from intric.ai_models.embedding_models.datastore.datastore_models import SearchMode
 from intric.assistants.api.assistant_models import AssistantResponse
 from intric.assistants.assistant import Assistant
 from intric.assistants.assistant_factory import AssistantFactory
@@ -13,7 +15,9 @@ from intric.authentication.auth_service import AuthService
 from intric.files.file_service import FileService
 from intric.groups.group_service import GroupService
 from intric.main.exceptions import BadRequestException, UnauthorizedException
+from intric.main.logging import get_logger
 from intric.main.models import ModelId
+from intric.main.timings import Timings
 from intric.prompts.api.prompt_models import PromptCreate
 from intric.prompts.prompt import Prompt
 from intric.prompts.prompt_service import PromptService
@@ -49,6 +53,8 @@ if TYPE_CHECKING:
     from intric.spaces.space import Space
     from intric.spaces.space_repo import SpaceRepository
 
+logger = get_logger(__name__)
+
 AT_TAG_PATTERN = r"<intric-at-tag: @[^>]+>"
 REFERENCE_PATTERN = r'<inref id="([0-9a-f]{8})"/>'  # noqa
 
@@ -57,6 +63,20 @@ def clean_intric_tag(input_string: str):
     return re.sub(AT_TAG_PATTERN, '', input_string)
 
 
+# The longest a reference can be, for keeping a reference that is split
+# between chunks of a streamed answer
+REFERENCE_LENGTH = len('<inref id="00000000"/>')
+
+
+def _get_blobs_by_id_prefix(info_blobs: list, get_id_func) -> dict:
+    blobs_by_id_prefix = {}
+    for blob in info_blobs:
+        # The first blob is the one referenced if the prefixes collide
+        blobs_by_id_prefix.setdefault(str(get_id_func(blob))[:8], blob)
+
+    return blobs_by_id_prefix
+
+
 def get_references(
     response_string: str,
     info_blobs: list["InfoBlobChunkInDBWithScore"],
@@ -68,17 +88,66 @@ def get_references(
 
     # Preserve order, remove duplicates
     info_blob_ids = list(dict.fromkeys(re.findall(REFERENCE_PATTERN, response_string)))
+    blobs_by_id_prefix = _get_blobs_by_id_prefix(info_blobs, get_id_func)
 
-    def _get_blob(blob_id):
-        return next(
-            (blob for blob in info_blobs if str(get_id_func(blob))[:8] == blob_id), None
-        )
-
-    blobs = [_get_blob(blob_id) for blob_id in info_blob_ids]
+    blobs = [blobs_by_id_prefix.get(blob_id) for blob_id in info_blob_ids]
 
     return [blob for blob in blobs if blob is not None]
 
 
+class ReferenceTracker:
+    """The references of an answer as it is streamed, the same as
+    `get_references` of the answer so far.
+
+    Only the text that is new is scanned, together with the end of the
+    text before if it can be the start of a reference.
+    """
+
+    def __init__(
+        self,
+        info_blobs: list["InfoBlobChunkInDBWithScore"],
+        version: int = 1,
+        get_id_func=lambda blob: blob.id,
+    ):
+        self.version = version
+        self.references = list(info_blobs) if version == 1 else []
+
+        self._blobs_by_id_prefix = _get_blobs_by_id_prefix(info_blobs, get_id_func)
+        self._ids = set()
+        self._rest = ""
+
+    def add(self, chunk: str) -> bool:
+        """Scan the chunk, returning whether new references were found."""
+        if self.version == 1:
+            return False
+
+        text = f"{self._rest}{chunk}"
+        found = False
+        end = 0
+
+        for match in re.finditer(REFERENCE_PATTERN, text):
+            end = match.end()
+            blob_id = match.group(1)
+
+            if blob_id in self._ids:
+                continue
+            self._ids.add(blob_id)
+
+            blob = self._blobs_by_id_prefix.get(blob_id)
+            if blob is not None:
+                self.references.append(blob)
+                found = True
+
+        # A reference can not contain "<", so only the last one can start
+        # a reference that the next chunk completes
+        start = text.rfind("<", end)
+        self._rest = (
+            text[start:] if start != -1 and len(text) - start < REFERENCE_LENGTH else ""
+        )
+
+        return found
+
+
 class AssistantService:
     def __init__(
         self,
@@ -143,6 +212,7 @@ class AssistantService:
         logging_enabled: bool = False,
         groups: list[UUID] = [],
         websites: list[UUID] = [],
+        search_mode: SearchMode = SearchMode.SEMANTIC,
     ):
         if logging_enabled:
             validate_permission(self.user, Permission.ADMIN)
@@ -161,6 +231,7 @@ class AssistantService:
             completion_model_kwargs=completion_model_kwargs,
             logging_enabled=logging_enabled,
             user=self.user,
+            search_mode=search_mode,
         )
 
         # completion model
@@ -307,6 +378,7 @@ class AssistantService:
         groups: list[UUID] | None = None,
         websites: list[UUID] | None = None,
         attachment_ids: list[UUID] | None = None,
+        search_mode: SearchMode | None = None,
     ):
         if logging_enabled:
             validate_permission(self.user, Permission.ADMIN)
@@ -353,6 +425,7 @@ class AssistantService:
             logging_enabled=logging_enabled,
             groups=groups,
             websites=websites,
+            search_mode=search_mode,
         )
 
         self.validate_space_assistant(space=space, assistant=assistant)
@@ -499,17 +572,23 @@ class AssistantService:
         if stream:
 
             async def response_stream():
-                response_string = ""
+                chunks = []
+                references = ReferenceTracker(
+                    info_blobs=datastore_result.info_blobs, version=version
+                )
+                reference_chunks = list(references.references)
+
                 async for chunk in response.completion:
-                    response_string = f"{response_string}{chunk}"
-                    reference_chunks = get_references(
-                        response_string=response_string,
-                        info_blobs=datastore_result.info_blobs,
-                        version=version,
-                    )
+                    chunks.append(chunk)
+
+                    # A new list only when the references change
+                    if references.add(chunk):
+                        reference_chunks = list(references.references)
 
                     yield reference_chunks, chunk
 
+                response_string = "".join(chunks)
+
                 # Get the references for the whole response
                 reference_chunks = get_references(
                     response_string=response_string,
@@ -518,12 +597,14 @@ class AssistantService:
                     get_id_func=lambda chunk: chunk.info_blob_id,
                 )
 
-                total_response_tokens = count_tokens(response_string)
+                # The usage is reported when the stream ends
+                total_response_tokens = count_output_tokens(response, response_string)
                 await self.session_service.add_question_to_session(
                     question=question,
                     answer=response_string,
-                    num_tokens_question=response.total_token_count,
+                    num_tokens_question=response.get_input_token_count(),
                     num_tokens_answer=total_response_tokens,
+                    num_tokens_input=response.input_token_count,
                     files=files,
                     completion_model=completion_model,
                     info_blob_chunks=reference_chunks,
@@ -541,12 +622,13 @@ class AssistantService:
                 version=version,
                 get_id_func=lambda chunk: chunk.info_blob_id,
             )
-            total_response_tokens = count_tokens(answer)
+            total_response_tokens = count_output_tokens(response, answer)
             await self.session_service.add_question_to_session(
                 question=question,
                 answer=answer,
-                num_tokens_question=response.total_token_count,
+                num_tokens_question=response.get_input_token_count(),
                 num_tokens_answer=total_response_tokens,
+                num_tokens_input=response.input_token_count,
                 files=files,
                 completion_model=completion_model,
                 info_blob_chunks=reference_chunks,
@@ -578,6 +660,16 @@ class AssistantService:
                     f"Embedding Model {item.embedding_model.name} is not in space."
                 )
 
+    @staticmethod
+    async def _embed_question(
+        assistant: Assistant,
+        question: str,
+        session: Optional["SessionInDB"],
+        timings: Timings,
+    ):
+        with timings.measure("embedding"):
+            return await assistant.embed_question(question=question, session=session)
+
     async def ask(
         self,
         question: str,
@@ -588,45 +680,81 @@ class AssistantService:
         tool_assistant_id: Optional["UUID"] = None,
         version: int = 1,
     ):
-        space = await self.space_repo.get_space_by_assistant(assistant_id=assistant_id)
-        active_assistant = space.get_assistant(assistant_id=assistant_id)
-        actor = self.actor_manager.get_space_actor_from_space(space=space)
+        timings = Timings()
 
-        if not actor.can_read_assistant(assistant=active_assistant):
-            raise UnauthorizedException()
+        with timings.measure("authorisation"):
+            # Only what is needed to authorise the user and check the models,
+            # not the whole space
+            space = await self.space_repo.get_sparse_space_by_assistant(
+                assistant_id=assistant_id
+            )
+            active_assistant = await self.repo.get_by_id(assistant_id)
+            actor = self.actor_manager.get_space_actor_from_space(space=space)
 
-        await self._check_assistant_models(assistant=active_assistant, space=space)
+            if not actor.can_read_assistant(assistant=active_assistant):
+                raise UnauthorizedException()
 
-        if tool_assistant_id is not None:
-            tool_assistant = space.get_assistant(assistant_id=tool_assistant_id)
-            if tool_assistant_id not in [
-                assistant.id for assistant in active_assistant.tool_assistants
-            ]:
-                raise BadRequestException()
+            await self._check_assistant_models(assistant=active_assistant, space=space)
 
-            assistant_to_ask = tool_assistant
-        else:
-            assistant_to_ask = active_assistant
+            if tool_assistant_id is not None:
+                tool_assistant = await self.repo.get_by_id(tool_assistant_id)
+
+                # The other assistants of the space are the tools of the
+                # default assistant
+                if (
+                    not active_assistant.is_default
+                    or tool_assistant is None
+                    or tool_assistant.space_id != space.id
+                    or tool_assistant.is_default
+                ):
+                    raise BadRequestException()
+
+                assistant_to_ask = tool_assistant
+            else:
+                assistant_to_ask = active_assistant
 
         cleaned_question = clean_intric_tag(question)
-        files = await self.file_service.get_files_by_ids(file_ids=file_ids)
 
+        # The database session runs one query at a time, so the session and
+        # files are loaded one after the other. The question is embedded
+        # meanwhile, as soon as the conversation it is embedded with is known
+        session = None
         if session_id is not None:
-            session = await self.session_service.get_session_by_uuid(
-                id=session_id, assistant_id=assistant_id
-            )
-        else:
-            # Set the name as the question or the filenames
-            name = question
-            if not name and files:
-                name = " ".join(file.name for file in files)
+            with timings.measure("session"):
+                session = await self.session_service.get_conversation_window(
+                    id=session_id, assistant_id=assistant_id
+                )
 
-            session = await self.session_service.create_session(
-                name=name, assistant=active_assistant
+            for _question in session.questions:
+                _question.question = clean_intric_tag(_question.question)
+
+        embedding_task = asyncio.create_task(
+            self._embed_question(
+                assistant=assistant_to_ask,
+                question=cleaned_question,
+                session=session,
+                timings=timings,
             )
+        )
 
-        for _question in session.questions:
-            _question.question = clean_intric_tag(_question.question)
+        try:
+            with timings.measure("files"):
+                files = await self.file_service.get_files_by_ids(file_ids=file_ids)
+
+            if session is None:
+                # Set the name as the question or the filenames
+                name = question
+                if not name and files:
+                    name = " ".join(file.name for file in files)
+
+                with timings.measure("session"):
+                    session = await self.session_service.create_session(
+                        name=name, assistant=active_assistant
+                    )
+
+            question_embedding = await embedding_task
+        finally:
+            embedding_task.cancel()
 
         response, datastore_result = await assistant_to_ask.ask(
             question=cleaned_question,
@@ -634,8 +762,12 @@ class AssistantService:
             files=files,
             stream=stream,
             version=version,
+            question_embedding=question_embedding,
+            timings=timings,
         )
 
+        logger.debug(f"Asked assistant {assistant_to_ask.id}: {timings}")
+
         # TODO: Separate the response based on stream true or false
 
         answer = await self._handle_response(
@@ -671,6 +803,7 @@ class AssistantService:
                 if tool_assistant_id is not None
                 else UseTools(assistants=[])
             ),
+            timings=timings,
         )
 
         return final_response
@@ -1,8 +1,9 @@
 from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
+from intric.ai_models.embedding_models.datastore.datastore_models import SearchMode
 from intric.files.file_models import FileType
-from intric.info_blobs.info_blob import InfoBlobInDBWithScore
+from intric.info_blobs.info_blob import InfoBlobReferenceWithScore
 from intric.services.service import DatastoreResult
 
 if TYPE_CHECKING:
@@ -36,6 +37,9 @@ class ReferencesService:
         websites: list["Website"],
         num_chunks: Optional[int] = None,
         version: int = 1,
+        search_mode: SearchMode = SearchMode.SEMANTIC,
+        keyword_search_string: Optional[str] = None,
+        search_string_embedding: Optional[list[float]] = None,
     ) -> list["InfoBlobChunkInDBWithScore"]:
         if (groups or websites) and input_string:
             if version == 1:
@@ -44,23 +48,33 @@ class ReferencesService:
                 search_params = dict(autocut_cutoff=None, num_chunks=num_chunks)
 
             return await self.datastore.semantic_search(
-                input_string, groups, websites, **search_params
+                input_string,
+                groups,
+                websites,
+                search_mode=search_mode,
+                keyword_search_string=keyword_search_string,
+                search_string_embedding=search_string_embedding,
+                **search_params,
             )
 
         return []
 
     async def _get_info_blobs_from_chunks(
         self, info_blob_chunks: list["InfoBlobChunkInDBWithScore"]
-    ) -> list["InfoBlobInDBWithScore"]:
-        info_blobs = []
-        for chunk in info_blob_chunks:
-            info_blob = await self.info_blobs_repo.get(chunk.info_blob_id)
-            info_blob = InfoBlobInDBWithScore(
-                **info_blob.model_dump(), score=chunk.score
-            )
-            info_blobs.append(info_blob)
+    ) -> list["InfoBlobReferenceWithScore"]:
+        info_blobs = await self.info_blobs_repo.get_many(
+            [chunk.info_blob_id for chunk in info_blob_chunks]
+        )
+        info_blobs_by_id = {info_blob.id: info_blob for info_blob in info_blobs}
 
-        return info_blobs
+        # Keep the order of the chunks, which is the order of relevance
+        return [
+            InfoBlobReferenceWithScore(
+                **info_blobs_by_id[chunk.info_blob_id].model_dump(), score=chunk.score
+            )
+            for chunk in info_blob_chunks
+            if chunk.info_blob_id in info_blobs_by_id
+        ]
 
     def _get_info_blob_chunks_without_duplicates(
         self, info_blob_chunks: list["InfoBlobChunkInDBWithScore"]
@@ -115,6 +129,44 @@ class ReferencesService:
 
         return f"{files_text}{session_text}{question}".strip()
 
+    def _get_input_string(
+        self,
+        question: str,
+        session: Optional["SessionInDB"] = None,
+        files: list["File"] = [],
+        embed_method: EmbedMethod = EmbedMethod.CONCATENATE,
+    ):
+        if embed_method == EmbedMethod.CONCATENATE:
+            return self._concatenate_conversation(
+                question=question, session=session, files=files
+            )
+        elif embed_method == EmbedMethod.LAST_QUESTION:
+            return question
+
+    async def embed_question(
+        self,
+        question: str,
+        session: Optional["SessionInDB"] = None,
+        files: list["File"] = [],
+        groups: list["Group"] = [],
+        websites: list["Website"] = [],
+        embed_method: EmbedMethod = EmbedMethod.CONCATENATE,
+    ) -> Optional[list[float]]:
+        """The embedding that `get_references` searches with, or None if
+        there is nothing to search.
+
+        Embedding does not use the database, so it can be done while
+        the database is used for something else.
+        """
+        input_string = self._get_input_string(
+            question=question, session=session, files=files, embed_method=embed_method
+        )
+
+        if not (groups or websites) or not input_string:
+            return None
+
+        return await self.datastore.embed_query(input_string)
+
     async def get_references(
         self,
         question: str,
@@ -125,16 +177,24 @@ class ReferencesService:
         embed_method: EmbedMethod = EmbedMethod.CONCATENATE,
         num_chunks: Optional[int] = None,
         version: int = 1,
+        search_mode: SearchMode = SearchMode.SEMANTIC,
+        question_embedding: Optional[list[float]] = None,
     ) -> "DatastoreResult":
-        if embed_method == EmbedMethod.CONCATENATE:
-            input_string = self._concatenate_conversation(
-                question=question, session=session, files=files
-            )
-        elif embed_method == EmbedMethod.LAST_QUESTION:
-            input_string = question
+        input_string = self._get_input_string(
+            question=question, session=session, files=files, embed_method=embed_method
+        )
 
+        # Exact terms are looked for in the question only,
+        # not in the whole conversation
         chunks = await self._query_datastore_if_groups_or_websites(
-            input_string, groups, websites, num_chunks=num_chunks, version=version
+            input_string,
+            groups,
+            websites,
+            num_chunks=num_chunks,
+            version=version,
+            search_mode=search_mode,
+            keyword_search_string=question,
+            search_string_embedding=question_embedding,
         )
         no_duplicate_chunks = self._get_info_blob_chunks_without_duplicates(chunks)
         info_blobs = await self._get_info_blobs_from_chunks(no_duplicate_chunks)
@@ -1,15 +1,17 @@
 import asyncio
-import json
-import os
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from tempfile import NamedTemporaryFile, TemporaryDirectory
-from typing import Iterable, Optional
+from tempfile import TemporaryDirectory
+from typing import AsyncIterator, Callable, Iterable, Optional
 
 import crochet
+from scrapy import signals
+from scrapy.crawler import Crawler as ScrapyCrawler
 from scrapy.crawler import CrawlerRunner
+from twisted.internet import defer, reactor
 
+from intric.crawler.middlewares import HttpValidators
 from intric.crawler.parse_html import CrawledPage
 from intric.crawler.pipelines import FileNamePipeline
 from intric.crawler.spiders.crawl_spider import CrawlSpider
@@ -18,16 +20,19 @@ from intric.main.config import SETTINGS
 from intric.main.exceptions import CrawlerException
 from intric.websites.crawl_dependencies.crawl_models import CrawlType
 
+# Pages scraped but not yet taken by the ingestion,
+# when full the crawl waits for the ingestion to catch up
+PAGES_QUEUE_SIZE = 32
+
 
 @dataclass
 class Crawl:
-    pages: Iterable[CrawledPage]
+    pages: AsyncIterator[CrawledPage]
     files: Optional[Iterable[Path]]
 
 
-def create_runner(filepath: str, files_dir: Optional[str] = None):
+def create_runner(files_dir: Optional[str] = None):
     settings = {
-        "FEEDS": {filepath: {"format": "jsonl", "item_classes": [CrawledPage]}},
         "CLOSESPIDER_ITEMCOUNT": SETTINGS.closespider_itemcount,
         "AUTOTHROTTLE_ENABLED": SETTINGS.autothrottle_enabled,
         "ROBOTSTXT_OBEY": SETTINGS.obey_robots,
@@ -41,6 +46,27 @@ def create_runner(filepath: str, files_dir: Optional[str] = None):
     return CrawlerRunner(settings=settings)
 
 
+def _run_spider(
+    runner: CrawlerRunner,
+    spider_cls: type,
+    on_page: Callable[[CrawledPage], defer.Deferred],
+    on_crawler: Callable[[ScrapyCrawler], None],
+    **kwargs,
+):
+    def _on_item_scraped(item):
+        if isinstance(item, CrawledPage):
+            return on_page(item)
+
+    crawler = runner.create_crawler(spider_cls)
+    # Signal receivers are weakly referenced by default
+    crawler.signals.connect(_on_item_scraped, signal=signals.item_scraped, weak=False)
+
+    crawl = runner.crawl(crawler, **kwargs)
+    on_crawler(crawler)
+
+    return crawl
+
+
 class Crawler:
     @crochet.wait_for(SETTINGS.crawl_max_length)
     @staticmethod
@@ -48,45 +74,131 @@ class Crawler:
         url: str,
         download_files: bool = False,
         *,
-        filepath: Path,
         files_dir: Optional[Path],
+        on_page: Callable[[CrawledPage], defer.Deferred],
+        on_crawler: Callable[[ScrapyCrawler], None],
     ):
         files_dir = files_dir if download_files else None
-        runner = create_runner(filepath=filepath, files_dir=files_dir)
-        return runner.crawl(CrawlSpider, url=url)
+        runner = create_runner(files_dir=files_dir)
+        return _run_spider(runner, CrawlSpider, on_page, on_crawler, url=url)
 
     @crochet.wait_for(SETTINGS.crawl_max_length)
     @staticmethod
     def _run_sitemap_crawl(
-        sitemap_url: str, *, filepath: Path, files_dir: Optional[Path]
+        sitemap_url: str,
+        *,
+        files_dir: Optional[Path],
+        on_page: Callable[[CrawledPage], defer.Deferred],
+        on_crawler: Callable[[ScrapyCrawler], None],
+        http_validators: dict[str, HttpValidators],
     ):
-        runner = create_runner(filepath=filepath)
-        return runner.crawl(SitemapSpider, sitemap_url=sitemap_url)
+        runner = create_runner()
+        return _run_spider(
+            runner,
+            SitemapSpider,
+            on_page,
+            on_crawler,
+            sitemap_url=sitemap_url,
+            http_validators=http_validators,
+        )
 
     @asynccontextmanager
     async def _crawl(self, func, **kwargs):
-        with NamedTemporaryFile() as tmp_file:
-            with TemporaryDirectory() as tmp_dir:
-                await asyncio.to_thread(
-                    func, filepath=tmp_file.name, files_dir=tmp_dir, **kwargs
+        """Pages are yielded while the crawl is still running.
+
+        The crawl runs in the reactor thread, every scraped page is handed
+        over to the event loop through a bounded queue. Files are only
+        available once all pages have been yielded. If the pages are not
+        all taken, the crawl is stopped.
+        """
+        loop = asyncio.get_running_loop()
+        pages: asyncio.Queue[CrawledPage] = asyncio.Queue(maxsize=PAGES_QUEUE_SIZE)
+
+        stopped = False
+        crawlers: list[ScrapyCrawler] = []
+
+        def _on_crawler(crawler: ScrapyCrawler):
+            # Called in the reactor thread, possibly after the crawl was stopped
+            crawlers.append(crawler)
+            if stopped:
+                crawler.stop()
+
+        def _stop_crawlers():
+            for crawler in crawlers:
+                crawler.stop()
+
+        def _on_page(page: CrawledPage) -> defer.Deferred:
+            if stopped:
+                return defer.succeed(None)
+
+            # Called in the reactor thread. Scrapy waits for the deferred
+            # before the item counts as processed, which holds the crawl
+            # back while the queue is full.
+            done = defer.Deferred()
+            future = asyncio.run_coroutine_threadsafe(pages.put(page), loop)
+            future.add_done_callback(
+                lambda _: reactor.callFromThread(done.callback, None)
+            )
+
+            return done
+
+        with TemporaryDirectory() as tmp_dir:
+            crawl_task = asyncio.create_task(
+                asyncio.to_thread(
+                    func,
+                    files_dir=tmp_dir,
+                    on_page=_on_page,
+                    on_crawler=_on_crawler,
+                    **kwargs,
                 )
+            )
+
+            async def _iter_pages():
+                page_count = 0
+
+                while True:
+                    next_page = asyncio.ensure_future(pages.get())
+                    await asyncio.wait(
+                        {next_page, crawl_task}, return_when=asyncio.FIRST_COMPLETED
+                    )
+
+                    if next_page.done():
+                        page_count += 1
+                        yield next_page.result()
+                        continue
+
+                    next_page.cancel()
+                    break
+
+                # Every page is in the queue once the crawl is done
+                while not pages.empty():
+                    page_count += 1
+                    yield pages.get_nowait()
+
+                crawl_task.result()
 
-                # If the result file is empty
                 # (This will fail if the expected result is no pages but some files)
-                if os.stat(tmp_file.name).st_size == 0:
+                if page_count == 0:
                     raise CrawlerException("Crawl failed")
 
-                def _iter_pages():
-                    with open(tmp_file.name) as f:
-                        for line in f:
-                            jsonl = json.loads(line)
-                            yield CrawledPage(**jsonl)
-
-                def _iter_files():
-                    p = Path(tmp_dir)
-                    return p.iterdir()
+            def _iter_files():
+                p = Path(tmp_dir)
+                return p.iterdir()
 
+            try:
                 yield Crawl(pages=_iter_pages(), files=_iter_files())
+            finally:
+                # If the pages were not all taken, stop the crawl in the reactor
+                # thread, and drop the pages scraped until it has stopped
+                stopped = True
+                if not crawl_task.done():
+                    reactor.callFromThread(_stop_crawlers)
+
+                while not crawl_task.done():
+                    while not pages.empty():
+                        pages.get_nowait()
+
+                    await asyncio.wait({crawl_task}, timeout=1)
 
     @asynccontextmanager
     async def crawl(
@@ -94,7 +206,10 @@ class Crawler:
         url: str,
         download_files: bool = False,
         crawl_type: CrawlType = CrawlType.CRAWL,
+        http_validators: dict[str, HttpValidators] = {},
     ):
+        """`http_validators` make requests for the pages conditional,
+        only sitemap crawls use them."""
         if crawl_type == CrawlType.CRAWL:
             async with self._crawl(
                 self._run_crawl,
@@ -105,7 +220,9 @@ class Crawler:
 
         elif crawl_type == CrawlType.SITEMAP:
             async with self._crawl(
-                self._run_sitemap_crawl, sitemap_url=url
+                self._run_sitemap_crawl,
+                sitemap_url=url,
+                http_validators=http_validators,
             ) as crawl_result:
                 yield crawl_result
 
@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import scrapy
+
+
+@dataclass
+class HttpValidators:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class ConditionalRequestMiddleware:
+    """Makes the requests for pages that were crawled before conditional.
+
+    Spiders opt in with a `http_validators` attribute, mapping urls to the
+    validators the pages were served with, and need to handle 304 responses.
+    """
+
+    def process_request(self, request: scrapy.Request, spider: scrapy.Spider):
+        validators = getattr(spider, "http_validators", {}).get(request.url)
+
+        if validators is None:
+            return None
+
+        if validators.etag is not None:
+            request.headers.setdefault(b"If-None-Match", validators.etag)
+        if validators.last_modified is not None:
+            request.headers.setdefault(b"If-Modified-Since", validators.last_modified)
+
+        return None
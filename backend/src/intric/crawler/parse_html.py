@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
@@ -13,9 +14,22 @@ class CrawledPage:
     url: str
     title: str
     content: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    # Not modified since the last crawl, there is no content
+    unchanged: bool = False
+
+
+def _get_header(response: Response, name: bytes) -> Optional[str]:
+    value = response.headers.get(name)
+    return value.decode("latin-1") if value is not None else None
 
 
 def parse_response(response: Response):
+    if response.status == 304:
+        return CrawledPage(url=response.url, title=None, content="", unchanged=True)
+
     soup = BeautifulSoup(response.body, "lxml")
 
     # Replace relative links with absolute
@@ -26,7 +40,13 @@ def parse_response(response: Response):
     title = response.css("title::text").get()
     url = response.url
 
-    return CrawledPage(url=url, title=title, content=content)
+    return CrawledPage(
+        url=url,
+        title=title,
+        content=content,
+        etag=_get_header(response, b"ETag"),
+        last_modified=_get_header(response, b"Last-Modified"),
+    )
 
 
 def parse_file(response: Response):
@@ -1,14 +1,29 @@
 import scrapy
 from scrapy.http import Response
 
+from intric.crawler.middlewares import ConditionalRequestMiddleware, HttpValidators
 from intric.crawler.parse_html import parse_response
 
 
 class SitemapSpider(scrapy.spiders.SitemapSpider):
     name = "sitemapspider"
 
-    def __init__(self, sitemap_url: str, *args, **kwargs):
+    # The pages to crawl come from the sitemap, not from links on other pages,
+    # so pages that have not been modified do not need to be downloaded.
+    custom_settings = {
+        "DOWNLOADER_MIDDLEWARES": {ConditionalRequestMiddleware: 560},
+    }
+    handle_httpstatus_list = [304]
+
+    def __init__(
+        self,
+        sitemap_url: str,
+        *args,
+        http_validators: dict[str, HttpValidators] = {},
+        **kwargs,
+    ):
         self.sitemap_urls = [sitemap_url]
+        self.http_validators = http_validators
 
         super().__init__(*args, **kwargs)
 
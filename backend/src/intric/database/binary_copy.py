@@ -0,0 +1,52 @@
+import struct
+from collections.abc import Iterable
+from typing import Optional
+from uuid import UUID
+
+import numpy as np
+
+# Encoding of rows for `COPY ... FROM STDIN (FORMAT binary)`, so rows can be
+# bulk inserted without asyncpg needing a codec for every column type,
+# most notably pgvector's `vector`. See
+# https://www.postgresql.org/docs/current/sql-copy.html#id-1.9.3.55.9.4
+
+HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+TRAILER = struct.pack(">h", -1)
+
+_NULL = struct.pack(">i", -1)
+
+
+def encode_uuid(value: Optional[UUID]) -> Optional[bytes]:
+    return value.bytes if value is not None else None
+
+
+def encode_text(value: str) -> bytes:
+    return value.encode()
+
+
+def encode_int4(value: Optional[int]) -> Optional[bytes]:
+    return struct.pack(">i", value) if value is not None else None
+
+
+def encode_vector(value: list[float]) -> bytes:
+    # Dimensions, an unused field, and the elements as big endian float4
+    return struct.pack(">hh", len(value), 0) + np.asarray(value, dtype=">f4").tobytes()
+
+
+def encode_rows(rows: Iterable[tuple[Optional[bytes], ...]]) -> bytes:
+    """Rows of already encoded fields, `None` for NULL."""
+    buffer = bytearray(HEADER)
+
+    for row in rows:
+        buffer += struct.pack(">h", len(row))
+
+        for field in row:
+            if field is None:
+                buffer += _NULL
+            else:
+                buffer += struct.pack(">i", len(field))
+                buffer += field
+
+    buffer += TRAILER
+
+    return bytes(buffer)
@@ -13,6 +13,10 @@ from intric.main.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Connections of the pool of every process
+POOL_SIZE = 20
+MAX_OVERFLOW = 10
+
 
 class DatabaseSessionManager:
     def __init__(self):
@@ -20,7 +24,9 @@ class DatabaseSessionManager:
         self._sessionmaker: async_sessionmaker[AsyncSession] | None = None
 
     def init(self, host: str):
-        self._engine = create_async_engine(host, pool_size=20, max_overflow=10)
+        self._engine = create_async_engine(
+            host, pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW
+        )
         self._sessionmaker = async_sessionmaker(
             autocommit=False, bind=self._engine, autobegin=False
         )
@@ -22,6 +22,7 @@ class Assistants(BasePublic):
     logging_enabled: Mapped[bool] = mapped_column()
     is_default: Mapped[bool] = mapped_column()
     published: Mapped[bool] = mapped_column()
+    search_mode: Mapped[str] = mapped_column(server_default="semantic")
 
     # Foreign keys
     user_id: Mapped[UUID] = mapped_column(ForeignKey(Users.id, ondelete="CASCADE"))
@@ -1,11 +1,12 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import TIMESTAMP, ForeignKey, func
 from sqlalchemy.dialects.postgresql import BYTEA
 from sqlalchemy.orm import Mapped, mapped_column
 
-from intric.database.tables.base_class import BasePublic
+from intric.database.tables.base_class import BasePublic, BaseWithTableName
 from intric.database.tables.tenant_table import Tenants
 from intric.database.tables.users_table import Users
 from intric.files.file_models import FileType
@@ -23,3 +24,13 @@ class Files(BasePublic):
     # Foreign keys
     user_id: Mapped[UUID] = mapped_column(ForeignKey(Users.id, ondelete="CASCADE"))
     tenant_id: Mapped[UUID] = mapped_column(ForeignKey(Tenants.id, ondelete="CASCADE"))
+
+
+class DeletedBlobs(BaseWithTableName):
+    """Checksums of the blobs of deleted files, removed from the blob store
+    once no file uses them."""
+
+    checksum: Mapped[str] = mapped_column(primary_key=True)
+    deleted_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now()
+    )
@@ -1,9 +1,12 @@
+from typing import Optional
 from uuid import UUID
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import ForeignKey
+from sqlalchemy import Computed, ForeignKey
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
+from intric.database.tables.ai_models_table import EmbeddingModels
 from intric.database.tables.base_class import BasePublic
 from intric.database.tables.info_blobs_table import InfoBlobs
 from intric.database.tables.tenant_table import Tenants
@@ -14,6 +17,17 @@ class InfoBlobChunks(BasePublic):
     chunk_no: Mapped[int] = mapped_column()
     size: Mapped[int] = mapped_column()
     embedding: Mapped[list[float]] = mapped_column(Vector)
+    text_hash: Mapped[Optional[str]] = mapped_column()
+    token_count: Mapped[Optional[int]] = mapped_column()
+    start_offset: Mapped[Optional[int]] = mapped_column()
+    end_offset: Mapped[Optional[int]] = mapped_column()
+
+    # Searched by `InfoBlobChunkRepo` with the same text search config
+    text_search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple'::regconfig, text)", persisted=True),
+        deferred=True,
+    )
 
     # Foreign keys
     info_blob_id: Mapped[UUID] = mapped_column(
@@ -22,3 +36,6 @@ class InfoBlobChunks(BasePublic):
     tenant_id: Mapped[UUID] = mapped_column(
         ForeignKey(Tenants.id, ondelete="CASCADE"), index=True
     )
+    embedding_model_id: Mapped[Optional[UUID]] = mapped_column(
+        ForeignKey(EmbeddingModels.id, ondelete="SET NULL"),
+    )
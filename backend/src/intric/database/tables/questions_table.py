@@ -21,6 +21,7 @@ class Questions(BasePublic):
     answer: Mapped[str] = mapped_column()
     num_tokens_question: Mapped[int] = mapped_column()
     num_tokens_answer: Mapped[int] = mapped_column()
+    num_tokens_input: Mapped[Optional[int]] = mapped_column()
 
     # Foreign keys
     completion_model_id: Mapped[Optional[UUID]] = mapped_column(
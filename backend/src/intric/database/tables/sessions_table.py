@@ -33,4 +33,12 @@ class Sessions(BasePublic):
         foreign_keys="Sessions.assistant_id", viewonly=True
     )
 
-    __table_args__ = (Index("created_at_idx", "created_at"),)
+    __table_args__ = (
+        Index("created_at_idx", "created_at"),
+        Index(
+            "ix_sessions_assistant_id_user_id_created_at",
+            "assistant_id",
+            "user_id",
+            "created_at",
+        ),
+    )
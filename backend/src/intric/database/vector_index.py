@@ -0,0 +1,64 @@
+from enum import Enum
+from uuid import UUID
+
+import sqlalchemy as sa
+
+# pgvector can not build HNSW or IVFFlat indexes on vectors
+# with more dimensions than this
+MAX_INDEXABLE_DIMENSIONS = 2000
+
+
+class VectorIndexType(str, Enum):
+    HNSW = "hnsw"
+    IVFFLAT = "ivfflat"
+
+
+def vector_index_name(embedding_model_id: UUID) -> str:
+    return f"ix_info_blob_chunks_embedding_{embedding_model_id.hex}"
+
+
+def create_vector_index_statement(
+    embedding_model_id: UUID,
+    dimensions: int,
+    index_type: VectorIndexType = VectorIndexType.HNSW,
+    ivfflat_lists: int = 100,
+    concurrently: bool = False,
+) -> sa.TextClause:
+    """Partial expression index over the chunks of one embedding model.
+
+    `info_blob_chunks.embedding` is an untyped vector column, shared by
+    all embedding models, which pgvector can not index. Casting it to the
+    fixed dimension of the model, and restricting the index to the rows
+    of that model, gives every model its own ANN index. Queries must use
+    the exact same cast and filter on `embedding_model_id` with a literal
+    for the planner to pick the index.
+
+    Built `concurrently`, the index does not block writes to the chunks,
+    but the statement can not run in a transaction.
+    """
+    index_type = VectorIndexType(index_type)
+    with_clause = (
+        f" WITH (lists = {int(ivfflat_lists)})"
+        if index_type == VectorIndexType.IVFFLAT
+        else ""
+    )
+
+    # Both values are typed (UUID and int), so they are safe to inline.
+    # DDL does not support bound parameters.
+    return sa.text(
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}"
+        f"IF NOT EXISTS {vector_index_name(embedding_model_id)} "
+        f"ON info_blob_chunks USING {index_type.value} "
+        f"((embedding::vector({int(dimensions)})) vector_cosine_ops)"
+        f"{with_clause} "
+        f"WHERE embedding_model_id = '{UUID(str(embedding_model_id))}'"
+    )
+
+
+def drop_vector_index_statement(
+    embedding_model_id: UUID, concurrently: bool = False
+) -> sa.TextClause:
+    return sa.text(
+        f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}"
+        f"IF EXISTS {vector_index_name(embedding_model_id)}"
+    )
@@ -1,23 +1,14 @@
 # MIT License
 
-import asyncio
 import tempfile
-import wave
-from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Iterator
 
 import audioread
 import numpy as np
 import soundfile as sf
-from soundfile import SoundFile
 
 from intric.files.text import MimeTypesBase
-from intric.main.logging import get_logger
-
-logger = get_logger(__name__)
-
-FRAMES = 32768  # Number of frames in one mebibyte
 
 
 # TODO: When we support video, remove the video mimetypes
@@ -33,92 +24,82 @@ class AudioMimeTypes(MimeTypesBase):
     MP4A = "audio/mp4"
 
 
-def _to_wav(filepath: str):
-    logger.debug(f"Converting {filepath} to wav")
+def _to_mono(buffer: bytes, channels: int) -> np.ndarray:
+    # Decoders yield 16 bit signed little endian samples, interleaved
+    samples = np.frombuffer(buffer, dtype="<i2").astype(np.float32) / 32768
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
 
-    with audioread.audio_open(filepath) as f:
-        tmp_file = tempfile.NamedTemporaryFile(suffix=".wav")
-        with wave.open(tmp_file, "w") as of:
-            of.setframerate(f.samplerate)
-            of.setnchannels(f.channels)
-            of.setsampwidth(2)
+    return samples
 
-            for buf in f:
-                of.writeframes(buf)
 
-    return tmp_file
+def _find_cut(samples: np.ndarray, samplerate: int, search_seconds: float) -> int:
+    """The middle of the quietest 100 ms at the end of the samples."""
+    frame = max(samplerate // 10, 1)
+    search_start = max(len(samples) - int(search_seconds * samplerate), 0)
+    num_frames = (len(samples) - search_start) // frame
 
+    if num_frames == 0:
+        return len(samples)
 
-@asynccontextmanager
-async def to_wav(filepath: str):
-    tmp_file = await asyncio.to_thread(_to_wav, filepath)
+    window = samples[search_start : search_start + num_frames * frame]
+    energy = np.square(window).reshape(num_frames, frame).mean(axis=1)
 
-    try:
-        yield AudioFile(tmp_file.name)
-    finally:
-        tmp_file.close()
+    return search_start + int(np.argmin(energy)) * frame + frame // 2
 
 
-class AudioFile:
-    def __init__(self, path_to_file: str):
-        self.path = Path(path_to_file)
-        self.info = sf.info(path_to_file)
+def split_at_silence(
+    filepath: Path,
+    seconds: float,
+    overlap_seconds: float,
+    search_seconds: float,
+) -> Iterator[tuple[np.ndarray, int]]:
+    """Decode the audio as a stream, yielding mono segments of at most
+    `seconds` seconds, together with the sample rate.
 
-    def _gen_file(self):
-        for block in sf.blocks(self.path, blocksize=FRAMES):
-            yield block
+    A segment is cut in the quietest moment of its last `search_seconds`,
+    at most its second half, and the next segment starts `overlap_seconds`
+    before the cut. At most one segment is held in memory.
+    """
+    # Searching only the second half keeps the cut out of the overlap, so
+    # that every segment moves at least half a segment forward
+    search_seconds = min(search_seconds, seconds / 2)
 
-    def _write_to_file(self, gen: Iterator[np.ndarray], max_size: int):
-        frames_in_file = 0
-        temp_file = tempfile.NamedTemporaryFile(suffix=".mp3")
-        soundfile = SoundFile(
-            temp_file,
-            mode="w",
-            samplerate=self.info.samplerate,
-            channels=1,
-            format="mp3",
-        )
-        for block in gen:
-            if self.info.channels == 2:
-                # Make mono by averageing the two channels
-                data = np.sum(block, axis=1) / 2
-            else:
-                data = block
+    with audioread.audio_open(str(filepath)) as audio_file:
+        samplerate = audio_file.samplerate
+        channels = audio_file.channels
 
-            frames_in_file += len(data)
-            soundfile.write(data)
-            soundfile.flush()
+        segment_size = int(seconds * samplerate)
+        overlap = int(overlap_seconds * samplerate)
 
-            if frames_in_file > max_size:
-                return temp_file, False
+        blocks = []
+        num_samples = 0
+        # Samples at the start of the buffer that were already yielded
+        num_yielded = 0
 
-        return temp_file, True
+        for buffer in audio_file:
+            block = _to_mono(buffer, channels)
+            blocks.append(block)
+            num_samples += len(block)
 
-    def _split_file(self, seconds: int):
-        max_size = self.info.samplerate * seconds
-        temp_files = []
-        gen = self._gen_file()
-        done = False
-        while not done:
-            file, done = self._write_to_file(gen, max_size)
-            temp_files.append(file)
+            while num_samples >= segment_size:
+                samples = np.concatenate(blocks)
+                cut = _find_cut(samples[:segment_size], samplerate, search_seconds)
+                cut = max(cut, min(overlap + 1, segment_size))
 
-        return temp_files
+                yield samples[:cut], samplerate
 
-    @asynccontextmanager
-    async def asplit_file(self, seconds: int):
-        logger.debug("Splitting the file")
+                rest = samples[max(cut - overlap, 0) :]
+                blocks = [rest]
+                num_samples = len(rest)
+                num_yielded = min(overlap, cut)
 
-        temp_files = await asyncio.to_thread(self._split_file, seconds)
-        filepaths = [Path(f.name) for f in temp_files]
+        if num_samples > num_yielded:
+            yield np.concatenate(blocks), samplerate
 
-        logger.debug("File was split in %s parts", len(filepaths))
 
-        try:
-            yield filepaths
-        finally:
-            for f in temp_files:
-                f.close()
+def write_mp3(samples: np.ndarray, samplerate: int) -> Path:
+    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
+        sf.write(temp_file, samples, samplerate, format="MP3")
 
-    def delete(self):
-        self.path.unlink()
+    return Path(temp_file.name)
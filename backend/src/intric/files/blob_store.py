@@ -0,0 +1,323 @@
+import asyncio
+import datetime
+import hashlib
+import hmac
+import os
+import re
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+from intric.files.file_models import File, FileType
+from intric.main.aiohttp_client import aiohttp_client
+from intric.main.config import get_settings
+from intric.main.exceptions import NotFoundException
+
+CHUNK_SIZE = 1024 * 1024
+
+# Blobs are stored under their sha256 checksum
+_CHECKSUM = re.compile(r"[0-9a-f]{64}")
+
+_EMPTY_PAYLOAD_HASH = hashlib.sha256(b"").hexdigest()
+
+
+def _validate(checksum: str):
+    if not _CHECKSUM.fullmatch(checksum):
+        raise ValueError(f"Not a sha256 checksum: {checksum!r}")
+
+
+class BlobStore(ABC):
+    """Content addressed storage of the blobs of files, outside of postgres.
+
+    Blobs are keyed by the sha256 checksum of their content, so a blob that
+    is uploaded twice is stored once.
+    """
+
+    @abstractmethod
+    async def put(self, checksum: str, data: bytes):
+        pass
+
+    @abstractmethod
+    async def put_file(self, checksum: str, path: Path):
+        """Store the content of the file without reading it all into memory."""
+
+    @abstractmethod
+    def stream(self, checksum: str) -> AsyncIterator[bytes]:
+        """The content of the blob, in chunks."""
+
+    @abstractmethod
+    async def exists(self, checksum: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def delete(self, checksum: str):
+        pass
+
+    async def get(self, checksum: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(checksum)])
+
+    async def download(self, checksum: str, path: Path):
+        with open(path, "wb") as file:
+            async for chunk in self.stream(checksum):
+                await asyncio.to_thread(file.write, chunk)
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files in a directory, fanned out by the start of the checksum."""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _path(self, checksum: str) -> Path:
+        _validate(checksum)
+        return self.root / checksum[:2] / checksum
+
+    def _write(self, checksum: str, write):
+        path = self._path(checksum)
+        if path.exists():
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Written next to the blob and renamed, so a blob is never seen half written
+        temp_path = path.with_name(f".{checksum}.{uuid.uuid4().hex}")
+        try:
+            write(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    async def put(self, checksum: str, data: bytes):
+        await asyncio.to_thread(
+            self._write, checksum, lambda path: path.write_bytes(data)
+        )
+
+    async def put_file(self, checksum: str, path: Path):
+        await asyncio.to_thread(
+            self._write, checksum, lambda temp_path: shutil.copyfile(path, temp_path)
+        )
+
+    async def stream(self, checksum: str) -> AsyncIterator[bytes]:
+        try:
+            file = await asyncio.to_thread(open, self._path(checksum), "rb")
+        except FileNotFoundError:
+            raise NotFoundException(f"Blob {checksum} not found")
+
+        try:
+            while chunk := await asyncio.to_thread(file.read, CHUNK_SIZE):
+                yield chunk
+        finally:
+            file.close()
+
+    async def exists(self, checksum: str) -> bool:
+        return await asyncio.to_thread(self._path(checksum).exists)
+
+    async def delete(self, checksum: str):
+        await asyncio.to_thread(self._path(checksum).unlink, missing_ok=True)
+
+
+class S3BlobStore(BlobStore):
+    """Blobs as objects in a bucket of an S3 compatible object storage.
+
+    Requests use path style addressing and are signed with AWS signature
+    version 4, so any S3 compatible service works, such as MinIO.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        region: str,
+        access_key_id: str,
+        secret_access_key: str,
+        prefix: str = "files",
+    ):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.region = region
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.prefix = prefix
+
+        self.host = urlsplit(self.endpoint_url).netloc
+
+    def _path(self, checksum: str) -> str:
+        _validate(checksum)
+        return f"/{self.bucket}/{self.prefix}/{checksum}"
+
+    def _signing_key(self, date: str) -> bytes:
+        key = f"AWS4{self.secret_access_key}".encode()
+        for part in (date, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+
+        return key
+
+    def _sign(
+        self,
+        method: str,
+        path: str,
+        payload_hash: str,
+        now: Optional[datetime.datetime] = None,
+    ) -> dict[str, str]:
+        """The headers of a signed request, see
+        https://docs.aws.amazon.com/AmazonS3/latest/API/sig-v4-header-based-auth.html
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = now.strftime("%Y%m%d")
+
+        headers = {
+            "host": self.host,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": amz_date,
+        }
+        signed_headers = ";".join(headers)
+        canonical_request = "\n".join(
+            [
+                method,
+                path,
+                "",
+                *(f"{name}:{value}" for name, value in headers.items()),
+                "",
+                signed_headers,
+                payload_hash,
+            ]
+        )
+
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join(
+            [
+                "AWS4-HMAC-SHA256",
+                amz_date,
+                scope,
+                hashlib.sha256(canonical_request.encode()).hexdigest(),
+            ]
+        )
+        signature = hmac.new(
+            self._signing_key(date), string_to_sign.encode(), hashlib.sha256
+        ).hexdigest()
+
+        return {
+            **headers,
+            "authorization": (
+                f"AWS4-HMAC-SHA256 Credential={self.access_key_id}/{scope}, "
+                f"SignedHeaders={signed_headers}, Signature={signature}"
+            ),
+        }
+
+    def _request(self, method: str, checksum: str, payload_hash: str, **kwargs):
+        path = self._path(checksum)
+        headers = self._sign(method, path, payload_hash)
+
+        return aiohttp_client().request(
+            method,
+            f"{self.endpoint_url}{path}",
+            headers={**headers, **kwargs.pop("headers", {})},
+            **kwargs,
+        )
+
+    async def put(self, checksum: str, data: bytes):
+        # The checksum is the hash of the payload, which the storage verifies
+        async with self._request("PUT", checksum, checksum, data=data) as response:
+            response.raise_for_status()
+
+    async def put_file(self, checksum: str, path: Path):
+        size = path.stat().st_size
+
+        with open(path, "rb") as file:
+            async with self._request(
+                "PUT",
+                checksum,
+                checksum,
+                data=file,
+                headers={"content-length": str(size)},
+            ) as response:
+                response.raise_for_status()
+
+    async def stream(self, checksum: str) -> AsyncIterator[bytes]:
+        async with self._request("GET", checksum, _EMPTY_PAYLOAD_HASH) as response:
+            if response.status == 404:
+                raise NotFoundException(f"Blob {checksum} not found")
+            response.raise_for_status()
+
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                yield chunk
+
+    async def exists(self, checksum: str) -> bool:
+        async with self._request("HEAD", checksum, _EMPTY_PAYLOAD_HASH) as response:
+            if response.status == 404:
+                return False
+            response.raise_for_status()
+
+            return True
+
+    async def delete(self, checksum: str):
+        async with self._request("DELETE", checksum, _EMPTY_PAYLOAD_HASH) as response:
+            response.raise_for_status()
+
+
+async def load_image_blobs(
+    blob_store: Optional[BlobStore], files: list[File]
+) -> list[File]:
+    """The files, with the blobs of images that are kept in the blob store.
+
+    Only images are sent to the models as bytes, other blobs are streamed
+    from the blob store when they are needed.
+    """
+    if blob_store is None:
+        return files
+
+    checksums = list(
+        {
+            file.checksum
+            for file in files
+            if file.blob is None and file.file_type == FileType.IMAGE
+        }
+    )
+    if not checksums:
+        return files
+
+    blobs = dict(
+        zip(
+            checksums,
+            await asyncio.gather(*(blob_store.get(checksum) for checksum in checksums)),
+        )
+    )
+
+    return [
+        (
+            file.model_copy(update={"blob": blobs[file.checksum]})
+            if file.blob is None and file.file_type == FileType.IMAGE
+            else file
+        )
+        for file in files
+    ]
+
+
+def _create_blob_store() -> Optional[BlobStore]:
+    settings = get_settings()
+
+    if settings.blob_store is None:
+        return None
+
+    if settings.blob_store == "local":
+        return LocalBlobStore(root=Path(settings.blob_store_path))
+
+    if settings.blob_store == "s3":
+        return S3BlobStore(
+            endpoint_url=settings.s3_endpoint_url,
+            bucket=settings.s3_bucket,
+            region=settings.s3_region,
+            access_key_id=settings.s3_access_key_id,
+            secret_access_key=settings.s3_secret_access_key,
+        )
+
+    raise ValueError(f"Unknown blob store: {settings.blob_store}")
+
+
+# Blobs are kept in postgres if no blob store is configured
+blob_store = _create_blob_store()
@@ -0,0 +1,69 @@
+import asyncio
+import hashlib
+import zlib
+from pathlib import Path
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from intric.main.config import get_settings
+from intric.main.logging import get_logger
+from intric.worker.redis import r
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "file_content"
+
+
+def _file_checksum(filepath: Path) -> str:
+    with open(filepath, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+async def file_checksum(filepath: Path) -> str:
+    """The sha256 checksum of the file, as stored on files."""
+    return await asyncio.to_thread(_file_checksum, filepath)
+
+
+class ContentCache:
+    """Text extracted from files and transcripts of audio, keyed by the
+    checksum of the file.
+
+    The key also has a version, such as the extractor version and mimetype
+    or the transcription model, so results from an older extractor or
+    another model are not reused. Entries expire after `ttl` seconds.
+    Redis is best effort: if it is unavailable the cache only misses.
+    """
+
+    def __init__(self, redis: aioredis.Redis, ttl: int):
+        self.redis = redis
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(kind: str, version: str, checksum: str) -> str:
+        return f"{KEY_PREFIX}:{kind}:{version}:{checksum}"
+
+    async def get(self, kind: str, version: str, checksum: str) -> Optional[str]:
+        try:
+            value = await self.redis.get(self._key(kind, version, checksum))
+        except Exception:
+            logger.warning(f"Could not read cached {kind} from redis", exc_info=True)
+            return None
+
+        if value is None:
+            return None
+
+        return zlib.decompress(value).decode()
+
+    async def set(self, kind: str, version: str, checksum: str, content: str):
+        try:
+            await self.redis.set(
+                self._key(kind, version, checksum),
+                zlib.compress(content.encode()),
+                ex=self.ttl,
+            )
+        except Exception:
+            logger.warning(f"Could not write cached {kind} to redis", exc_info=True)
+
+
+content_cache = ContentCache(redis=r, ttl=get_settings().content_cache_ttl)
@@ -28,7 +28,8 @@ class FileBaseWithContent(FileBase):
 
     @model_validator(mode="after")
     def require_one_of_text_or_image(self) -> "FileBaseWithContent":
-        if self.text is None and self.blob is None:
+        # The blob is not set if it is kept in the blob store
+        if self.text is None and self.blob is None and self.file_type == FileType.TEXT:
             raise ValueError("One of 'text' or 'blob' is required")
 
         return self
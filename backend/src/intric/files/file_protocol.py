@@ -1,16 +1,17 @@
+import asyncio
 import os
 from pathlib import Path
-from typing import Callable
+from typing import Awaitable, Callable, Optional
 
 from fastapi import UploadFile
 
 from intric.files.audio import AudioMimeTypes
+from intric.files.blob_store import BlobStore
 from intric.files.file_models import FileBaseWithContent, FileType
-from intric.files.file_size_service import FileSizeService
+from intric.files.file_size_service import FileSizeService, SavedFile
 from intric.files.image import ImageExtractor, ImageMimeTypes
-from intric.files.text import TextExtractor
+from intric.files.text_extraction_service import TextExtractionService
 from intric.main.config import get_settings
-from intric.main.exceptions import FileTooLargeException
 
 
 def bytes_extractor(filepath: Path, _: str):
@@ -22,29 +23,37 @@ class FileProtocol:
     def __init__(
         self,
         file_size_service: FileSizeService,
-        text_extractor: TextExtractor,
+        text_extraction_service: TextExtractionService,
         image_extractor: ImageExtractor,
+        blob_store: Optional[BlobStore] = None,
     ):
         self.file_size_service = file_size_service
-        self.text_extractor = text_extractor
+        self.text_extraction_service = text_extraction_service
         self.image_extractor = image_extractor
+        self.blob_store = blob_store
 
     async def _get_content(
         self,
         upload_file: UploadFile,
         file_type: FileType,
         max_size: int,
-        extractor: Callable[[Path, str], str | bytes],
+        extractor: Callable[[SavedFile, str], Awaitable[str | bytes]],
     ):
-        if self.file_size_service.is_too_large(upload_file.file, max_size=max_size):
-            raise FileTooLargeException()
-
-        filepath = await self.file_size_service.save_file_to_disk(upload_file.file)
-        filepath = Path(filepath)
+        saved_file = await self.file_size_service.save_file_to_disk(
+            upload_file.file, max_size=max_size
+        )
+        filepath, checksum = saved_file.path, saved_file.checksum
 
         try:
-            content = extractor(filepath, upload_file.content_type)
-            checksum = self.file_size_service.get_file_checksum(filepath)
+            if file_type != FileType.TEXT and self.blob_store is not None:
+                # Streamed to the blob store, without reading it into memory
+                await self.blob_store.put_file(checksum, filepath)
+
+                return self._create_file_base(
+                    upload_file, file_type, None, checksum, saved_file.size
+                )
+
+            content = await extractor(saved_file, upload_file.content_type)
 
             if isinstance(content, str):
                 size = len(content.encode("utf-8"))
@@ -57,11 +66,25 @@ class FileProtocol:
         finally:
             os.remove(filepath)
 
+    async def _extract_text(self, saved_file: SavedFile, mimetype: str) -> str:
+        return await self.text_extraction_service.extract(
+            saved_file.path, mimetype, checksum=saved_file.checksum
+        )
+
+    async def _extract_image(self, saved_file: SavedFile, mimetype: str) -> bytes:
+        return await asyncio.to_thread(
+            self.image_extractor.extract, saved_file.path, mimetype
+        )
+
+    @staticmethod
+    async def _extract_bytes(saved_file: SavedFile, mimetype: str) -> bytes:
+        return await asyncio.to_thread(bytes_extractor, saved_file.path, mimetype)
+
     def _create_file_base(
         self,
         upload_file: UploadFile,
         file_type: FileType,
-        content: str | bytes,
+        content: str | bytes | None,
         checksum: str,
         size: int,
     ) -> FileBaseWithContent:
@@ -85,7 +108,7 @@ class FileProtocol:
             upload_file,
             file_type=FileType.TEXT,
             max_size=get_settings().upload_file_to_session_max_size,
-            extractor=self.text_extractor.extract,
+            extractor=self._extract_text,
         )
 
     async def image_to_domain(self, upload_file: UploadFile):
@@ -93,7 +116,7 @@ class FileProtocol:
             upload_file,
             file_type=FileType.IMAGE,
             max_size=get_settings().upload_image_to_session_max_size,
-            extractor=self.image_extractor.extract,
+            extractor=self._extract_image,
         )
 
     async def audio_to_domain(self, upload_file: UploadFile):
@@ -101,7 +124,7 @@ class FileProtocol:
             upload_file,
             file_type=FileType.AUDIO,
             max_size=get_settings().transcription_max_file_size,
-            extractor=bytes_extractor,
+            extractor=self._extract_bytes,
         )
 
     async def to_domain(self, upload_file: UploadFile):
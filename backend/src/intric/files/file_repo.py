@@ -1,27 +1,52 @@
+from typing import Optional
 from uuid import UUID
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import defer
 
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import (
     BaseRepositoryDelegate,
 )
-from intric.database.tables.files_table import Files
-from intric.files.file_models import File, FileCreate, FileInfo
+from intric.database.tables.files_table import DeletedBlobs, Files
+from intric.files.blob_store import BlobStore, load_image_blobs
+from intric.files.file_models import File, FileCreate, FileInfo, FileType
+from intric.main.exceptions import BadRequestException
 
 
 class FileRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, blob_store: Optional[BlobStore] = None):
         self._delegate = BaseRepositoryDelegate(
             session=session, table=Files, in_db_model=File
         )
         self.session = session
+        self.blob_store = blob_store
 
     async def add(self, file: FileCreate) -> File:
+        if self.blob_store is not None and file.file_type != FileType.TEXT:
+            await self._lock_checksum(file.checksum)
+
+            if file.blob is not None:
+                await self.blob_store.put(file.checksum, file.blob)
+                file = file.model_copy(update={"blob": None})
+
+            # The blob was uploaded before the lock, and may have been removed
+            # as unused since
+            elif not await self.blob_store.exists(file.checksum):
+                raise BadRequestException("The file was not stored, upload it again.")
+
         return await self._delegate.add(file)
 
-    async def get_list_by_id_and_user(self, ids: list[UUID], user_id: UUID) -> list[File]:
+    async def _lock_checksum(self, checksum: str):
+        """Held until the transaction ends, so that a blob is not removed as
+        unused while a file with it is being added."""
+        stmt = sa.select(sa.func.pg_advisory_xact_lock(sa.func.hashtext(checksum)))
+        await self.session.execute(stmt)
+
+    async def get_list_by_id_and_user(
+        self, ids: list[UUID], user_id: UUID
+    ) -> list[File]:
         stmt = (
             sa.select(Files)
             .where(Files.id.in_(ids))
@@ -30,8 +55,38 @@ class FileRepository:
         )
 
         files_in_db = await self.session.scalars(stmt)
+        files = [File.model_validate(file) for file in files_in_db]
 
-        return [File.model_validate(file) for file in files_in_db]
+        return await load_image_blobs(self.blob_store, files)
+
+    async def load_images(self, files: list[File]) -> list[File]:
+        """The files, with the blobs of the images that were loaded without."""
+        ids = [
+            file.id
+            for file in files
+            if file.blob is None and file.file_type == FileType.IMAGE
+        ]
+        if not ids:
+            return files
+
+        # Not yet moved to the blob store, if there is one
+        stmt = (
+            sa.select(Files.id, Files.blob)
+            .where(Files.id.in_(ids))
+            .where(Files.blob.is_not(None))
+        )
+        blobs = {id: blob for id, blob in await self.session.execute(stmt)}
+
+        files = [
+            (
+                file.model_copy(update={"blob": blobs[file.id]})
+                if file.id in blobs
+                else file
+            )
+            for file in files
+        ]
+
+        return await load_image_blobs(self.blob_store, files)
 
     async def get_by_id(self, file_id: UUID) -> File:
         file = await self._delegate.get(id=file_id)
@@ -44,7 +99,67 @@ class FileRepository:
         return await self._delegate.get_by(conditions={Files.checksum: checksum})
 
     async def delete(self, id: UUID) -> File:
-        return await self._delegate.delete(id)
+        file = await self._delegate.delete(id)
+
+        # Blobs are shared by the files with the same content, and can not be
+        # rolled back. They are removed later, see `remove_deleted_blob`
+        if self.blob_store is not None and file.file_type != FileType.TEXT:
+            stmt = (
+                insert(DeletedBlobs)
+                .values(checksum=file.checksum)
+                .on_conflict_do_update(
+                    index_elements=[DeletedBlobs.checksum],
+                    set_=dict(deleted_at=sa.func.now()),
+                )
+            )
+            await self.session.execute(stmt)
+
+        return file
+
+    async def _checksum_is_used(self, checksum: str) -> bool:
+        stmt = sa.select(sa.exists().where(Files.checksum == checksum))
+        return await self.session.scalar(stmt)
+
+    async def get_deleted_blobs(self, limit: int) -> list[str]:
+        stmt = (
+            sa.select(DeletedBlobs.checksum)
+            .order_by(DeletedBlobs.deleted_at)
+            .limit(limit)
+        )
+        return list(await self.session.scalars(stmt))
+
+    async def remove_deleted_blob(self, checksum: str) -> bool:
+        """Stops tracking the blob of deleted files.
+
+        Returns whether no file uses the blob, so that it can be removed from
+        the blob store before the transaction is committed.
+        """
+        await self._lock_checksum(checksum)
+
+        stmt = (
+            sa.delete(DeletedBlobs)
+            .where(DeletedBlobs.checksum == checksum)
+            .returning(DeletedBlobs.checksum)
+        )
+        if await self.session.scalar(stmt) is None:
+            return False
+
+        return not await self._checksum_is_used(checksum)
+
+    async def get_blobs_in_db(self, limit: int) -> list[tuple[UUID, str, bytes]]:
+        """Ids, checksums and blobs of files with their blobs still in postgres."""
+        stmt = (
+            sa.select(Files.id, Files.checksum, Files.blob)
+            .where(Files.blob.is_not(None))
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+
+        return [tuple(row) for row in result]
+
+    async def clear_blobs_in_db(self, ids: list[UUID]):
+        stmt = sa.update(Files).values(blob=None).where(Files.id.in_(ids))
+        await self.session.execute(stmt)
 
     async def get_file_infos(self, ids: list[UUID]) -> list[FileInfo]:
         stmt = (
@@ -1,52 +1,57 @@
 import asyncio
 import hashlib
-import os
-import shutil
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
-from tempfile import SpooledTemporaryFile
 from typing import IO
 
+from intric.main.exceptions import FileTooLargeException
+
 TMP_DIR = "/tmp/"
 
+CHUNK_SIZE = 1024 * 1024
 
-class FileSizeService:
-    @staticmethod
-    async def save_file_to_disk(file: SpooledTemporaryFile):
-        destination = os.path.join(TMP_DIR, uuid.uuid4().hex)
-        destination_path = Path(destination)
 
-        try:
-            with destination_path.open("wb") as buffer:
-                await asyncio.to_thread(shutil.copyfileobj, file, buffer)
-        finally:
-            file.close()
+@dataclass
+class SavedFile:
+    path: Path
+    checksum: str
+    size: int
 
-        return destination
 
+class FileSizeService:
     @staticmethod
-    def is_too_large(file: IO, max_size: int):
-        real_file_size = 0
-        for chunk in file:
-            real_file_size += len(chunk)
-            if real_file_size > max_size:
-                return True
+    def _save(file: IO[bytes], destination: Path, max_size: int) -> SavedFile:
+        h = hashlib.sha256()
+        size = 0
+
+        try:
+            with destination.open("wb") as buffer:
+                while chunk := file.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise FileTooLargeException("File too large.")
 
-        # return the pointer back to the starting point so that
-        # the next read starts from the starting point
-        file.seek(0)
+                    h.update(chunk)
+                    buffer.write(chunk)
+        except BaseException:
+            destination.unlink(missing_ok=True)
+            raise
 
-        return False
+        return SavedFile(path=destination, checksum=h.hexdigest(), size=size)
 
     @staticmethod
-    def get_file_checksum(filepath: Path):
-        """Taken from https://stackoverflow.com/a/44873382"""
-        h = hashlib.sha256()
-        b = bytearray(128 * 1024)
-        mv = memoryview(b)
+    async def save_file_to_disk(file: IO[bytes], max_size: int) -> SavedFile:
+        """Copy the file to disk in one pass, off the event loop, which also
+        enforces the size limit and computes the sha256 checksum.
 
-        with open(filepath, "rb", buffering=0) as f:
-            while n := f.readinto(mv):
-                h.update(mv[:n])
+        Nothing is left on disk if the file is too large.
+        """
+        destination = Path(TMP_DIR) / uuid.uuid4().hex
 
-        return h.hexdigest()
+        try:
+            return await asyncio.to_thread(
+                FileSizeService._save, file, destination, max_size
+            )
+        finally:
+            file.close()
@@ -0,0 +1,71 @@
+"""Moves the blobs of files from postgres to the configured blob store.
+
+Run with `python -m intric.files.move_blobs` once a blob store is configured.
+Files keep working while their blobs are moved, and the move can be resumed
+if it is interrupted. The space of the blobs is reclaimed by `VACUUM FULL files`.
+"""
+
+import argparse
+import asyncio
+
+from intric.database.database import sessionmanager
+from intric.files.blob_store import BlobStore, blob_store
+from intric.files.file_repo import FileRepository
+from intric.main.aiohttp_client import aiohttp_client
+from intric.main.config import get_settings
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+BATCH_SIZE = 20
+
+
+async def move_blobs_to_store(
+    file_repo: FileRepository, blob_store: BlobStore, batch_size: int = BATCH_SIZE
+) -> int:
+    """Move the blobs in batches, each batch in a transaction.
+
+    Returns the number of files whose blobs were moved.
+    """
+    num_moved = 0
+
+    while True:
+        async with file_repo.session.begin():
+            blobs = await file_repo.get_blobs_in_db(limit=batch_size)
+            if not blobs:
+                return num_moved
+
+            for _, checksum, blob in blobs:
+                await blob_store.put(checksum, blob)
+
+            await file_repo.clear_blobs_in_db([id for id, _, _ in blobs])
+
+        num_moved += len(blobs)
+        logger.info(f"Moved the blobs of {num_moved} files")
+
+
+async def main(batch_size: int):
+    if blob_store is None:
+        raise SystemExit("No blob store is configured, set BLOB_STORE")
+
+    sessionmanager.init(get_settings().database_url)
+    aiohttp_client.start()
+
+    try:
+        async with sessionmanager.session() as session:
+            num_moved = await move_blobs_to_store(
+                FileRepository(session), blob_store, batch_size=batch_size
+            )
+    finally:
+        await aiohttp_client.stop()
+        await sessionmanager.close()
+
+    logger.info(f"Done, moved the blobs of {num_moved} files")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    asyncio.run(main(batch_size=args.batch_size))
@@ -28,6 +28,11 @@ class TextMimeTypes(MimeTypesBase):
     PPTX = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
 
 
+# Bump when a change to the extraction changes the extracted text, so that
+# texts cached by checksum are extracted again
+EXTRACTOR_VERSION = 1
+
+
 class TextSanitizer:
     @staticmethod
     def sanitize(text: str) -> str:
@@ -40,6 +45,19 @@ class TextExtractor:
     def extract_from_plain_text(filepath: Path) -> str:
         return filepath.read_text("utf-8")
 
+    @staticmethod
+    def count_pdf_pages(filepath: Path) -> int:
+        return len(PdfReader(filepath).pages)
+
+    @staticmethod
+    def extract_from_pdf_pages(filepath: Path, start: int, stop: int) -> str:
+        reader = PdfReader(filepath)
+        extracted_text = " ".join(
+            [reader.pages[index].extract_text() for index in range(start, stop)]
+        )
+        sanitized_text = TextSanitizer.sanitize(extracted_text)
+        return sanitized_text
+
     @staticmethod
     def extract_from_pdf(filepath: Path) -> str:
         reader = PdfReader(filepath)
@@ -0,0 +1,198 @@
+import asyncio
+import multiprocessing
+import resource
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+import magic
+
+from intric.files.content_cache import ContentCache, content_cache, file_checksum
+from intric.files.text import EXTRACTOR_VERSION, TextExtractor, TextMimeTypes
+from intric.main.config import get_settings
+from intric.main.exceptions import FileTooLargeException
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Pages of a PDF extracted in one task
+PAGES_PER_TASK = 20
+
+# Worker processes are replaced after this many tasks, to give back memory
+MAX_TASKS_PER_CHILD = 100
+
+
+class TextExtractionService:
+    """Extracts the text of documents in a pool of worker processes, so that
+    parsing a large document does not block the event loop.
+
+    Every file has `timeout` seconds to be extracted, and every worker
+    process can use at most `memory_limit` bytes. The pages of a PDF are
+    extracted in parallel. Extracted texts are cached by checksum.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        timeout: float,
+        memory_limit: Optional[int] = None,
+        cache: Optional[ContentCache] = None,
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.cache = cache
+
+        self._pool: Optional[Executor] = None
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            limit_memory = {}
+            if self.memory_limit is not None:
+                limit_memory = dict(
+                    initializer=resource.setrlimit,
+                    initargs=(resource.RLIMIT_AS, (self.memory_limit,) * 2),
+                )
+
+            # Forking is not safe with the threads of the event loop and crawler.
+            # The workers only import what they run, from `intric.files.text`
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=MAX_TASKS_PER_CHILD,
+                **limit_memory,
+            )
+
+        return self._pool
+
+    def _reset_pool(self, pool: Executor):
+        # Tasks that failed together only replace the pool once
+        if self._pool is not pool:
+            return
+
+        self._pool = None
+
+        # A running task can not be cancelled, only the process running it killed.
+        # The pool does not tell which process runs which task, so all are killed.
+        # The other tasks then fail with `BrokenProcessPool` and are run again
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.kill()
+
+        pool.shutdown(wait=False)
+
+    async def _run(self, deadline: float, func, *args):
+        """Runs `func(*args)` in a worker process, to finish before `deadline`.
+
+        A task whose workers were killed because of another task is run
+        again once, in the new pool.
+        """
+        for _ in range(2):
+            pool = self._get_pool()
+            future = asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+            try:
+                return await asyncio.wait_for(future, deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                logger.warning("Text extraction timed out, restarting the workers")
+                self._reset_pool(pool)
+                raise FileTooLargeException("Extracting the text took too long.")
+            except MemoryError:
+                raise FileTooLargeException("Extracting the text took too much memory.")
+            except BrokenProcessPool:
+                logger.warning("A text extraction worker died, restarting the workers")
+                self._reset_pool(pool)
+
+        raise FileTooLargeException("Extracting the text failed.")
+
+    async def _stream_pdf(self, filepath: Path, deadline: float) -> AsyncIterator[str]:
+        num_pages = await self._run(deadline, TextExtractor.count_pdf_pages, filepath)
+
+        in_flight: deque[asyncio.Task] = deque()
+
+        try:
+            for start in range(0, num_pages, PAGES_PER_TASK):
+                if len(in_flight) >= self.max_workers:
+                    yield await in_flight.popleft()
+
+                stop = min(start + PAGES_PER_TASK, num_pages)
+                in_flight.append(
+                    asyncio.create_task(
+                        self._run(
+                            deadline,
+                            TextExtractor.extract_from_pdf_pages,
+                            filepath,
+                            start,
+                            stop,
+                        )
+                    )
+                )
+
+            while in_flight:
+                yield await in_flight.popleft()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    @staticmethod
+    async def _get_mimetype(filepath: Path, mimetype: str | None) -> str:
+        return mimetype or await asyncio.to_thread(magic.from_file, filepath, mime=True)
+
+    async def stream(
+        self, filepath: Path, mimetype: str | None = None
+    ) -> AsyncIterator[str]:
+        """The text of the file in parts, in order, as they are extracted.
+
+        The parts of a PDF are ranges of pages, other files are one part.
+        """
+        deadline = time.monotonic() + self.timeout
+        mimetype = await self._get_mimetype(filepath, mimetype)
+
+        if mimetype == TextMimeTypes.PDF:
+            async for text in self._stream_pdf(filepath, deadline):
+                yield text
+        else:
+            yield await self._run(deadline, TextExtractor().extract, filepath, mimetype)
+
+    async def extract(
+        self,
+        filepath: Path,
+        mimetype: str | None = None,
+        checksum: str | None = None,
+    ) -> str:
+        """The text of the file. The checksum is computed if not given."""
+        mimetype = await self._get_mimetype(filepath, mimetype)
+
+        if self.cache is not None:
+            checksum = checksum or await file_checksum(filepath)
+            version = f"{EXTRACTOR_VERSION}:{mimetype}"
+
+            text = await self.cache.get("text", version, checksum)
+            if text is not None:
+                return text
+
+        texts = [text async for text in self.stream(filepath, mimetype)]
+        text = " ".join(texts).strip()
+
+        if self.cache is not None:
+            await self.cache.set("text", version, checksum, text)
+
+        return text
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+text_extraction_service = TextExtractionService(
+    max_workers=get_settings().text_extraction_max_workers,
+    timeout=get_settings().text_extraction_timeout,
+    memory_limit=get_settings().text_extraction_memory_limit,
+    cache=content_cache,
+)
@@ -2,34 +2,91 @@
 
 import tempfile
 from pathlib import Path
+from typing import Optional
 
 from intric.ai_models.transcription_models.model_adapters.whisper import (
     OpenAISTTModelAdapter,
 )
-from intric.files import audio
 from intric.files.audio import AudioMimeTypes
+from intric.files.blob_store import BlobStore
+from intric.files.content_cache import ContentCache, file_checksum
 from intric.files.file_models import File
+from intric.main.config import get_settings
+
+# Bump when a change to the transcription changes the transcripts, so that
+# transcripts cached by checksum are transcribed again
+TRANSCRIBER_VERSION = 2
 
 
 class Transcriber:
-    def __init__(self, adapter: OpenAISTTModelAdapter):
+    def __init__(
+        self,
+        adapter: OpenAISTTModelAdapter,
+        blob_store: Optional[BlobStore] = None,
+        cache: Optional[ContentCache] = None,
+    ):
         self.adapter = adapter
+        self.blob_store = blob_store
+        self.cache = cache
+
+    @staticmethod
+    def _cache_version() -> str:
+        return f"{TRANSCRIBER_VERSION}:{get_settings().whisper_model_name}"
+
+    async def _get_cached(self, checksum: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+
+        return await self.cache.get("transcript", self._cache_version(), checksum)
+
+    async def _set_cached(self, checksum: str, transcript: str):
+        if self.cache is not None:
+            await self.cache.set(
+                "transcript", self._cache_version(), checksum, transcript
+            )
 
     async def transcribe(self, file: File):
-        if file.blob is None or not AudioMimeTypes.has_value(file.mimetype):
+        if not AudioMimeTypes.has_value(file.mimetype) or (
+            file.blob is None and self.blob_store is None
+        ):
             raise ValueError("File needs to be an audio file")
 
+        transcript = await self._get_cached(file.checksum)
+        if transcript is not None:
+            return transcript
+
         try:
             with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                temp_file.write(file.blob)
+                if file.blob is not None:
+                    temp_file.write(file.blob)
                 temp_file_path = Path(temp_file.name)
 
-            result = await self.transcribe_from_filepath(filepath=temp_file_path)
+            if file.blob is None:
+                await self.blob_store.download(file.checksum, temp_file_path)
+
+            result = await self._transcribe(temp_file_path)
         finally:
             temp_file_path.unlink()  # Clean up the temporary file
 
+        await self._set_cached(file.checksum, result)
+
         return result
 
-    async def transcribe_from_filepath(self, *, filepath: Path):
-        async with audio.to_wav(filepath) as wav_file:
-            return await self.adapter.get_text_from_file(wav_file)
+    async def _transcribe(self, filepath: Path) -> str:
+        return await self.adapter.get_text_from_filepath(filepath)
+
+    async def transcribe_from_filepath(
+        self, *, filepath: Path, checksum: Optional[str] = None
+    ):
+        """The checksum is computed if not given."""
+        if self.cache is None:
+            return await self._transcribe(filepath)
+
+        checksum = checksum or await file_checksum(filepath)
+
+        transcript = await self._get_cached(checksum)
+        if transcript is None:
+            transcript = await self._transcribe(filepath)
+            await self._set_cached(checksum, transcript)
+
+        return transcript
@@ -1,3 +1,5 @@
+import hashlib
+from functools import cached_property
 from typing import Optional
 from uuid import UUID
 
@@ -8,6 +10,10 @@ from intric.main.models import InDB
 from intric.websites.website_models import WebsiteInDBBase
 
 
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
 class InfoBlobBase(BaseModel):
     text: str
 
@@ -24,6 +30,9 @@ class InfoBlobMetadata(InfoBlobMetadataUpsertPublic):
 
 class InfoBlobAdd(InfoBlobBase, InfoBlobMetadataUpsertPublic):
     size: Optional[int] = None
+    content_hash: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
     user_id: UUID
     group_id: Optional[UUID] = None
     website_id: Optional[UUID] = None
@@ -69,7 +78,29 @@ class InfoBlobInDB(InfoBlobInDBNoText):
     text: str
 
 
-class InfoBlobInDBWithScore(InfoBlobInDB):
+class InfoBlobCrawlState(InDB):
+    """What is needed to tell if a crawled page or file has changed."""
+
+    title: Optional[str] = None
+    url: Optional[str] = None
+    content_hash: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class InfoBlobReference(InDB):
+    """The columns of an info blob that are needed to present it as a reference."""
+
+    url: Optional[str] = None
+    title: Optional[str] = None
+    embedding_model_id: UUID
+    size: int
+
+    group_id: Optional[UUID] = None
+    website_id: Optional[UUID] = None
+
+
+class InfoBlobReferenceWithScore(InfoBlobReference):
     score: float
 
 
@@ -106,6 +137,18 @@ class InfoBlobChunk(BaseModel):
     chunk_no: int
     info_blob_id: UUID
     tenant_id: UUID
+    embedding_model_id: Optional[UUID] = None
+
+    # Counted and located in the text of the info blob when it was split,
+    # missing for chunks that are not backfilled yet
+    token_count: Optional[int] = None
+    start_offset: Optional[int] = None
+    end_offset: Optional[int] = None
+
+    # Looked up more than once per chunk while it is embedded and stored
+    @cached_property
+    def text_hash(self) -> str:
+        return hash_text(self.text)
 
 
 class InfoBlobChunkWithEmbedding(InfoBlobChunk):
@@ -2,17 +2,51 @@ from typing import Optional
 from uuid import UUID
 
 import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects.postgresql import TSQUERY
 from sqlalchemy.orm import defer
 
+from intric.database import binary_copy
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import BaseRepositoryDelegate
 from intric.database.tables.info_blob_chunk_table import InfoBlobChunks
 from intric.database.tables.info_blobs_table import InfoBlobs
+from intric.database.vector_index import (
+    MAX_INDEXABLE_DIMENSIONS,
+    VectorIndexType,
+    create_vector_index_statement,
+    drop_vector_index_statement,
+    vector_index_name,
+)
 from intric.info_blobs.info_blob import (
+    InfoBlobChunk,
     InfoBlobChunkInDB,
     InfoBlobChunkInDBWithScore,
-    InfoBlobChunkWithEmbedding,
 )
+from intric.main.config import get_settings
+from intric.main.exceptions import ChunkEmbeddingMisMatchException
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Language agnostic, no stemming or stop words. Must match the
+# expression of the generated column `info_blob_chunks.text_search_vector`.
+TEXT_SEARCH_CONFIG = sa.literal_column("'simple'::regconfig")
+
+# In the order of the fields encoded by `InfoBlobChunkRepo.add`
+COPY_COLUMNS = [
+    "text",
+    "chunk_no",
+    "size",
+    "embedding",
+    "info_blob_id",
+    "tenant_id",
+    "embedding_model_id",
+    "text_hash",
+    "token_count",
+    "start_offset",
+    "end_offset",
+]
 
 
 class InfoBlobChunkRepo:
@@ -32,16 +66,108 @@ class InfoBlobChunkRepo:
             )
         )
 
-    async def add(
-        self, chunks: list[InfoBlobChunkWithEmbedding]
-    ) -> list[InfoBlobChunkInDB]:
+    async def add(self, chunks: list[InfoBlobChunk], embeddings: list[list[float]]):
+        if len(chunks) != len(embeddings):
+            raise ChunkEmbeddingMisMatchException(
+                f"Number of chunks: {len(chunks)}, Number of embeddings: {len(embeddings)}"
+            )
+
+        def _encode_row(chunk: InfoBlobChunk, embedding: list[float]):
+            text = binary_copy.encode_text(chunk.text)
+            # Same as `InfoBlobChunkWithEmbedding.size`
+            size = len(text) + len(embedding) * 4
+
+            return (
+                text,
+                binary_copy.encode_int4(chunk.chunk_no),
+                binary_copy.encode_int4(size),
+                binary_copy.encode_vector(embedding),
+                binary_copy.encode_uuid(chunk.info_blob_id),
+                binary_copy.encode_uuid(chunk.tenant_id),
+                binary_copy.encode_uuid(chunk.embedding_model_id),
+                binary_copy.encode_text(chunk.text_hash),
+                binary_copy.encode_int4(chunk.token_count),
+                binary_copy.encode_int4(chunk.start_offset),
+                binary_copy.encode_int4(chunk.end_offset),
+            )
+
+        data = binary_copy.encode_rows(
+            _encode_row(chunk, embedding)
+            for chunk, embedding in zip(chunks, embeddings)
+        )
+
+        # COPY through the connection of the session, to be part of its transaction
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_to_table(
+            InfoBlobChunks.__tablename__,
+            source=data,
+            columns=COPY_COLUMNS,
+            format="binary",
+        )
+
+    async def get_embeddings_by_text_hash(
+        self, text_hashes: list[str], *, embedding_model_id: UUID, tenant_id: UUID
+    ) -> dict[str, list[float]]:
+        """Embeddings of chunks already in the datastore with any of the texts.
+
+        Only chunks of the same tenant are reused.
+        """
+        if not text_hashes:
+            return {}
+
         stmt = (
-            sa.insert(InfoBlobChunks)
-            .values([chunk.model_dump() for chunk in chunks])
-            .returning(InfoBlobChunks)
+            sa.select(InfoBlobChunks.text_hash, InfoBlobChunks.embedding)
+            .where(InfoBlobChunks.text_hash.in_(text_hashes))
+            .where(InfoBlobChunks.embedding_model_id == embedding_model_id)
+            .where(InfoBlobChunks.tenant_id == tenant_id)
+            .distinct(InfoBlobChunks.text_hash)
         )
+        result = await self.session.execute(stmt)
 
-        return await self.delegate.get_models_from_query(stmt)
+        return {text_hash: embedding for text_hash, embedding in result}
+
+    async def get_info_blob_ids_missing_token_counts(
+        self, limit: int, after_id: Optional[UUID] = None
+    ) -> list[UUID]:
+        """A page of the info blobs with chunks without token counts, in the
+        order of their ids, after `after_id` if given."""
+        stmt = (
+            sa.select(InfoBlobs.id)
+            .where(
+                sa.exists()
+                .where(InfoBlobChunks.info_blob_id == InfoBlobs.id)
+                .where(InfoBlobChunks.token_count.is_(None))
+            )
+            .order_by(InfoBlobs.id)
+            .limit(limit)
+        )
+
+        if after_id is not None:
+            stmt = stmt.where(InfoBlobs.id > after_id)
+
+        return list(await self.session.scalars(stmt))
+
+    async def get_texts_by_info_blob(
+        self, info_blob_id: UUID
+    ) -> list[tuple[UUID, str]]:
+        """Ids and texts of the chunks, in the order of the chunks."""
+        stmt = (
+            sa.select(InfoBlobChunks.id, InfoBlobChunks.text)
+            .where(InfoBlobChunks.info_blob_id == info_blob_id)
+            .order_by(InfoBlobChunks.chunk_no)
+        )
+        result = await self.session.execute(stmt)
+
+        return [(id, text) for id, text in result]
+
+    async def update_token_counts_and_offsets(self, values: list[dict]):
+        """`values` are dicts with `id`, `token_count`, `start_offset` and
+        `end_offset` of the chunks to update."""
+        if not values:
+            return
+
+        await self.session.execute(sa.update(InfoBlobChunks), values)
 
     async def delete_by_info_blob(self, info_blob_id: UUID):
         stmt = (
@@ -52,71 +178,306 @@ class InfoBlobChunkRepo:
 
         return await self.delegate.get_models_from_query(stmt)
 
-    async def semantic_search(
+    async def _set_vector_index_search_params(self, limit: int):
+        index_type = VectorIndexType(get_settings().vector_index_type)
+
+        if index_type == VectorIndexType.IVFFLAT:
+            probes = int(get_settings().ivfflat_probes)
+            await self.session.execute(sa.text(f"SET LOCAL ivfflat.probes = {probes};"))
+        else:
+            # An HNSW index scan never returns more rows than `ef_search`,
+            # so it needs to be at least as large as the requested limit.
+            ef_search = min(max(get_settings().hnsw_ef_search, limit), 1000)
+            await self.session.execute(
+                sa.text(f"SET LOCAL hnsw.ef_search = {ef_search};")
+            )
+
+        # The chunks are filtered on the groups and websites after the index
+        # scan, so a scan of the nearest chunks in a large table could find
+        # none of a small group. An iterative scan goes on until enough chunks
+        # pass the filter. The chunks are then only approximately in order,
+        # and are ordered by their distance again.
+        if get_settings().vector_iterative_scan:
+            await self.session.execute(
+                sa.text(f"SET LOCAL {index_type.value}.iterative_scan = relaxed_order;")
+            )
+
+    @staticmethod
+    def _filter_on_embedding_model(stmt: sa.Select, embedding_model_id: UUID):
+        # Rendered as a literal, a bound parameter does not match the
+        # predicate of the partial index
+        return stmt.where(
+            InfoBlobChunks.embedding_model_id
+            == sa.bindparam(
+                "embedding_model_id", embedding_model_id, literal_execute=True
+            )
+        )
+
+    @staticmethod
+    def _cosine_distance(embedding: list[float], embedding_model_id: Optional[UUID]):
+        if embedding_model_id is None:
+            return InfoBlobChunks.embedding.cosine_distance(embedding)
+
+        # Every embedding model has its own partial index over the
+        # embeddings cast to the dimension of the model. The cast and the
+        # filter on the model must match the index definition
+        # for the planner to use it, see `intric.database.vector_index`.
+        return sa.cast(
+            InfoBlobChunks.embedding, Vector(len(embedding))
+        ).cosine_distance(embedding)
+
+    def _semantic_search_query(
         self,
         embedding: list[float],
-        *,
-        group_ids: Optional[list[UUID]] = [],
-        website_ids: Optional[list[UUID]] = [],
-        limit: int = 30,
-    ) -> list[InfoBlobChunkInDBWithScore]:
-        # Postgres will sometimes think that a sequential scan of the whole table is
-        # preferable to an index scan, when it is not. This is because this particular
-        # table has a lot of data in TOAST tables, which postgres apparently fails
-        # to account for when planning the query.
-        #
-        # The solution below is a crude one, and we should revisit this at some point
-        # in the future. This should also be the first place we look at if something
-        # is slow. Note the "LOCAL", ensuring that we only punish sequential scans for
-        # this particular session. This might make all future queries in this transaction
-        # not be able to run sequential, but we will see if that is an issue.
-        #
-        # Reference: https://github.com/pgvector/pgvector/issues/662
-        # TODO: Solve this issue in a more elegant way.
-
-        await self.session.execute(sa.text("SET LOCAL enable_seqscan = off;"))
+        embedding_model_id: Optional[UUID],
+        group_ids: list[UUID],
+        website_ids: list[UUID],
+        limit: int,
+    ):
+        distance = self._cosine_distance(embedding, embedding_model_id)
 
         stmt = (
-            sa.select(
-                InfoBlobChunks,
-                InfoBlobChunks.embedding.cosine_distance(embedding),
-                InfoBlobs.title,
+            sa.select(InfoBlobChunks.id, distance.label("distance"))
+            .join(InfoBlobs)
+            .order_by(distance)
+            .limit(limit)
+        )
+
+        if embedding_model_id is not None:
+            stmt = self._filter_on_embedding_model(stmt, embedding_model_id)
+
+        return self._filter_on_groups_and_websites(stmt, group_ids, website_ids)
+
+    @staticmethod
+    def _any_word_query(search_string: str):
+        """A query matching any of the words of the search string, such as
+        `'what' | 'is' | 'case' | '2024' | '-123'`.
+
+        The search string is usually a whole question, with words like "what"
+        and "is" that the simple config does not remove. Matching all of them
+        would rarely find the chunk with the exact term that was asked about.
+        """
+        lexemes = (
+            sa.func.unnest(
+                sa.func.tsvector_to_array(
+                    sa.func.to_tsvector(TEXT_SEARCH_CONFIG, search_string)
+                )
+            )
+            .table_valued("lexeme")
+            .render_derived()
+        )
+
+        # Quoted, so that the lexemes are taken as they are
+        quoted_lexeme = (
+            "'"
+            + sa.func.replace(
+                sa.func.replace(lexemes.c.lexeme, "\\", "\\\\"), "'", "''"
             )
+            + "'"
+        )
+        words = sa.select(sa.func.string_agg(quoted_lexeme, " | ")).scalar_subquery()
+
+        return sa.cast(sa.func.coalesce(words, ""), TSQUERY)
+
+    def _keyword_search_query(
+        self,
+        search_string: str,
+        group_ids: list[UUID],
+        website_ids: list[UUID],
+        limit: int,
+    ):
+        text_search_vector = InfoBlobChunks.text_search_vector
+
+        # The rank rewards chunks with more of the words, close together
+        text_search_query = self._any_word_query(search_string)
+        rank = sa.func.ts_rank_cd(text_search_vector, text_search_query)
+
+        stmt = (
+            sa.select(InfoBlobChunks.id, rank.label("rank"))
             .join(InfoBlobs)
-            .options(defer(InfoBlobChunks.embedding))
-            .order_by(InfoBlobChunks.embedding.cosine_distance(embedding))
+            .where(text_search_vector.bool_op("@@")(text_search_query))
+            .order_by(rank.desc())
             .limit(limit)
         )
 
-        stmt = self._filter_on_groups_and_websites(stmt, group_ids, website_ids)
+        return self._filter_on_groups_and_websites(stmt, group_ids, website_ids)
+
+    async def _get_chunks_with_score(self, ids_and_scores: sa.Subquery):
+        stmt = (
+            sa.select(InfoBlobChunks, ids_and_scores.c.score, InfoBlobs.title)
+            .join(ids_and_scores, ids_and_scores.c.id == InfoBlobChunks.id)
+            .join(InfoBlobs)
+            .options(defer(InfoBlobChunks.embedding))
+            .order_by(ids_and_scores.c.score.desc())
+        )
 
         chunks_in_db = await self.session.execute(stmt)
 
-        chunks_with_score = [
+        return [
             InfoBlobChunkInDBWithScore(
-                **chunk[0].to_dict(exclude='embedding'),
-                score=1 - chunk[1],
+                **chunk[0].to_dict(exclude=["embedding", "text_search_vector"]),
+                score=chunk[1],
                 info_blob_title=chunk[2],
             )
             for chunk in chunks_in_db
         ]
 
-        return chunks_with_score
+    async def semantic_search(
+        self,
+        embedding: list[float],
+        *,
+        embedding_model_id: Optional[UUID] = None,
+        group_ids: Optional[list[UUID]] = [],
+        website_ids: Optional[list[UUID]] = [],
+        limit: int = 30,
+    ) -> list[InfoBlobChunkInDBWithScore]:
+        if embedding_model_id is not None:
+            await self._set_vector_index_search_params(limit)
+
+        semantic = self._semantic_search_query(
+            embedding,
+            embedding_model_id=embedding_model_id,
+            group_ids=group_ids,
+            website_ids=website_ids,
+            limit=limit,
+        ).subquery()
+        ids_and_scores = sa.select(
+            semantic.c.id, (1 - semantic.c.distance).label("score")
+        ).subquery()
 
-    async def keyword_search(
+        return await self._get_chunks_with_score(ids_and_scores)
+
+    async def hybrid_search(
         self,
+        embedding: list[float],
         search_string: str,
         *,
-        group_ids: Optional[list[UUID]] = None,
+        embedding_model_id: Optional[UUID] = None,
+        group_ids: Optional[list[UUID]] = [],
+        website_ids: Optional[list[UUID]] = [],
         limit: int = 30,
-    ):
-        stmt = (
-            sa.select(InfoBlobChunks)
-            .filter(InfoBlobChunks.text.match(search_string))
+        rrf_k: int = 60,
+    ) -> list[InfoBlobChunkInDBWithScore]:
+        """Vector search and full-text search in a single round-trip.
+
+        The two result lists are fused with reciprocal rank fusion, so the
+        score of a chunk is `sum(1 / (rrf_k + rank))` over the lists it is in.
+        """
+        if embedding_model_id is not None:
+            await self._set_vector_index_search_params(limit)
+
+        semantic = self._semantic_search_query(
+            embedding,
+            embedding_model_id=embedding_model_id,
+            group_ids=group_ids,
+            website_ids=website_ids,
+            limit=limit,
+        ).subquery()
+        semantic_ranks = sa.select(
+            semantic.c.id,
+            sa.func.row_number().over(order_by=semantic.c.distance).label("rank"),
+        ).cte("semantic_ranks")
+
+        keyword = self._keyword_search_query(
+            search_string, group_ids=group_ids, website_ids=website_ids, limit=limit
+        ).subquery()
+        keyword_ranks = sa.select(
+            keyword.c.id,
+            sa.func.row_number().over(order_by=keyword.c.rank.desc()).label("rank"),
+        ).cte("keyword_ranks")
+
+        score = sa.func.coalesce(
+            1.0 / (rrf_k + semantic_ranks.c.rank), 0.0
+        ) + sa.func.coalesce(1.0 / (rrf_k + keyword_ranks.c.rank), 0.0)
+
+        ids_and_scores = (
+            sa.select(
+                sa.func.coalesce(semantic_ranks.c.id, keyword_ranks.c.id).label("id"),
+                score.label("score"),
+            )
+            .select_from(semantic_ranks)
+            .join(
+                keyword_ranks,
+                semantic_ranks.c.id == keyword_ranks.c.id,
+                full=True,
+            )
+            .order_by(score.desc())
             .limit(limit)
+            .subquery()
         )
 
-        if group_ids is not None:
-            stmt = self._filter_on_groups_and_websites(stmt, group_ids)
+        return await self._get_chunks_with_score(ids_and_scores)
 
-        return await self.delegate.get_models_from_query(stmt)
+    async def get_embedding_dimensions(self, embedding_model_id: UUID) -> Optional[int]:
+        stmt = (
+            sa.select(sa.func.vector_dims(InfoBlobChunks.embedding))
+            .where(InfoBlobChunks.embedding_model_id == embedding_model_id)
+            .limit(1)
+        )
+
+        return await self.session.scalar(stmt)
+
+    async def vector_index_is_valid(self, embedding_model_id: UUID) -> Optional[bool]:
+        """None if the model has no vector index. An index is invalid if
+        it failed, or is still being, built concurrently."""
+        stmt = sa.text(
+            "SELECT pg_index.indisvalid FROM pg_index "
+            "JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+            "WHERE pg_class.relname = :name"
+        ).bindparams(name=vector_index_name(embedding_model_id))
+
+        return await self.session.scalar(stmt)
+
+    async def _execute_outside_transaction(self, statement: sa.TextClause):
+        # Concurrent index builds can not run in a transaction,
+        # so they get a connection of their own
+        async with self.session.bind.connect() as connection:
+            connection = await connection.execution_options(
+                isolation_level="AUTOCOMMIT"
+            )
+            await connection.execute(statement)
+
+    async def create_vector_index(
+        self, embedding_model_id: UUID, dimensions: int, concurrently: bool = False
+    ):
+        if dimensions > MAX_INDEXABLE_DIMENSIONS:
+            logger.warning(
+                f"Can not index embeddings of model {embedding_model_id}: "
+                f"{dimensions} dimensions is more than {MAX_INDEXABLE_DIMENSIONS}"
+            )
+            return
+
+        statement = create_vector_index_statement(
+            embedding_model_id=embedding_model_id,
+            dimensions=dimensions,
+            index_type=get_settings().vector_index_type,
+            ivfflat_lists=get_settings().ivfflat_lists,
+            concurrently=concurrently,
+        )
+
+        if concurrently:
+            await self._execute_outside_transaction(statement)
+        else:
+            await self.session.execute(statement)
+
+    async def drop_vector_index(self, embedding_model_id: UUID):
+        await self._execute_outside_transaction(
+            drop_vector_index_statement(embedding_model_id, concurrently=True)
+        )
+
+    async def keyword_search(
+        self,
+        search_string: str,
+        *,
+        group_ids: Optional[list[UUID]] = [],
+        website_ids: Optional[list[UUID]] = [],
+        limit: int = 30,
+    ) -> list[InfoBlobChunkInDBWithScore]:
+        keyword = self._keyword_search_query(
+            search_string, group_ids=group_ids, website_ids=website_ids, limit=limit
+        ).subquery()
+        ids_and_scores = sa.select(
+            keyword.c.id, keyword.c.rank.label("score")
+        ).subquery()
+
+        return await self._get_chunks_with_score(ids_and_scores)
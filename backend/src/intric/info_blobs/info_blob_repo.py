@@ -1,7 +1,8 @@
+from typing import Optional
 from uuid import UUID
 
 import sqlalchemy as sa
-from sqlalchemy.orm import defer, selectinload
+from sqlalchemy.orm import defer, load_only, selectinload
 
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import BaseRepositoryDelegate
@@ -13,8 +14,10 @@ from intric.database.tables.websites_table import Websites
 from intric.info_blobs.info_blob import (
     InfoBlobAdd,
     InfoBlobAddToDB,
+    InfoBlobCrawlState,
     InfoBlobInDB,
     InfoBlobInDBNoText,
+    InfoBlobReference,
     InfoBlobUpdate,
 )
 
@@ -106,6 +109,31 @@ class InfoBlobRepository:
     async def get(self, id: UUID) -> InfoBlobInDB:
         return await self.delegate.get(id)
 
+    async def get_many(self, ids: list[UUID]) -> list[InfoBlobReference]:
+        if not ids:
+            return []
+
+        query = (
+            sa.select(InfoBlobs)
+            .where(InfoBlobs.id.in_(ids))
+            .options(
+                load_only(
+                    InfoBlobs.id,
+                    InfoBlobs.created_at,
+                    InfoBlobs.updated_at,
+                    InfoBlobs.url,
+                    InfoBlobs.title,
+                    InfoBlobs.embedding_model_id,
+                    InfoBlobs.size,
+                    InfoBlobs.group_id,
+                    InfoBlobs.website_id,
+                )
+            )
+        )
+        records = await self.session.scalars(query)
+
+        return [InfoBlobReference.model_validate(record) for record in records]
+
     async def get_by_title_and_group(self, title: str, group_id: UUID):
         return await self.delegate.get_by(
             conditions={InfoBlobs.title: title, InfoBlobs.group_id: group_id}
@@ -199,3 +227,30 @@ class InfoBlobRepository:
         stmt = sa.select(InfoBlobs.title).where(InfoBlobs.website_id == website_id)
         result = await self.session.scalars(stmt)
         return list(result)
+
+    async def get_crawl_states_of_website(
+        self, website_id: UUID
+    ) -> list[InfoBlobCrawlState]:
+        stmt = sa.select(
+            InfoBlobs.id,
+            InfoBlobs.created_at,
+            InfoBlobs.updated_at,
+            InfoBlobs.title,
+            InfoBlobs.url,
+            InfoBlobs.content_hash,
+            InfoBlobs.etag,
+            InfoBlobs.last_modified,
+        ).where(InfoBlobs.website_id == website_id)
+        result = await self.session.execute(stmt)
+
+        return [InfoBlobCrawlState.model_validate(row) for row in result]
+
+    async def update_http_validators(
+        self, id: UUID, etag: Optional[str], last_modified: Optional[str]
+    ):
+        stmt = (
+            sa.update(InfoBlobs)
+            .values(etag=etag, last_modified=last_modified)
+            .where(InfoBlobs.id == id)
+        )
+        await self.session.execute(stmt)
@@ -1,19 +1,23 @@
 from pathlib import Path
+from typing import Optional
 from uuid import UUID
 
 from intric.ai_models.embedding_models.datastore.datastore import Datastore
 from intric.database.database import AsyncSession
-from intric.files.text import TextExtractor
-from intric.info_blobs.info_blob import InfoBlobAdd
+from intric.files.text_extraction_service import TextExtractionService
+from intric.info_blobs.info_blob import InfoBlobAdd, InfoBlobInDB, hash_text
 from intric.info_blobs.info_blob_service import InfoBlobService
+from intric.main.logging import get_logger
 from intric.users.user import UserInDB
 
+logger = get_logger(__name__)
+
 
 class TextProcessor:
     def __init__(
         self,
         user: UserInDB,
-        extractor: TextExtractor,
+        extractor: TextExtractionService,
         datastore: Datastore,
         info_blob_service: InfoBlobService,
         session: AsyncSession,
@@ -32,11 +36,16 @@ class TextProcessor:
         mimetype: str | None = None,
         group_id: UUID | None = None,
         website_id: UUID | None = None,
-    ):
-        text = self.extractor.extract(filepath, mimetype)
+        previous_content_hash: str | None = None,
+    ) -> Optional[InfoBlobInDB]:
+        text = await self.extractor.extract(filepath, mimetype)
 
         return await self.process_text(
-            text=text, title=filename, group_id=group_id, website_id=website_id
+            text=text,
+            title=filename,
+            group_id=group_id,
+            website_id=website_id,
+            previous_content_hash=previous_content_hash,
         )
 
     async def process_text(
@@ -47,7 +56,18 @@ class TextProcessor:
         group_id: UUID | None = None,
         website_id: UUID | None = None,
         url: str | None = None,
-    ):
+        etag: str | None = None,
+        last_modified: str | None = None,
+        previous_content_hash: str | None = None,
+    ) -> Optional[InfoBlobInDB]:
+        """Returns `None`, and keeps the existing info blob as it is,
+        if the text hashes to `previous_content_hash`."""
+        content_hash = hash_text(text)
+
+        if content_hash == previous_content_hash:
+            logger.debug(f"Info blob ({title}) is unchanged, skipping")
+            return None
+
         info_blob_add = InfoBlobAdd(
             title=title,
             user_id=self.user.id,
@@ -56,6 +76,9 @@ class TextProcessor:
             url=url,
             website_id=website_id,
             tenant_id=self.user.tenant_id,
+            content_hash=content_hash,
+            etag=etag,
+            last_modified=last_modified,
         )
 
         info_blob = await self.info_blob_service.add_info_blob_without_validation(
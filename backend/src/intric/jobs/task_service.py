@@ -1,4 +1,3 @@
-import asyncio
 from tempfile import SpooledTemporaryFile
 from uuid import UUID
 
@@ -10,7 +9,7 @@ from intric.jobs.job_models import JobInDb, Task
 from intric.jobs.job_service import JobService
 from intric.jobs.task_models import EmbedGroup, Transcription, UploadInfoBlob
 from intric.main.config import get_settings
-from intric.main.exceptions import FileNotSupportedException, FileTooLargeException
+from intric.main.exceptions import FileNotSupportedException
 from intric.users.user import UserInDB
 from intric.websites.crawl_dependencies.crawl_models import CrawlTask, CrawlType
 
@@ -45,20 +44,15 @@ class TaskService:
             case _:
                 return 0
 
-    async def validate_file_size(self, file: SpooledTemporaryFile, task: Task):
-        max_size = self.get_max_size(task)
-
-        if await asyncio.to_thread(self.file_size_service.is_too_large, file, max_size):
-            raise FileTooLargeException("File too large.")
-
     async def queue_upload_file(
         self, group_id: UUID, file: SpooledTemporaryFile, mimetype: str, filename: str
     ):
         task_type = self.get_task_type(mimetype)
 
-        await self.validate_file_size(file, task_type)
-
-        filepath = await self.file_size_service.save_file_to_disk(file)
+        saved_file = await self.file_size_service.save_file_to_disk(
+            file, max_size=self.get_max_size(task_type)
+        )
+        filepath = str(saved_file.path)
 
         if task_type == Task.UPLOAD_FILE:
             params = UploadInfoBlob(
@@ -40,6 +40,17 @@ class Settings(BaseSettings):
     # Model config
     whisper_model_name: str = "whisper-1"
 
+    # Connections to the model providers, per provider
+    model_client_max_connections: int = 100
+    # Overrides, such as {"anthropic": 20}
+    model_client_max_connections_per_provider: dict[str, int] = {}
+    model_client_keepalive_expiry: float = 60
+    model_client_connect_timeout: float = 10
+    model_client_timeout: float = 600
+    # Needs the h2 package
+    model_client_http2: bool = False
+    model_client_proxy: Optional[str] = None
+
     # Infrastructure dependencies
     postgres_user: str
     postgres_host: str
@@ -95,6 +106,45 @@ class Settings(BaseSettings):
     obey_robots: bool = True
     autothrottle_enabled: bool = True
     using_crawl: bool = True
+    crawl_ingestion_concurrency: int = 8  # Shared by the crawls of a worker
+
+    # Vector search
+    vector_index_type: str = "hnsw"  # "hnsw" or "ivfflat"
+    hnsw_ef_search: int = 100
+    ivfflat_lists: int = 100
+    ivfflat_probes: int = 10
+    vector_iterative_scan: bool = True  # Needs pgvector 0.8
+    query_embedding_cache_size: int = 2048
+    query_embedding_cache_ttl: int = 60 * 60 * 24
+
+    # Embedding
+    embedding_max_concurrency: int = 4
+    embedding_max_retries: int = 5
+    embedding_tokens_per_minute: Optional[int] = None  # No budget if not set
+    embedding_max_tokens_per_request: int = 32768  # Of all the inputs together
+
+    # Transcription
+    transcription_max_concurrency: int = 4
+
+    # Sessions
+    conversation_window_size: int = 50  # Latest questions used as history
+
+    # Text extraction, in worker processes
+    text_extraction_max_workers: int = 4
+    text_extraction_timeout: int = 60 * 5
+    text_extraction_memory_limit: Optional[int] = 2 * 1024**3  # Bytes per worker
+
+    # Extracted texts and transcripts, by checksum of the file
+    content_cache_ttl: int = 60 * 60 * 24 * 30
+
+    # Blob store of files, blobs are kept in postgres if not set
+    blob_store: Optional[str] = None  # "local" or "s3"
+    blob_store_path: Optional[str] = None
+    s3_endpoint_url: Optional[str] = None
+    s3_bucket: Optional[str] = None
+    s3_region: str = "us-east-1"
+    s3_access_key_id: Optional[str] = None
+    s3_secret_access_key: Optional[str] = None
 
     @computed_field
     @property
@@ -34,6 +34,9 @@ from intric.ai_models.embedding_models.embedding_model_adapters import (
 from intric.ai_models.embedding_models.embedding_models_repo import (
     EmbeddingModelsRepository,
 )
+from intric.ai_models.embedding_models.query_embedding_cache import (
+    query_embedding_cache,
+)
 from intric.ai_models.transcription_models.model_adapters.whisper import (
     OpenAISTTModelAdapter,
 )
@@ -63,12 +66,14 @@ from intric.completion_models.domain import CompletionModelRepository
 from intric.completion_models.presentation import CompletionModelAssembler
 from intric.crawler.crawler import Crawler
 from intric.database.database import AsyncSession
+from intric.files.blob_store import blob_store
+from intric.files.content_cache import content_cache
 from intric.files.file_protocol import FileProtocol
 from intric.files.file_repo import FileRepository
 from intric.files.file_service import FileService
 from intric.files.file_size_service import FileSizeService
 from intric.files.image import ImageExtractor
-from intric.files.text import TextExtractor
+from intric.files.text_extraction_service import text_extraction_service
 from intric.files.transcriber import Transcriber
 from intric.groups.group_repo import GroupRepository
 from intric.groups.group_service import GroupService
@@ -193,6 +198,10 @@ class Container(containers.DeclarativeContainer):
     embedding_model = providers.Dependency(instance_of=EmbeddingModel)
     completion_model = providers.Dependency(instance_of=CompletionModel)
     aiohttp_client = providers.Object(aiohttp_client)
+    query_embedding_cache = providers.Object(query_embedding_cache)
+    blob_store = providers.Object(blob_store)
+    text_extraction_service = providers.Object(text_extraction_service)
+    content_cache = providers.Object(content_cache)
 
     # Factories
     space_factory = providers.Factory(SpaceFactory)
@@ -302,7 +311,9 @@ class Container(containers.DeclarativeContainer):
     analysis_repo = providers.Factory(AnalysisRepository, session=session)
     session_repo = providers.Factory(SessionRepository, session=session)
     question_repo = providers.Factory(QuestionRepository, session=session)
-    file_repo = providers.Factory(FileRepository, session=session)
+    file_repo = providers.Factory(
+        FileRepository, session=session, blob_store=blob_store
+    )
     website_repo = providers.Factory(WebsiteRepository, session=session)
     crawl_run_repo = providers.Factory(CrawlRunRepository, session=session)
 
@@ -365,8 +376,8 @@ class Container(containers.DeclarativeContainer):
         user=user,
         embedding_model_adapter=embedding_model_selector,
         info_blob_chunk_repo=info_blob_chunk_repo,
+        query_embedding_cache=query_embedding_cache,
     )
-    text_extractor = providers.Factory(TextExtractor)
     image_extractor = providers.Factory(ImageExtractor)
 
     # Services
@@ -481,8 +492,9 @@ class Container(containers.DeclarativeContainer):
     file_protocol = providers.Factory(
         FileProtocol,
         file_size_service=file_size_service,
-        text_extractor=text_extractor,
+        text_extraction_service=text_extraction_service,
         image_extractor=image_extractor,
+        blob_store=blob_store,
     )
     file_service = providers.Factory(
         FileService,
@@ -583,6 +595,7 @@ class Container(containers.DeclarativeContainer):
     completion_service = providers.Factory(
         CompletionService,
         context_builder=context_builder,
+        file_repo=file_repo,
         model_adapter=completion_model_selector,
     )
     references_service = providers.Factory(
@@ -618,7 +631,7 @@ class Container(containers.DeclarativeContainer):
     text_processor = providers.Factory(
         TextProcessor,
         user=user,
-        extractor=text_extractor,
+        extractor=text_extraction_service,
         datastore=datastore,
         info_blob_service=info_blob_service,
         session=session,
@@ -626,6 +639,8 @@ class Container(containers.DeclarativeContainer):
     transcriber = providers.Factory(
         Transcriber,
         adapter=openai_stt_model_adapter,
+        blob_store=blob_store,
+        cache=content_cache,
     )
     crawler = providers.Factory(Crawler)
 
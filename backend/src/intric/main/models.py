@@ -73,7 +73,7 @@ class CursorPaginatedResponse(PaginatedResponse):
     limit: Optional[int] = None
     next_cursor: Optional[Union[datetime, str]] = None
     previous_cursor: Optional[Union[datetime, str]] = None
-    total_count: int
+    total_count: Optional[int] = None
 
 
 class PaginatedResponseWithPublicItems(PaginatedResponse):
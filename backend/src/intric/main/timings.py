@@ -0,0 +1,32 @@
+import time
+from contextlib import contextmanager
+
+
+class Timings:
+    """Durations of the named stages of a request, in milliseconds.
+
+    Stages can run concurrently, so their durations need not add up to
+    the duration of the request.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage] = (time.perf_counter() - start) * 1000
+
+    def to_server_timing(self) -> str:
+        """The stages as the value of a `Server-Timing` header."""
+        return ", ".join(
+            f"{stage};dur={duration:.1f}" for stage, duration in self.stages.items()
+        )
+
+    def __str__(self):
+        return ", ".join(
+            f"{stage}: {duration:.1f} ms" for stage, duration in self.stages.items()
+        )
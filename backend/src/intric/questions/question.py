@@ -39,6 +39,8 @@ class QuestionBase(BaseModel):
 class QuestionAdd(QuestionBase):
     num_tokens_question: int
     num_tokens_answer: int
+    # Tokens of the question with the text of its files, as in the history
+    num_tokens_input: Optional[int] = None
     tenant_id: UUID
     completion_model_id: Optional[UUID] = None
     session_id: Optional[UUID] = None
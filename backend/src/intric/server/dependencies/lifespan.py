@@ -2,7 +2,9 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from intric.ai_models.model_clients import model_clients
 from intric.database.database import sessionmanager
+from intric.files.text_extraction_service import text_extraction_service
 from intric.jobs.job_manager import job_manager
 from intric.main.aiohttp_client import aiohttp_client
 from intric.main.config import SETTINGS
@@ -21,9 +23,14 @@ async def lifespan(app: FastAPI):
 
 async def startup():
     aiohttp_client.start()
+    model_clients.start()
     sessionmanager.init(SETTINGS.database_url)
     await job_manager.init()
 
+    await init_data()
+
+
+async def init_data():
     # init predefined roles
     await init_predefined_roles()
 
@@ -37,5 +44,7 @@ async def startup():
 async def shutdown():
     await sessionmanager.close()
     await aiohttp_client.stop()
+    await model_clients.stop()
     await job_manager.close()
     await websocket_manager.shutdown()
+    text_extraction_service.shutdown()
@@ -12,8 +12,8 @@ from intric.files.file_models import FilePublic
 from intric.groups.api.group_models import GroupInDBBase, GroupPublicBase
 from intric.info_blobs.info_blob import (
     InfoBlobChunkInDBWithScore,
-    InfoBlobInDBWithScore,
     InfoBlobPublic,
+    InfoBlobReferenceWithScore,
 )
 from intric.main.config import get_settings
 from intric.main.models import InDB, ModelId, ResourcePermissionsMixin, partial_model
@@ -113,7 +113,7 @@ class ServiceRun(BaseModel):
 class DatastoreResult(BaseModel):
     chunks: list[InfoBlobChunkInDBWithScore]
     no_duplicate_chunks: list[InfoBlobChunkInDBWithScore]
-    info_blobs: list[InfoBlobInDBWithScore]
+    info_blobs: list[InfoBlobReferenceWithScore]
 
 
 class RunnerResult(BaseModel):
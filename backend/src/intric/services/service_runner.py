@@ -1,7 +1,7 @@
 import pydantic
 
 from intric.ai_models.completion_models.completion_service import CompletionService
-from intric.ai_models.completion_models.context_builder import count_tokens
+from intric.ai_models.completion_models.context_builder import count_output_tokens
 from intric.assistants.references import ReferencesService
 from intric.files.file_service import FileService
 from intric.main.exceptions import PydanticParseError
@@ -67,15 +67,16 @@ class ServiceRunner:
 
         # Count tokens
         answer = output.to_string()
-        num_tokens_answer = count_tokens(answer)
+        num_tokens_answer = count_output_tokens(ai_response, answer)
 
         # Save
         question = QuestionAdd(
             tenant_id=self.user.tenant_id,
             question=input,
             answer=answer,
-            num_tokens_question=ai_response.total_token_count,
+            num_tokens_question=ai_response.get_input_token_count(),
             num_tokens_answer=num_tokens_answer,
+            num_tokens_input=ai_response.input_token_count,
             completion_model_id=self.service.completion_model.id,
             service_id=self.service.id,
         )
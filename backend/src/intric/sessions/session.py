@@ -31,7 +31,11 @@ class SessionUpdate(SessionBase):
     id: UUID
 
 
-class SessionInDB(SessionBase, InDB):
+class SessionMetadata(SessionBase, InDB):
+    pass
+
+
+class SessionInDB(SessionMetadata):
     user_id: UUID
     feedback_value: Optional[Literal[-1, 1]] = None
     feedback_text: Optional[str] = None
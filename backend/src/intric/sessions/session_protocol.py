@@ -1,10 +1,12 @@
 from datetime import datetime
+from typing import Optional
 
 from intric.main.models import CursorPaginatedResponse
 from intric.questions.question_protocol import to_question_public
 from intric.sessions.session import (
     SessionFeedback,
     SessionInDB,
+    SessionMetadata,
     SessionMetadataPublic,
     SessionPublic,
 )
@@ -25,13 +27,13 @@ def to_session_public(session: SessionInDB):
     )
 
 
-def to_session_metadata_public(session: SessionInDB):
+def to_session_metadata_public(session: SessionMetadata):
     return SessionMetadataPublic(**session.model_dump())
 
 
 def to_sessions_paginated_response(
-    sessions: list[SessionInDB],
-    total_count: int,
+    sessions: list[SessionMetadata],
+    total_count: Optional[int],
     limit: int | None = None,
     cursor: datetime = None,
     previous: bool = False,
@@ -7,6 +7,7 @@ from intric.assistants.assistant import Assistant
 from intric.files.file_models import File
 from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
 from intric.logging.logging import LoggingDetails
+from intric.main.config import get_settings
 from intric.main.exceptions import NotFoundException, UnauthorizedException
 from intric.questions.question import QuestionAdd
 from intric.questions.questions_repo import QuestionRepository
@@ -43,6 +44,16 @@ class SessionService:
 
         return session
 
+    async def get_conversation_window(self, id: UUID, assistant_id: UUID = None):
+        """The session with only the latest questions, for asking a follow-up."""
+        session = await self.session_repo.get_conversation_window(
+            id=id, num_questions=get_settings().conversation_window_size
+        )
+
+        self._check_exists_and_belongs_to_user(session, assistant_id=assistant_id)
+
+        return session
+
     async def get_sessions_by_assistant(
         self,
         assistant_id: UUID,
@@ -56,6 +67,8 @@ class SessionService:
             limit=limit,
             cursor=cursor,
             previous=previous,
+            # Only the first page is counted, later pages keep its count
+            with_total_count=cursor is None,
         )
 
     async def update_session(self, session_update):
@@ -83,6 +96,7 @@ class SessionService:
         num_tokens_question: int,
         num_tokens_answer: int,
         session: SessionInDB,
+        num_tokens_input: Optional[int] = None,
         completion_model: CompletionModel = None,
         info_blob_chunks: list[InfoBlobChunkInDBWithScore] = [],
         files: list[File] = [],
@@ -96,6 +110,7 @@ class SessionService:
             answer=answer,
             num_tokens_question=num_tokens_question,
             num_tokens_answer=num_tokens_answer,
+            num_tokens_input=num_tokens_input,
             completion_model_id=completion_model_id,
             session_id=session.id,
             logging_details=logging_details,
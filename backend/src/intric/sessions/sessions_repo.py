@@ -3,19 +3,27 @@ from typing import Optional
 from uuid import UUID
 
 import sqlalchemy as sa
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload
 
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import BaseRepositoryDelegate
 from intric.database.tables.assistant_table import Assistants
+from intric.database.tables.files_table import Files
 from intric.database.tables.info_blobs_table import InfoBlobs
-from intric.database.tables.questions_table import InfoBlobReferences, Questions
+from intric.database.tables.questions_table import (
+    InfoBlobReferences,
+    Questions,
+    QuestionsFiles,
+)
 from intric.database.tables.sessions_table import Sessions
 from intric.database.tables.users_table import Users
+from intric.files.file_models import File
+from intric.questions.question import Question
 from intric.sessions.session import (
     SessionAdd,
     SessionFeedback,
     SessionInDB,
+    SessionMetadata,
     SessionUpdate,
 )
 
@@ -79,6 +87,93 @@ class SessionRepository:
 
         return await self.delegate.filter_by(conditions={Sessions.user_id: user_id})
 
+    async def _get_files_of_questions(
+        self, question_ids: list[UUID]
+    ) -> dict[UUID, list[File]]:
+        # Without the blobs. Only the images of the questions that fit in the
+        # context are sent to the model, and loaded, see `CompletionService`
+        stmt = (
+            sa.select(
+                QuestionsFiles.question_id,
+                Files.id,
+                Files.created_at,
+                Files.updated_at,
+                Files.name,
+                Files.text,
+                Files.checksum,
+                Files.size,
+                Files.mimetype,
+                Files.file_type,
+                Files.user_id,
+                Files.tenant_id,
+            )
+            .join(Files, Files.id == QuestionsFiles.file_id)
+            .where(QuestionsFiles.question_id.in_(question_ids))
+            .order_by(Files.created_at)
+        )
+        result = await self.session.execute(stmt)
+
+        rows = [dict(row._mapping) for row in result]
+        question_ids_of_files = [row.pop("question_id") for row in rows]
+        files_by_question = {id: [] for id in question_ids}
+        for question_id, row in zip(question_ids_of_files, rows):
+            files_by_question[question_id].append(File(**row))
+
+        return files_by_question
+
+    async def get_conversation_window(
+        self, id: UUID, num_questions: int
+    ) -> Optional[SessionInDB]:
+        """The session with only its latest questions, as needed to ask a
+        follow-up question.
+
+        The questions have their texts, token counts and files, but no
+        references, logging details or completion model.
+        """
+        stmt = (
+            sa.select(Sessions)
+            .where(Sessions.id == id)
+            .options(
+                noload(Sessions.questions),
+                selectinload(Sessions.assistant).selectinload(Assistants.user),
+            )
+        )
+        record = await self.session.scalar(stmt)
+
+        if record is None:
+            return None
+
+        stmt = (
+            sa.select(
+                Questions.id,
+                Questions.created_at,
+                Questions.updated_at,
+                Questions.question,
+                Questions.answer,
+                Questions.num_tokens_question,
+                Questions.num_tokens_answer,
+                Questions.num_tokens_input,
+                Questions.tenant_id,
+                Questions.completion_model_id,
+                Questions.session_id,
+                Questions.tool_assistant_id,
+            )
+            .where(Questions.session_id == id)
+            .order_by(Questions.created_at.desc())
+            .limit(num_questions)
+        )
+        rows = list(await self.session.execute(stmt))
+        files_by_question = await self._get_files_of_questions([row.id for row in rows])
+
+        questions = [
+            Question(**row._mapping, files=files_by_question[row.id])
+            for row in reversed(rows)
+        ]
+
+        return SessionInDB.model_validate(record).model_copy(
+            update={"questions": questions}
+        )
+
     async def _get_total_count(
         self,
         assistant_id: int,
@@ -102,37 +197,50 @@ class SessionRepository:
         limit: int = None,
         cursor: datetime = None,
         previous: bool = False,
-    ):
-        query = (
-            sa.select(Sessions)
-            .where(Sessions.assistant_id == assistant_id)
-            .order_by(Sessions.created_at.desc())
-        )
+        with_total_count: bool = True,
+    ) -> tuple[list[SessionMetadata], Optional[int]]:
+        """Metadata of the sessions, newest first, and the total count of them
+        if `with_total_count`.
+
+        Paginated with `created_at` as the key, so a page is read from the
+        index without going through the sessions before it.
+        """
+        query = sa.select(
+            Sessions.id,
+            Sessions.name,
+            Sessions.created_at,
+            Sessions.updated_at,
+        ).where(Sessions.assistant_id == assistant_id)
 
         if user_id is not None:
             query = query.where(Sessions.user_id == user_id)
 
-        total_count = await self._get_total_count(
-            assistant_id=assistant_id, user_id=user_id
-        )
+        if cursor is not None and previous:
+            # The sessions closest after the cursor
+            query = query.where(Sessions.created_at > cursor).order_by(
+                Sessions.created_at.asc()
+            )
+        else:
+            if cursor is not None:
+                query = query.where(Sessions.created_at <= cursor)
+
+            query = query.order_by(Sessions.created_at.desc())
 
         if limit is not None:
             query = query.limit(limit + 1)
 
-        if cursor is not None:
-            if previous:
-                query = query.order_by(Sessions.created_at.asc()).where(
-                    Sessions.created_at > cursor
-                )
-                items = await self.delegate.get_models_from_query(query)
-                return (
-                    sorted(items, key=lambda x: x.created_at, reverse=True),
-                    total_count,
-                )
-            else:
-                query = query.where(Sessions.created_at <= cursor)
+        rows = list(await self.session.execute(query))
+
+        if cursor is not None and previous:
+            rows.reverse()
+
+        total_count = None
+        if with_total_count:
+            total_count = await self._get_total_count(
+                assistant_id=assistant_id, user_id=user_id
+            )
 
-        return await self.delegate.get_models_from_query(query), total_count
+        return [SessionMetadata.model_validate(row) for row in rows], total_count
 
     async def get_by_tenant(
         self, tenant_id: UUID, start_date: datetime = None, end_date: datetime = None
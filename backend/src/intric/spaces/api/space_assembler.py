@@ -180,6 +180,7 @@ class SpaceAssembler:
             name=assistant.name,
             completion_model_kwargs=assistant.completion_model_kwargs,
             logging_enabled=assistant.logging_enabled,
+            search_mode=assistant.search_mode,
             user_id=assistant.user.id,
             published=assistant.published,
             permissions=assistant.permissions,
@@ -8,7 +8,7 @@ from intric.database.tables.ai_models_table import (
     EmbeddingModels,
 )
 from intric.database.tables.groups_table import Groups
-from intric.database.tables.spaces_table import Spaces
+from intric.database.tables.spaces_table import Spaces, SpacesUsers
 from intric.groups.api.group_models import Group
 from intric.services.service import Service
 from intric.spaces.api.space_models import SpaceMember
@@ -48,19 +48,11 @@ class SpaceFactory:
         )
 
     @staticmethod
-    def create_space_from_db(
-        space_in_db: Spaces,
+    def _create_completion_models(
+        completion_models_in_db: list[tuple[CompletionModels, CompletionModelSettings]],
         user: "UserInDB",
-        groups_in_db: list[tuple[Groups, int]] = [],
-        completion_models_in_db: list[
-            tuple[CompletionModels, CompletionModelSettings]
-        ] = [],
-        embedding_models_in_db: list[tuple[EmbeddingModels, bool]] = [],
-        default_assistant: "Assistant" = None,
-        assistants: list["Assistant"] = [],
-        apps: list["App"] = [],
-    ) -> Space:
-        completion_models = [
+    ):
+        return [
             CompletionModelFactory.create_from_db(
                 completion_model=completion_model,
                 completion_model_settings=completion_model_settings,
@@ -68,17 +60,45 @@ class SpaceFactory:
             )
             for completion_model, completion_model_settings in completion_models_in_db
         ]
-        embedding_models = [
+
+    @staticmethod
+    def _create_embedding_models(
+        embedding_models_in_db: list[tuple[EmbeddingModels, bool]],
+    ):
+        return [
             EmbeddingModel(**model.to_dict(), is_org_enabled=is_org_enabled)
             for model, is_org_enabled in embedding_models_in_db
         ]
-        members = {
+
+    @staticmethod
+    def _create_members(members_in_db: list[SpacesUsers]):
+        return {
             space_user.user_id: SpaceMember(
                 **space_user.user.to_dict(), role=space_user.role
             )
-            for space_user in space_in_db.members
+            for space_user in members_in_db
             if space_user.user.deleted_at is None
         }
+
+    @classmethod
+    def create_space_from_db(
+        cls,
+        space_in_db: Spaces,
+        user: "UserInDB",
+        groups_in_db: list[tuple[Groups, int]] = [],
+        completion_models_in_db: list[
+            tuple[CompletionModels, CompletionModelSettings]
+        ] = [],
+        embedding_models_in_db: list[tuple[EmbeddingModels, bool]] = [],
+        default_assistant: "Assistant" = None,
+        assistants: list["Assistant"] = [],
+        apps: list["App"] = [],
+    ) -> Space:
+        completion_models = cls._create_completion_models(
+            completion_models_in_db, user=user
+        )
+        embedding_models = cls._create_embedding_models(embedding_models_in_db)
+        members = cls._create_members(space_in_db.members)
         groups = [
             Group(
                 **group.to_dict(),
@@ -121,3 +141,40 @@ class SpaceFactory:
             completion_models=completion_models,
             members=members,
         )
+
+    @classmethod
+    def create_sparse_space_from_db(
+        cls,
+        space_in_db: Spaces,
+        user: "UserInDB",
+        members_in_db: list[SpacesUsers],
+        completion_models_in_db: list[
+            tuple[CompletionModels, CompletionModelSettings]
+        ] = [],
+        embedding_models_in_db: list[tuple[EmbeddingModels, bool]] = [],
+    ) -> Space:
+        """A space with only the given members and its models.
+
+        Enough to authorise the members and check the models of an
+        assistant, without loading the resources of the space.
+        """
+        return Space(
+            created_at=space_in_db.created_at,
+            updated_at=space_in_db.updated_at,
+            id=space_in_db.id,
+            tenant_id=space_in_db.tenant_id,
+            user_id=space_in_db.user_id,
+            name=space_in_db.name,
+            description=space_in_db.description,
+            embedding_models=cls._create_embedding_models(embedding_models_in_db),
+            default_assistant=None,
+            assistants=[],
+            apps=[],
+            services=[],
+            groups=[],
+            websites=[],
+            completion_models=cls._create_completion_models(
+                completion_models_in_db, user=user
+            ),
+            members=cls._create_members(members_in_db),
+        )
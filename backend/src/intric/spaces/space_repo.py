@@ -384,6 +384,34 @@ class SpaceRepository:
 
         return space
 
+    async def get_sparse_space_by_assistant(self, assistant_id: UUID) -> Space:
+        """The space of the assistant with only the membership of the user
+        and the models of the space, for asking the assistant."""
+        query = sa.select(Spaces).join(Assistants).where(Assistants.id == assistant_id)
+        entry_in_db = await self.session.scalar(query)
+
+        if entry_in_db is None:
+            raise NotFoundException()
+
+        members_query = (
+            sa.select(SpacesUsers)
+            .where(SpacesUsers.space_id == entry_in_db.id)
+            .where(SpacesUsers.user_id == self.user.id)
+            .options(selectinload(SpacesUsers.user))
+        )
+        members = await self.session.scalars(members_query)
+
+        completion_models = await self._get_completion_models(entry_in_db)
+        embedding_models = await self._get_embedding_models(entry_in_db)
+
+        return self.factory.create_sparse_space_from_db(
+            entry_in_db,
+            user=self.user,
+            members_in_db=members.all(),
+            completion_models_in_db=completion_models,
+            embedding_models_in_db=embedding_models,
+        )
+
     async def get_space_by_app(self, app_id: UUID) -> Space:
         query = sa.select(Spaces).join(Apps).where(Apps.id == app_id)
 
@@ -0,0 +1,102 @@
+from typing import Iterator, Optional
+from uuid import UUID
+
+from intric.ai_models.completion_models.context_builder import count_tokens
+from intric.main.container.container import Container
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Info blobs looked up at a time
+BACKFILL_PAGE_SIZE = 1000
+
+
+def locate_chunks(
+    text: str, chunk_texts: list[str]
+) -> Iterator[tuple[Optional[int], Optional[int]]]:
+    """Start and end offsets of the chunks in the text they were split from.
+
+    The chunks are in order and may overlap. A chunk that is not found
+    gets no offsets.
+    """
+    position = 0
+
+    for chunk_text in chunk_texts:
+        start = text.find(chunk_text, position)
+
+        if start == -1:
+            yield None, None
+            continue
+
+        yield start, start + len(chunk_text)
+        position = start + 1
+
+
+async def backfill_chunk_token_counts(container: Container):
+    """Count the tokens of, and locate, the chunks added before they were
+    counted when split. The info blobs are paged through by id."""
+    session = container.session()
+    info_blob_chunk_repo = container.info_blob_chunk_repo()
+
+    num_blobs = 0
+    num_failed = 0
+    last_id = None
+    while True:
+        async with session.begin():
+            info_blob_ids = (
+                await info_blob_chunk_repo.get_info_blob_ids_missing_token_counts(
+                    limit=BACKFILL_PAGE_SIZE, after_id=last_id
+                )
+            )
+
+        if not info_blob_ids:
+            break
+
+        last_id = info_blob_ids[-1]
+        num_blobs += len(info_blob_ids)
+        num_failed += await _backfill_info_blobs(container, info_blob_ids)
+
+    if num_blobs:
+        logger.info(
+            f"Backfilled token counts of the chunks of {num_blobs} blobs, "
+            f"{num_failed} failed"
+        )
+
+    return True
+
+
+async def _backfill_info_blobs(container: Container, info_blob_ids: list[UUID]) -> int:
+    """Backfill one info blob at a time, each in a transaction.
+    Returns the number of info blobs that failed."""
+    session = container.session()
+    info_blob_repo = container.info_blob_repo()
+    info_blob_chunk_repo = container.info_blob_chunk_repo()
+
+    num_failed = 0
+    for info_blob_id in info_blob_ids:
+        try:
+            async with session.begin():
+                info_blob = await info_blob_repo.get(info_blob_id)
+                chunks = await info_blob_chunk_repo.get_texts_by_info_blob(info_blob_id)
+
+                offsets = locate_chunks(
+                    info_blob.text, [chunk_text for _, chunk_text in chunks]
+                )
+                await info_blob_chunk_repo.update_token_counts_and_offsets(
+                    [
+                        dict(
+                            id=chunk_id,
+                            token_count=count_tokens(chunk_text),
+                            start_offset=start_offset,
+                            end_offset=end_offset,
+                        )
+                        for (chunk_id, chunk_text), (start_offset, end_offset) in zip(
+                            chunks, offsets
+                        )
+                    ]
+                )
+        except Exception:
+            logger.exception(f"Could not backfill the chunks of {info_blob_id}")
+            num_failed += 1
+
+    return num_failed
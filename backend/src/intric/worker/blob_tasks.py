@@ -0,0 +1,35 @@
+from intric.main.container.container import Container
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+BATCH_SIZE = 1000
+
+
+async def delete_unused_blobs(container: Container):
+    """Remove the blobs of deleted files that no file uses anymore from the
+    blob store. One blob at a time, each in a transaction, so that a blob
+    that could not be removed is tried again the next time."""
+    blob_store = container.blob_store()
+    if blob_store is None:
+        return True
+
+    session = container.session()
+    file_repo = container.file_repo()
+
+    async with session.begin():
+        checksums = await file_repo.get_deleted_blobs(limit=BATCH_SIZE)
+
+    num_deleted = 0
+    for checksum in checksums:
+        try:
+            async with session.begin():
+                if await file_repo.remove_deleted_blob(checksum):
+                    await blob_store.delete(checksum)
+                    num_deleted += 1
+        except Exception:
+            logger.exception(f"Could not delete the blob {checksum}")
+
+    logger.info(f"Deleted {num_deleted} of {len(checksums)} blobs of deleted files")
+
+    return True
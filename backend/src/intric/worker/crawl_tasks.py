@@ -1,8 +1,20 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
 from uuid import UUID
 
 from dependency_injector import providers
 
+from intric.crawler.middlewares import HttpValidators
+from intric.crawler.parse_html import CrawledPage
+from intric.database.database import MAX_OVERFLOW, POOL_SIZE, sessionmanager
+from intric.main.config import get_settings
 from intric.main.container.container import Container
+from intric.main.container.container_overrides import (
+    override_embedding_model,
+    override_user,
+)
 from intric.main.logging import get_logger
 from intric.websites.crawl_dependencies.crawl_models import (
     CrawlRunCreate,
@@ -13,9 +25,23 @@ from intric.websites.website_models import UpdateInterval
 from intric.worker.dependencies.worker_container_overrides import (
     override_embedding_model_from_website,
 )
+from intric.worker.worker import MAX_JOBS
 
 logger = get_logger(__name__)
 
+# Pages and files are ingested concurrently, each in a session of its own.
+# The crawls of the worker share the sessions, which are limited to the
+# connections left in the pool when every job holds one
+ingestion_slots = asyncio.Semaphore(
+    max(
+        1,
+        min(
+            get_settings().crawl_ingestion_concurrency,
+            POOL_SIZE + MAX_OVERFLOW - MAX_JOBS,
+        ),
+    )
+)
+
 
 async def queue_website_crawls(container: Container):
     user_repo = container.user_repo()
@@ -55,6 +81,16 @@ async def queue_website_crawls(container: Container):
     return True
 
 
+@dataclass
+class CrawlCounts:
+    pages: int = 0
+    files: int = 0
+    failed_pages: int = 0
+    failed_files: int = 0
+    unchanged: int = 0
+    deleted_blobs: int = 0
+
+
 async def crawl_task(*, job_id: UUID, params: CrawlTask, container: Container):
     task_manager = container.task_manager(job_id=job_id)
     async with task_manager.set_status_on_exception():
@@ -66,68 +102,153 @@ async def crawl_task(*, job_id: UUID, params: CrawlTask, container: Container):
 
         # Get resources
         crawler = container.crawler()
-        uploader = container.text_processor()
         crawl_run_repo = container.crawl_run_repo()
 
         info_blob_repo = container.info_blob_repo()
         website_service = container.website_service()
 
+        user = container.user()
+        embedding_model = container.embedding_model()
+
         # Do task
         logger.info(f"Running crawl with params: {params}")
-        num_pages = 0
-        num_files = 0
-        num_̈́failed_pages = 0
-        num_failed_files = 0
-        num_deleted_blobs = 0
+        counts = CrawlCounts()
+
+        crawl_states = {
+            state.title: state
+            for state in await info_blob_repo.get_crawl_states_of_website(
+                params.website_id
+            )
+        }
+        http_validators = {
+            state.url: HttpValidators(
+                etag=state.etag, last_modified=state.last_modified
+            )
+            for state in crawl_states.values()
+            if state.url is not None
+            and (state.etag is not None or state.last_modified is not None)
+        }
+
+        crawled_titles = set()
+
+        # Pages and files waiting for a slot, so that the crawl is held
+        # back while the ingestion is behind
+        in_flight = asyncio.Semaphore(get_settings().crawl_ingestion_concurrency)
+
+        # Each page and file is ingested in a transaction of its own,
+        # so that a failure only affects that page or file
+        @asynccontextmanager
+        async def _ingestion_container():
+            async with sessionmanager.session() as session, session.begin():
+                ingestion_container = Container(session=providers.Object(session))
+                override_user(container=ingestion_container, user=user)
+                override_embedding_model(
+                    container=ingestion_container, embedding_model=embedding_model
+                )
+
+                yield ingestion_container
 
-        # Unfortunately, in this type of background task we still need to care about the session atm
-        session = container.session()
+        async def _ingest_page(page: CrawledPage):
+            title = page.url
+            previous_state = crawl_states.get(title)
 
-        existing_titles = await info_blob_repo.get_titles_of_website(params.website_id)
+            try:
+                async with _ingestion_container() as ingestion_container:
+                    info_blob = await ingestion_container.text_processor().process_text(
+                        text=page.content,
+                        title=title,
+                        website_id=params.website_id,
+                        url=page.url,
+                        etag=page.etag,
+                        last_modified=page.last_modified,
+                        previous_content_hash=(
+                            previous_state.content_hash
+                            if previous_state is not None
+                            else None
+                        ),
+                    )
 
-        crawled_titles = []
+                    # Same content, but possibly new validators
+                    if info_blob is None:
+                        counts.unchanged += 1
+                        if (page.etag, page.last_modified) != (
+                            previous_state.etag,
+                            previous_state.last_modified,
+                        ):
+                            await ingestion_container.info_blob_repo().update_http_validators(
+                                previous_state.id,
+                                etag=page.etag,
+                                last_modified=page.last_modified,
+                            )
+
+                crawled_titles.add(title)
+
+            except Exception:
+                logger.exception("Exception while uploading page")
+                counts.failed_pages += 1
+
+        async def _ingest_file(file: Path):
+            filename = file.stem
+            previous_state = crawl_states.get(filename)
+
+            try:
+                async with _ingestion_container() as ingestion_container:
+                    info_blob = await ingestion_container.text_processor().process_file(
+                        filepath=file,
+                        filename=filename,
+                        website_id=params.website_id,
+                        previous_content_hash=(
+                            previous_state.content_hash
+                            if previous_state is not None
+                            else None
+                        ),
+                    )
+
+                if info_blob is None:
+                    counts.unchanged += 1
+                crawled_titles.add(filename)
+
+            except Exception:
+                logger.exception("Exception while uploading file")
+                counts.failed_files += 1
+
+        async def _ingest(ingest_func, item):
+            # The shared slot is taken by the task itself, so a task that
+            # is cancelled before it starts does not hold one
+            try:
+                async with ingestion_slots:
+                    await ingest_func(item)
+            finally:
+                in_flight.release()
 
         async with crawler.crawl(
             url=params.url,
             download_files=params.download_files,
             crawl_type=params.crawl_type,
+            http_validators=http_validators,
         ) as crawl:
-            for page in crawl.pages:
-                num_pages += 1
-                try:
-                    title = page.url
-                    async with session.begin_nested():
-                        await uploader.process_text(
-                            text=page.content,
-                            title=title,
-                            website_id=params.website_id,
-                            url=page.url,
-                        )
-                    crawled_titles.append(title)
-
-                except Exception:
-                    logger.exception("Exception while uploading page")
-                    num_̈́failed_pages += 1
-
-            for file in crawl.files:
-                num_files += 1
-                try:
-                    filename = file.stem
-                    async with session.begin_nested():
-                        await uploader.process_file(
-                            filepath=file,
-                            filename=filename,
-                            website_id=params.website_id,
-                        )
-
-                    crawled_titles.append(filename)
-                except Exception:
-                    logger.exception("Exception while uploading file")
-                    num_failed_files += 1
-
-            for title in existing_titles:
+            async with asyncio.TaskGroup() as task_group:
+                async for page in crawl.pages:
+                    counts.pages += 1
+
+                    # Not modified according to the server
+                    if page.unchanged:
+                        counts.unchanged += 1
+                        crawled_titles.add(page.url)
+                        continue
+
+                    await in_flight.acquire()
+                    task_group.create_task(_ingest(_ingest_page, page))
+
+                for file in crawl.files:
+                    counts.files += 1
+
+                    await in_flight.acquire()
+                    task_group.create_task(_ingest(_ingest_file, file))
+
+            for title in crawl_states:
                 if title not in crawled_titles:
-                    num_deleted_blobs += 1
+                    counts.deleted_blobs += 1
                     await info_blob_repo.delete_by_title_and_website(
                         title=title, website_id=params.website_id
                     )
@@ -135,18 +256,19 @@ async def crawl_task(*, job_id: UUID, params: CrawlTask, container: Container):
             await website_service.update_website_size(params.website_id)
 
             logger.info(
-                f"Crawler finished. {num_pages} pages, {num_̈́failed_pages} failed. "
-                f"{num_files} files, {num_failed_files} failed. "
-                f"{num_deleted_blobs} blobs deleted."
+                f"Crawler finished. {counts.pages} pages, {counts.failed_pages} failed. "
+                f"{counts.files} files, {counts.failed_files} failed. "
+                f"{counts.unchanged} pages and files unchanged. "
+                f"{counts.deleted_blobs} blobs deleted."
             )
 
             await crawl_run_repo.update(
                 CrawlRunUpdate(
                     id=params.run_id,
-                    pages_crawled=num_pages,
-                    files_downloaded=num_files,
-                    pages_failed=num_̈́failed_pages,
-                    files_failed=num_failed_files,
+                    pages_crawled=counts.pages,
+                    files_downloaded=counts.files,
+                    pages_failed=counts.failed_pages,
+                    files_failed=counts.failed_files,
                 )
             )
 
@@ -1,8 +1,11 @@
 from intric.jobs.task_models import Transcription, UploadInfoBlob
 from intric.main.container.container import Container
 from intric.websites.crawl_dependencies.crawl_models import CrawlTask
+from intric.worker.backfill_tasks import backfill_chunk_token_counts
+from intric.worker.blob_tasks import delete_unused_blobs
 from intric.worker.crawl_tasks import crawl_task, queue_website_crawls
 from intric.worker.upload_tasks import transcription_task, upload_info_blob_task
+from intric.worker.vector_index_tasks import create_missing_vector_indexes
 from intric.worker.worker import Worker
 
 worker = Worker()
@@ -28,3 +31,19 @@ async def crawl(job_id: str, params: CrawlTask, container: Container):
 @worker.cron_job(weekday="fri", hour=23, minute=0)
 async def crawl_all_websites(container: Container):
     return await queue_website_crawls(container=container)
+
+
+@worker.cron_job(hour=2, minute=0)
+async def backfill_chunks(container: Container):
+    return await backfill_chunk_token_counts(container=container)
+
+
+@worker.cron_job(minute=30)
+async def delete_blobs_of_deleted_files(container: Container):
+    return await delete_unused_blobs(container=container)
+
+
+# New embedding models get their index shortly after they store embeddings
+@worker.cron_job(minute={0, 10, 20, 30, 40, 50})
+async def create_vector_indexes(container: Container):
+    return await create_missing_vector_indexes(container=container)
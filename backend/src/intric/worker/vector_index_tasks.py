@@ -0,0 +1,54 @@
+from intric.main.container.container import Container
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+async def create_missing_vector_indexes(container: Container):
+    """Build the vector index of every embedding model that does not have
+    one yet. Built concurrently, so ingestion and search go on meanwhile."""
+    session = container.session()
+    embedding_model_repo = container.embedding_model_repo()
+    info_blob_chunk_repo = container.info_blob_chunk_repo()
+
+    async with session.begin():
+        models = [
+            *await embedding_model_repo.get_models(is_deprecated=False),
+            *await embedding_model_repo.get_models(is_deprecated=True),
+        ]
+
+        missing_indexes = []
+        for model in models:
+            is_valid = await info_blob_chunk_repo.vector_index_is_valid(model.id)
+            if is_valid:
+                continue
+
+            # Models without configured dimensions get their index
+            # once they have embedded something
+            dimensions = model.dimensions or (
+                await info_blob_chunk_repo.get_embedding_dimensions(model.id)
+            )
+            if dimensions is None:
+                continue
+
+            missing_indexes.append((model.id, dimensions, is_valid is False))
+
+    for embedding_model_id, dimensions, is_invalid in missing_indexes:
+        try:
+            # A failed concurrent build leaves an invalid index behind,
+            # which IF NOT EXISTS would keep
+            if is_invalid:
+                await info_blob_chunk_repo.drop_vector_index(embedding_model_id)
+
+            logger.info(f"Building the vector index of model {embedding_model_id}")
+            await info_blob_chunk_repo.create_vector_index(
+                embedding_model_id=embedding_model_id,
+                dimensions=dimensions,
+                concurrently=True,
+            )
+        except Exception:
+            logger.exception(
+                f"Could not build the vector index of model {embedding_model_id}"
+            )
+
+    return True
@@ -10,9 +10,13 @@ from arq.connections import RedisSettings
 from arq.cron import cron
 from dependency_injector import providers
 
+from intric.ai_models.model_clients import model_clients
 from intric.database.database import AsyncSession, sessionmanager
+from intric.files.text_extraction_service import text_extraction_service
+from intric.jobs.job_manager import job_manager
 from intric.jobs.task_models import ResourceTaskParams
-from intric.main.config import get_settings
+from intric.main.aiohttp_client import aiohttp_client
+from intric.main.config import SETTINGS, get_settings
 from intric.main.container.container import Container
 from intric.main.container.container_overrides import override_user
 from intric.main.logging import get_logger
@@ -22,6 +26,8 @@ from intric.worker.task_manager import TaskManager, WorkerConfig
 
 logger = get_logger(__name__)
 
+MAX_JOBS = 20
+
 
 class Worker:
     """
@@ -75,7 +81,7 @@ class Worker:
         self.on_shutdown = self.shutdown
         self.retry_jobs = False
         self.job_timeout = 60 * 60 * 24  # 24 hours
-        self.max_jobs = 20
+        self.max_jobs = MAX_JOBS
         self.expires_extra_ms = 604800000  # 1 week
 
     async def _create_container(
@@ -104,11 +110,20 @@ class Worker:
         return kwargs
 
     async def startup(self, ctx):
-        await lifespan.startup()
+        aiohttp_client.start()
+        model_clients.start()
+        sessionmanager.init(SETTINGS.database_url)
+        await job_manager.init()
+
+        await lifespan.init_data()
         crochet.setup()
 
     async def shutdown(self, ctx):
-        await lifespan.shutdown()
+        await sessionmanager.close()
+        await aiohttp_client.stop()
+        await model_clients.stop()
+        await job_manager.close()
+        text_extraction_service.shutdown()
 
     def function(self, with_user: bool = True):
         def decorator(func):
@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from intric.main.config import get_settings
+
+
+@pytest.fixture
+async def db_session():
+    """A session on the migrated database of the settings, in a transaction
+    that is rolled back after the test. Skips the test without a database."""
+    engine = create_async_engine(
+        get_settings().database_url, poolclass=NullPool, connect_args={"timeout": 5}
+    )
+
+    try:
+        connection = await engine.connect()
+    except Exception:
+        await engine.dispose()
+        pytest.skip("No database to test against")
+
+    transaction = await connection.begin()
+    session = AsyncSession(bind=connection, join_transaction_mode="create_savepoint")
+
+    try:
+        yield session
+    finally:
+        await session.close()
+        await transaction.rollback()
+        await connection.close()
+        await engine.dispose()
@@ -0,0 +1,141 @@
+import random
+from uuid import uuid4
+
+import pytest
+import sqlalchemy as sa
+
+from intric.database.tables.ai_models_table import EmbeddingModels
+from intric.database.tables.groups_table import Groups
+from intric.database.tables.info_blob_chunk_table import InfoBlobChunks
+from intric.database.tables.info_blobs_table import InfoBlobs
+from intric.database.tables.tenant_table import Tenants
+from intric.database.tables.users_table import Users
+from intric.info_blobs.info_blob_chunk_repo import InfoBlobChunkRepo
+
+NUM_CHUNKS_IN_LARGE_GROUP = 2000
+NUM_CHUNKS_IN_SMALL_GROUP = 5
+
+
+def _embedding(direction: list[float]) -> list[float]:
+    return [value + random.uniform(0, 0.1) for value in direction]
+
+
+@pytest.fixture
+async def groups(db_session):
+    tenant = Tenants(name=f"tenant-{uuid4()}", quota_limit=0)
+    db_session.add(tenant)
+    await db_session.flush()
+
+    user = Users(email=f"{uuid4()}@example.com", state="active", tenant_id=tenant.id)
+    embedding_model = EmbeddingModels(
+        name=f"model-{uuid4()}",
+        open_source=False,
+        dimensions=3,
+        family="openai",
+        stability="stable",
+        hosting="usa",
+    )
+    db_session.add_all([user, embedding_model])
+    await db_session.flush()
+
+    # The chunks of the small group are the furthest from the question
+    sizes_and_directions = [
+        (NUM_CHUNKS_IN_LARGE_GROUP, [1.0, 0.0, 0.0]),
+        (NUM_CHUNKS_IN_SMALL_GROUP, [0.0, 1.0, 0.0]),
+    ]
+    groups = []
+    for num_chunks, direction in sizes_and_directions:
+        group = Groups(
+            name="group",
+            size=0,
+            user_id=user.id,
+            tenant_id=tenant.id,
+            embedding_model_id=embedding_model.id,
+        )
+        db_session.add(group)
+        await db_session.flush()
+
+        info_blob = InfoBlobs(
+            text="text",
+            size=4,
+            user_id=user.id,
+            tenant_id=tenant.id,
+            group_id=group.id,
+            embedding_model_id=embedding_model.id,
+        )
+        db_session.add(info_blob)
+        await db_session.flush()
+
+        await db_session.execute(
+            sa.insert(InfoBlobChunks),
+            [
+                dict(
+                    text="text",
+                    chunk_no=chunk_no,
+                    size=4,
+                    embedding=_embedding(direction),
+                    info_blob_id=info_blob.id,
+                    tenant_id=tenant.id,
+                    embedding_model_id=embedding_model.id,
+                )
+                for chunk_no in range(num_chunks)
+            ],
+        )
+        groups.append(group)
+
+    repo = InfoBlobChunkRepo(db_session)
+    await repo.create_vector_index(embedding_model.id, dimensions=3)
+
+    return embedding_model, *groups
+
+
+async def test_semantic_search_finds_the_chunks_of_a_small_group(db_session, groups):
+    embedding_model, _, small_group = groups
+
+    # The index is used however small the table
+    await db_session.execute(sa.text("SET LOCAL enable_seqscan = off;"))
+
+    chunks = await InfoBlobChunkRepo(db_session).semantic_search(
+        [1.0, 0.0, 0.0],
+        embedding_model_id=embedding_model.id,
+        group_ids=[small_group.id],
+        limit=NUM_CHUNKS_IN_SMALL_GROUP,
+    )
+
+    assert len(chunks) == NUM_CHUNKS_IN_SMALL_GROUP
+    assert [chunk.score for chunk in chunks] == sorted(
+        (chunk.score for chunk in chunks), reverse=True
+    )
+
+
+async def test_keyword_search_finds_the_identifier_asked_about(db_session, groups):
+    embedding_model, _, small_group = groups
+
+    info_blob = InfoBlobs(
+        text="Beslut 2024-123",
+        size=15,
+        user_id=small_group.user_id,
+        tenant_id=small_group.tenant_id,
+        group_id=small_group.id,
+        embedding_model_id=embedding_model.id,
+    )
+    db_session.add(info_blob)
+    await db_session.flush()
+    db_session.add(
+        InfoBlobChunks(
+            text="Beslut i ärende 2024-123",
+            chunk_no=0,
+            size=24,
+            embedding=[0.0, 0.0, 1.0],
+            info_blob_id=info_blob.id,
+            tenant_id=small_group.tenant_id,
+            embedding_model_id=embedding_model.id,
+        )
+    )
+    await db_session.flush()
+
+    chunks = await InfoBlobChunkRepo(db_session).keyword_search(
+        "What is the decision in case 2024-123?", group_ids=[small_group.id]
+    )
+
+    assert [chunk.text for chunk in chunks] == ["Beslut i ärende 2024-123"]
@@ -1,9 +1,15 @@
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
 
-from intric.ai_models.embedding_models.datastore.datastore import autocut
-from intric.info_blobs.info_blob import InfoBlobChunkWithEmbedding
+from intric.ai_models.embedding_models.datastore.datastore import Datastore, autocut
+from intric.info_blobs.info_blob import InfoBlobChunk, InfoBlobChunkWithEmbedding
+from intric.main.exceptions import OpenAIException
 from tests.fixtures import TEST_UUID
 
+DATASTORE_MODULE = "intric.ai_models.embedding_models.datastore.datastore"
+
 
 @pytest.mark.parametrize(["cutoff", "cut_point"], [(1, 3), (2, 5), (3, 6)])
 def test_autocut1(cutoff: int, cut_point: int):
@@ -29,3 +35,125 @@ def test_chunk_size_calculation():
     size_embedding = len(embedding) * 4
 
     assert chunk.size == size_text + size_embedding
+
+
+def _get_datastore(embed_batch_size: int = 2, fail_after: Optional[int] = None):
+    async def get_embeddings(chunks):
+        batch = []
+        async for chunk in chunks:
+            if chunk.chunk_no == fail_after:
+                raise OpenAIException()
+
+            batch.append(chunk)
+            if len(batch) == embed_batch_size:
+                yield batch, [[1.0] for _ in batch]
+                batch = []
+
+        if batch:
+            yield batch, [[1.0] for _ in batch]
+
+    embedding_model_adapter = MagicMock(get_embeddings=get_embeddings)
+
+    info_blob_chunk_repo = AsyncMock()
+    info_blob_chunk_repo.get_embeddings_by_text_hash.return_value = {}
+
+    return Datastore(
+        user=MagicMock(),
+        info_blob_chunk_repo=info_blob_chunk_repo,
+        embedding_model_adapter=embedding_model_adapter,
+    )
+
+
+def _get_chunks(num_chunks: int):
+    return [
+        InfoBlobChunk(
+            chunk_no=i, text=f"chunk {i}", info_blob_id=TEST_UUID, tenant_id=TEST_UUID
+        )
+        for i in range(num_chunks)
+    ]
+
+
+async def test_add_inserts_embedded_chunks_in_batches():
+    datastore = _get_datastore()
+    chunks = _get_chunks(7)
+
+    with (
+        patch.object(datastore, "_chunk_text", return_value=iter(chunks)),
+        patch(f"{DATASTORE_MODULE}.EMBEDDING_BATCH_SIZE", 2),
+    ):
+        await datastore.add(MagicMock(), batch_size=4)
+
+    inserted = [call.args for call in datastore.chunk_repo.add.await_args_list]
+    assert [len(chunks) for chunks, _ in inserted] == [4, 3]
+    assert [chunk for chunks, _ in inserted for chunk in chunks] == chunks
+    assert all(len(chunks) == len(embeddings) for chunks, embeddings in inserted)
+
+
+async def test_add_without_chunks_inserts_nothing():
+    datastore = _get_datastore()
+
+    with patch.object(datastore, "_chunk_text", return_value=iter([])):
+        await datastore.add(MagicMock())
+
+    datastore.chunk_repo.add.assert_not_called()
+
+
+async def test_add_raises_embedding_errors():
+    datastore = _get_datastore(fail_after=5)
+
+    with patch.object(datastore, "_chunk_text", return_value=iter(_get_chunks(7))):
+        with pytest.raises(OpenAIException):
+            await datastore.add(MagicMock(), batch_size=2)
+
+
+async def test_add_reuses_embeddings_of_same_texts():
+    datastore = _get_datastore()
+    chunks = _get_chunks(3) + _get_chunks(1)
+    known_chunk = chunks[1]
+    datastore.chunk_repo.get_embeddings_by_text_hash.return_value = {
+        known_chunk.text_hash: [2.0]
+    }
+
+    embedded = []
+
+    async def get_embeddings(chunks):
+        chunks = [chunk async for chunk in chunks]
+        embedded.extend(chunks)
+        yield chunks, [[1.0] for _ in chunks]
+
+    datastore.model_adapter.get_embeddings = get_embeddings
+
+    with patch.object(datastore, "_chunk_text", return_value=iter(chunks)):
+        await datastore.add(MagicMock())
+
+    # The reused embeddings are inserted first
+    assert embedded == [chunks[0], chunks[2]]
+    datastore.chunk_repo.add.assert_awaited_once_with(
+        [chunks[1], chunks[0], chunks[3], chunks[2]], [[2.0], [1.0], [1.0], [1.0]]
+    )
+
+
+async def test_add_streams_every_chunk_into_one_embedding_call():
+    datastore = _get_datastore()
+    chunks = _get_chunks(5) + _get_chunks(1)
+    streams = []
+
+    async def get_embeddings(chunks):
+        stream = [chunk async for chunk in chunks]
+        streams.append(stream)
+        for chunk in stream:
+            yield [chunk], [[float(chunk.chunk_no)]]
+
+    datastore.model_adapter.get_embeddings = get_embeddings
+
+    with (
+        patch.object(datastore, "_chunk_text", return_value=iter(chunks)),
+        patch(f"{DATASTORE_MODULE}.EMBEDDING_BATCH_SIZE", 2),
+    ):
+        await datastore.add(MagicMock(), batch_size=10)
+
+    # The text of the last chunk is embedded once, for the first as well
+    assert streams == [chunks[:5]]
+    datastore.chunk_repo.add.assert_awaited_once_with(
+        [chunks[0], chunks[5], *chunks[1:5]], [[0.0], [0.0], [1.0], [2.0], [3.0], [4.0]]
+    )
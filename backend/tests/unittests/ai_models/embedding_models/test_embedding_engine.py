@@ -0,0 +1,179 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from intric.ai_models.embedding_models.embedding_engine import (
+    QUERY_RETRY_DELAY,
+    EmbeddingEngine,
+    EmbeddingRateLimitException,
+    TokenBudget,
+    parse_retry_after,
+)
+from intric.info_blobs.info_blob import InfoBlobChunk
+from intric.main.exceptions import BadRequestException, OpenAIException
+
+ENGINE_MODULE = "intric.ai_models.embedding_models.embedding_engine"
+
+
+@pytest.fixture
+def model():
+    return MagicMock(id=uuid4(), max_input=8191)
+
+
+@pytest.fixture
+def engine():
+    return EmbeddingEngine(
+        token_budget=TokenBudget(redis=AsyncMock(), tokens_per_minute=None),
+        max_concurrency=2,
+        max_retries=2,
+    )
+
+
+def _get_chunks(texts: list[str]):
+    return [
+        InfoBlobChunk(chunk_no=i, text=text, info_blob_id=uuid4(), tenant_id=uuid4())
+        for i, text in enumerate(texts)
+    ]
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    (
+        ({"retry-after": "2"}, 2),
+        ({"Retry-After-Ms": "500"}, 0.5),
+        ({"x-ratelimit-reset-tokens": "6m0s"}, 360),
+        ({"x-ratelimit-reset-tokens": "20ms", "retry-after": "1"}, 1),
+        ({}, None),
+        (None, None),
+    ),
+)
+def test_parse_retry_after(headers, expected):
+    assert parse_retry_after(headers) == expected
+
+
+async def test_rate_limit_pauses_for_retry_after(engine: EmbeddingEngine, model):
+    embed_func = AsyncMock(
+        side_effect=[EmbeddingRateLimitException(retry_after=3), [[1.0]]]
+    )
+
+    with patch(f"{ENGINE_MODULE}.asyncio.sleep") as sleep:
+        embeddings = await engine.embed(model, ["dog"], embed_func, tokens=1)
+
+    assert embeddings == [[1.0]]
+    assert embed_func.await_count == 2
+    assert sleep.await_args.args[0] == pytest.approx(3, abs=0.1)
+
+
+@pytest.mark.parametrize(("tokens_per_minute", "counted"), ((None, False), (10, True)))
+async def test_tokens_are_only_counted_for_the_token_budget(
+    engine: EmbeddingEngine, model, tokens_per_minute, counted
+):
+    engine.token_budget.tokens_per_minute = tokens_per_minute
+    embed_func = AsyncMock(return_value=[[1.0]])
+
+    with patch(f"{ENGINE_MODULE}.count_tokens", return_value=1) as count_tokens:
+        await engine.embed(model, ["dog"], embed_func)
+
+    assert count_tokens.called == counted
+
+
+async def test_gives_up_after_max_retries(engine: EmbeddingEngine, model):
+    embed_func = AsyncMock(side_effect=EmbeddingRateLimitException(retry_after=0))
+
+    with pytest.raises(EmbeddingRateLimitException):
+        await engine.embed(model, ["dog"], embed_func, tokens=1)
+
+    assert embed_func.await_count == 3
+
+
+async def test_bad_requests_are_not_retried(engine: EmbeddingEngine, model):
+    embed_func = AsyncMock(side_effect=BadRequestException())
+
+    with pytest.raises(BadRequestException):
+        await engine.embed(model, ["dog"], embed_func, tokens=1)
+
+    assert embed_func.await_count == 1
+
+
+async def test_embed_chunks_yields_batches_in_order(engine: EmbeddingEngine, model):
+    engine.max_tokens_per_request = 1
+    chunks = _get_chunks(["dog", "cat", "bird", "fish"])
+
+    async def embed_func(texts: list[str]):
+        return [[float(len(text))] for text in texts]
+
+    batches = [
+        (batch, embeddings)
+        async for batch, embeddings in engine.embed_chunks(model, chunks, embed_func)
+    ]
+
+    assert [batch for batch, _ in batches] == [[chunk] for chunk in chunks]
+    assert [embeddings for _, embeddings in batches] == [
+        [[3.0]],
+        [[3.0]],
+        [[4.0]],
+        [[4.0]],
+    ]
+
+
+async def test_embed_chunks_packs_batches_by_the_tokens_per_request(
+    engine: EmbeddingEngine, model
+):
+    # Far more than the batch, which is not the limit of the request
+    model.max_input = 8191
+    engine.max_tokens_per_request = 2
+    chunks = _get_chunks(["dog", "cat", "bird"])
+    embed_func = AsyncMock(side_effect=lambda texts: [[1.0] for _ in texts])
+
+    batches = [
+        batch async for batch, _ in engine.embed_chunks(model, chunks, embed_func)
+    ]
+
+    assert [len(batch) for batch in batches] == [2, 1]
+
+
+async def test_embed_query_does_not_wait_for_the_model(engine: EmbeddingEngine, model):
+    state = engine._get_state(model.id)
+    state.resume_at = float("inf")
+    await state.semaphore.acquire()
+    await state.semaphore.acquire()
+    engine.token_budget = AsyncMock()
+
+    embedding = await engine.embed_query(model, "dog", AsyncMock(return_value=[[1.0]]))
+
+    assert embedding == [1.0]
+    engine.token_budget.acquire.assert_not_called()
+
+
+async def test_embed_query_is_retried_once(engine: EmbeddingEngine, model):
+    embed_func = AsyncMock(side_effect=[OpenAIException(), OpenAIException()])
+
+    with (
+        patch(f"{ENGINE_MODULE}.asyncio.sleep") as sleep,
+        pytest.raises(OpenAIException),
+    ):
+        await engine.embed_query(model, "dog", embed_func)
+
+    assert embed_func.await_count == 2
+    sleep.assert_awaited_once_with(QUERY_RETRY_DELAY)
+
+
+async def test_token_budget_waits_for_next_window():
+    redis = AsyncMock()
+    redis.incrby.side_effect = [150, 50]
+    budget = TokenBudget(redis=redis, tokens_per_minute=100)
+
+    with patch(f"{ENGINE_MODULE}.asyncio.sleep") as sleep:
+        await budget.acquire(uuid4(), 50)
+
+    sleep.assert_awaited_once()
+    redis.decrby.assert_awaited_once()
+
+
+async def test_token_budget_ignores_redis_errors():
+    redis = AsyncMock()
+    redis.incrby.side_effect = ConnectionError()
+    budget = TokenBudget(redis=redis, tokens_per_minute=100)
+
+    await budget.acquire(uuid4(), 50)
@@ -0,0 +1,76 @@
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from intric.ai_models.embedding_models.query_embedding_cache import (
+    QueryEmbeddingCache,
+)
+
+
+@pytest.fixture
+def redis():
+    store = {}
+
+    async def _get(key):
+        return store.get(key)
+
+    async def _set(key, value, ex=None):
+        store[key] = value
+
+    return AsyncMock(get=AsyncMock(side_effect=_get), set=AsyncMock(side_effect=_set))
+
+
+@pytest.fixture
+def cache(redis: AsyncMock):
+    return QueryEmbeddingCache(redis=redis, max_size=2, ttl=60)
+
+
+async def test_miss_then_local_hit(cache: QueryEmbeddingCache):
+    model_id = uuid4()
+
+    assert await cache.get(model_id, "giraffe") is None
+    await cache.set(model_id, "giraffe", [0.5, 0.25])
+
+    assert await cache.get(model_id, "giraffe") == [0.5, 0.25]
+    assert cache.stats.misses == 1
+    assert cache.stats.local_hits == 1
+
+
+async def test_whitespace_is_normalized(cache: QueryEmbeddingCache):
+    model_id = uuid4()
+    await cache.set(model_id, "what is  a\ngiraffe ", [1.0])
+
+    assert await cache.get(model_id, "what is a giraffe") == [1.0]
+
+
+async def test_keyed_by_embedding_model(cache: QueryEmbeddingCache):
+    await cache.set(uuid4(), "giraffe", [1.0])
+
+    assert await cache.get(uuid4(), "giraffe") is None
+
+
+async def test_redis_hit_after_local_eviction(cache: QueryEmbeddingCache):
+    model_id = uuid4()
+    await cache.set(model_id, "first", [1.0])
+    await cache.set(model_id, "second", [2.0])
+    await cache.set(model_id, "third", [3.0])
+
+    assert len(cache._local) == 2
+    assert await cache.get(model_id, "first") == [1.0]
+    assert cache.stats.redis_hits == 1
+
+
+async def test_redis_stores_float32_bytes(cache: QueryEmbeddingCache, redis):
+    await cache.set(uuid4(), "giraffe", [0.5, 0.25])
+
+    value = redis.set.call_args.args[1]
+    assert np.frombuffer(value, dtype=np.float32).tolist() == [0.5, 0.25]
+
+
+async def test_redis_errors_are_misses(cache: QueryEmbeddingCache, redis):
+    redis.get.side_effect = ConnectionError()
+
+    assert await cache.get(uuid4(), "giraffe") is None
+    assert cache.stats.misses == 1
@@ -0,0 +1,45 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from intric.ai_models.completion_models.completion_model import Context, Message
+from intric.ai_models.completion_models.completion_service import CompletionService
+from intric.files.file_models import File, FileType
+
+
+def _image(blob: bytes = None):
+    return File(
+        id=uuid4(),
+        name="image.png",
+        checksum=uuid4().hex,
+        size=1,
+        file_type=FileType.IMAGE,
+        blob=blob,
+        user_id=uuid4(),
+        tenant_id=uuid4(),
+    )
+
+
+async def test_only_the_images_of_the_messages_in_the_context_are_loaded():
+    images = [_image(), _image()]
+    context = Context(
+        input="question",
+        messages=[
+            Message(question="first", answer="answer", images=images[:1]),
+            Message(question="second", answer="answer"),
+            Message(question="third", answer="answer", images=images[1:]),
+        ],
+    )
+    file_repo = AsyncMock()
+    file_repo.load_images.side_effect = lambda files: [
+        file.model_copy(update={"blob": b"bytes"}) for file in files
+    ]
+    service = CompletionService(
+        model_adapter=MagicMock(), context_builder=MagicMock(), file_repo=file_repo
+    )
+
+    context = await service._load_images_of_messages(context)
+
+    file_repo.load_images.assert_awaited_once_with(images)
+    assert [
+        [image.blob for image in message.images] for message in context.messages
+    ] == [[b"bytes"], [], [b"bytes"]]
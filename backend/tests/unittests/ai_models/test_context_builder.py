@@ -1,6 +1,6 @@
 # flake8: noqa
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 import pytest
@@ -8,6 +8,7 @@ import pytest
 from intric.ai_models.completion_models.completion_model import Message
 from intric.ai_models.completion_models.context_builder import (
     ContextBuilder,
+    count_metadata_tokens,
     count_tokens,
 )
 from intric.ai_models.completion_models.static_prompts import (
@@ -38,18 +39,27 @@ def test_context_with_info_blobs_version_2(context_builder: ContextBuilder):
             chunk_no=2,
             info_blob_id=1,
             info_blob_title="blob 1",
+            token_count=None,
+            start_offset=None,
+            end_offset=None,
         ),
         MagicMock(
             text="information about blob number 1 - chunk 1",
             chunk_no=1,
             info_blob_id=1,
             info_blob_title="blob 1",
+            token_count=None,
+            start_offset=None,
+            end_offset=None,
         ),
         MagicMock(
             text="information about blob number 2",
             chunk_no=1,
             info_blob_id=2,
             info_blob_title="blob 2",
+            token_count=None,
+            start_offset=None,
+            end_offset=None,
         ),
     ]
 
@@ -68,7 +78,8 @@ def test_context_with_info_blobs_version_2(context_builder: ContextBuilder):
 
 def test_context_with_info_blobs_version_1(context_builder: ContextBuilder):
     info_blob_chunks = [
-        MagicMock(text=f"information about blob number {i}") for i in range(3)
+        MagicMock(text=f"information about blob number {i}", token_count=None)
+        for i in range(3)
     ]
 
     expected_background_info = f"""{HALLUCINATION_GUARD}\n\n\"\"\"information about blob number 0\"\"\"
@@ -121,11 +132,15 @@ def test_context_with_messages(context_builder: ContextBuilder):
             MagicMock(
                 question="Question 1",
                 answer="Answer 1",
+                num_tokens_input=None,
+                num_tokens_answer=2,
                 files=[],
             ),
             MagicMock(
                 question="Question 2 with file",
                 answer="Answer 2",
+                num_tokens_input=None,
+                num_tokens_answer=2,
                 files=[file],
             ),
         ]
@@ -184,11 +199,15 @@ def test_context_with_messages_and_images(context_builder: ContextBuilder):
             MagicMock(
                 question="Question 1",
                 answer="Answer 1",
+                num_tokens_input=None,
+                num_tokens_answer=2,
                 files=[],
             ),
             MagicMock(
                 question="Question 2 with image",
                 answer="Answer 2",
+                num_tokens_input=None,
+                num_tokens_answer=2,
                 files=[image],
             ),
         ]
@@ -230,6 +249,7 @@ def test_truncate_knowledge_if_too_many_chunks(context_builder: ContextBuilder):
             chunk_no=i,
             info_blob_id=i,
             info_blob_title=f"blob {i}",
+            token_count=None,
         )
         for i in range(1, 10000)
     ]
@@ -243,3 +263,80 @@ def test_truncate_knowledge_if_too_many_chunks(context_builder: ContextBuilder):
 
     assert context.token_count < 10000
     assert count_tokens(context.prompt) + count_tokens(QUESTION) < 10000
+
+
+def test_chunks_are_joined_by_offsets(context_builder: ContextBuilder):
+    text = "The giraffe is tall. It eats leaves. It sleeps standing."
+    info_blob_chunks = [
+        MagicMock(
+            text=text[0:36],
+            chunk_no=1,
+            info_blob_id=1,
+            info_blob_title="blob 1",
+            token_count=8,
+            start_offset=0,
+            end_offset=36,
+        ),
+        MagicMock(
+            text=text[21:56],
+            chunk_no=2,
+            info_blob_id=1,
+            info_blob_title="blob 1",
+            token_count=8,
+            start_offset=21,
+            end_offset=56,
+        ),
+    ]
+
+    context = context_builder.build_context(
+        input_str=QUESTION,
+        info_blob_chunks=info_blob_chunks,
+        max_tokens=10000,
+        version=1,
+    )
+
+    assert context.prompt == f'{HALLUCINATION_GUARD}\n\n"""{text}"""'
+    metadata_tokens = count_tokens('"""source_title: blob 1, source_id: 1\n"""')
+    assert context.token_count == count_tokens(QUESTION) + 16 + metadata_tokens
+
+
+def test_messages_are_budgeted_with_stored_token_counts(
+    context_builder: ContextBuilder,
+):
+    session = MagicMock(
+        questions=[
+            MagicMock(
+                question=f"Question {i}",
+                answer=f"Answer {i}",
+                files=[],
+                num_tokens_input=500,
+                num_tokens_answer=2,
+            )
+            for i in range(10)
+        ]
+    )
+
+    context = context_builder.build_context(
+        input_str=QUESTION, session=session, max_tokens=10000
+    )
+
+    # Only the minimum number of messages fit in the budget for messages
+    assert [message.question for message in context.messages] == [
+        f"Question {i}" for i in range(6, 10)
+    ]
+
+
+def test_metadata_tokens_are_counted_once_per_info_blob():
+    info_blob_id = uuid4()
+    expected = count_tokens(
+        f'"""source_title: title, source_id: {str(info_blob_id)[:8]}\n"""'
+    )
+
+    with patch(
+        "intric.ai_models.completion_models.context_builder.count_tokens",
+        wraps=count_tokens,
+    ) as counter:
+        counts = [count_metadata_tokens("title", info_blob_id) for _ in range(3)]
+
+    assert counts == [expected] * 3
+    counter.assert_called_once()
@@ -0,0 +1,43 @@
+from unittest.mock import patch
+
+from intric.ai_models.model_clients import ModelClients, Provider
+from intric.main.config import get_settings
+
+
+async def test_clients_of_a_provider_share_the_connection_pool():
+    clients = ModelClients()
+
+    assert clients.openai() is clients.openai()
+    assert clients.openai()._client is clients.openai_embeddings()._client
+    assert clients.openai_embeddings().max_retries == 0
+
+    await clients.stop()
+
+
+async def test_pools_are_sized_per_provider():
+    clients = ModelClients()
+
+    with patch.object(
+        get_settings(),
+        "model_client_max_connections_per_provider",
+        {Provider.ANTHROPIC: 5},
+    ):
+        anthropic_pool = clients._get_http_client(Provider.ANTHROPIC)._transport._pool
+        openai_pool = clients._get_http_client(Provider.OPENAI)._transport._pool
+
+    assert anthropic_pool._max_connections == 5
+    assert openai_pool._max_connections == get_settings().model_client_max_connections
+
+    await clients.stop()
+
+
+async def test_stop_closes_the_clients():
+    clients = ModelClients()
+    client = clients.openai()
+    http_client = clients._get_http_client(Provider.OPENAI)
+
+    await clients.stop()
+
+    assert http_client.is_closed
+    assert clients.openai() is not client
+    await clients.stop()
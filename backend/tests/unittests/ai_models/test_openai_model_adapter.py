@@ -1,4 +1,10 @@
-from intric.ai_models.completion_models.completion_model import Context, Message
+from unittest.mock import AsyncMock, MagicMock
+
+from intric.ai_models.completion_models.completion_model import (
+    Context,
+    Message,
+    TokenUsage,
+)
 from intric.ai_models.completion_models.completion_model_adapters.openai_model_adapter import (
     OpenAIModelAdapter,
 )
@@ -66,3 +72,32 @@ async def test_create_query_with_session_without_knowledge():
     query = model_adapter.create_query_from_context(context=context)
 
     assert query == expected_query
+
+
+async def test_streamed_usage_is_set_when_the_stream_ends():
+    async def _stream():
+        for text in ["Hello", " world"]:
+            yield MagicMock(
+                choices=[MagicMock(delta=MagicMock(content=text))], usage=None
+            )
+        yield MagicMock(
+            choices=[], usage=MagicMock(prompt_tokens=20, completion_tokens=2)
+        )
+
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(return_value=_stream())
+    model_adapter = OpenAIModelAdapter(TEST_MODEL_GPT4, client=client)
+    usage = TokenUsage()
+
+    chunks = [
+        chunk
+        async for chunk in model_adapter.get_response_streaming(
+            Context(input=TEST_QUESTION), usage=usage
+        )
+    ]
+
+    assert chunks == ["Hello", " world"]
+    assert usage == TokenUsage(input_tokens=20, output_tokens=2)
+    assert client.chat.completions.create.call_args.kwargs["stream_options"] == {
+        "include_usage": True
+    }
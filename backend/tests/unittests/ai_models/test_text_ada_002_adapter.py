@@ -1,5 +1,6 @@
 from uuid import uuid4
 
+from intric.ai_models.completion_models.context_builder import count_tokens
 from intric.ai_models.embedding_models.embedding_model import (
     EmbeddingModel,
     EmbeddingModelFamily,
@@ -44,28 +45,51 @@ def _get_chunks(texts: list[str]):
     ]
 
 
-def test_chunking_is_one_chunk_if_sum_is_less_than_limit():
+async def _pack(adapter: OpenAIEmbeddingAdapter, chunks: list[InfoBlobChunk]):
+    return [
+        batch
+        async for batch in adapter.engine.pack_batches(chunks, adapter.model.max_input)
+    ]
+
+
+async def test_chunking_is_one_chunk_if_sum_is_less_than_limit():
     adapter = _get_adapter_with_max_limit(8191)
 
-    texts = ["c" * i for i in range(1, 10)]
+    texts = ["dog " * i for i in range(1, 10)]
+    chunks = _get_chunks(texts)
+
+    assert len(await _pack(adapter, chunks)) == 1
+
+
+async def test_chunking_is_two_chunks_if_sum_is_slightly_larger_than_limit():
+    texts = ["dog " * 5, "dog " * 5]
+    adapter = _get_adapter_with_max_limit(2 * count_tokens(texts[0]) - 1)
+
     chunks = _get_chunks(texts)
 
-    assert len(list(adapter._chunk_chunks(chunks))) == 1
+    assert len(await _pack(adapter, chunks)) == 2
 
 
-def test_chunking_is_two_chunks_if_sum_is_slightly_larger_than_limit():
-    adapter = _get_adapter_with_max_limit(8)
+async def test_chunking_with_three_chunks():
+    texts = ["dog " * 7, "dog " * 5, "dog " * 3, "dog " * 6]
+    adapter = _get_adapter_with_max_limit(
+        count_tokens(texts[1]) + count_tokens(texts[2])
+    )
 
-    texts = ["c" * 5, "c" * 5]
     chunks = _get_chunks(texts)
 
-    assert len(list(adapter._chunk_chunks(chunks))) == 2
+    batches = await _pack(adapter, chunks)
+
+    assert [len(batch) for batch, _ in batches] == [1, 2, 1]
 
 
-def test_chunking_with_three_chunks():
-    adapter = _get_adapter_with_max_limit(8)
+async def test_chunk_larger_than_limit_gets_its_own_batch():
+    adapter = _get_adapter_with_max_limit(2)
 
-    texts = ["c" * 7, "c" * 5, "c" * 3, "c" * 6]
+    texts = ["dog " * 5, "dog " * 5]
     chunks = _get_chunks(texts)
 
-    assert len(list(adapter._chunk_chunks(chunks))) == 3
+    batches = await _pack(adapter, chunks)
+
+    assert [len(batch) for batch, _ in batches] == [1, 1]
+    assert batches[0][1] == count_tokens(texts[0])
@@ -0,0 +1,98 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import soundfile as sf
+
+from intric.ai_models.transcription_models.model_adapters.whisper import (
+    OpenAISTTModelAdapter,
+    stitch_transcripts,
+)
+from intric.files.audio import split_at_silence
+
+SAMPLERATE = 8000
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLERATE)) / SAMPLERATE
+    return (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLERATE), dtype=np.float32)
+
+
+def _write_wav(path: Path, samples: np.ndarray) -> Path:
+    sf.write(path, samples, SAMPLERATE, subtype="PCM_16")
+    return path
+
+
+def test_stitch_transcripts_removes_repeated_words_at_seams():
+    transcripts = [
+        "The meeting is opened. First item on the",
+        "on the agenda is the budget.",
+        "The budget is approved.",
+    ]
+
+    assert stitch_transcripts(transcripts) == (
+        "The meeting is opened. First item on the agenda is the budget. "
+        "The budget is approved."
+    )
+
+
+def test_stitch_transcripts_ignores_case_and_punctuation():
+    transcripts = ["We agree, next", "agree next item.", ""]
+
+    assert stitch_transcripts(transcripts) == "We agree, next item."
+
+
+def test_split_at_silence_cuts_in_silence_with_overlap(tmp_path):
+    samples = np.concatenate([_tone(7), _silence(1), _tone(4)])
+    path = _write_wav(tmp_path / "audio.wav", samples)
+
+    segments = list(
+        split_at_silence(path, seconds=10, overlap_seconds=0.5, search_seconds=5)
+    )
+
+    assert [samplerate for _, samplerate in segments] == [SAMPLERATE] * 2
+    first, second = (segment for segment, _ in segments)
+    # Cut in the silence between 7 and 8 seconds
+    assert 7 * SAMPLERATE < len(first) < 8 * SAMPLERATE
+    # The second segment starts half a second before the cut
+    assert len(first) + len(second) == len(samples) + SAMPLERATE // 2
+
+
+async def test_segments_are_transcribed_concurrently_in_order(tmp_path):
+    samples = np.concatenate([_tone(4), _silence(1)] * 4)
+    path = _write_wav(tmp_path / "audio.wav", samples)
+
+    adapter = OpenAISTTModelAdapter(client=MagicMock(), max_concurrency=2)
+    running = 0
+    max_running = 0
+    calls = 0
+
+    async def _get_text_from_file(file: Path):
+        nonlocal running, max_running, calls
+        assert file.exists()
+        running += 1
+        max_running = max(max_running, running)
+        calls += 1
+        call = calls
+        # Earlier segments finish last
+        await asyncio.sleep(0.05 / call)
+        running -= 1
+        return f"part {call}"
+
+    adapter._get_text_from_file = _get_text_from_file
+
+    # Cut in the silences after 4, 9 and 14 seconds
+    with patch(
+        "intric.ai_models.transcription_models.model_adapters.whisper.SEGMENT_SECONDS",
+        7,
+    ):
+        text = await adapter.get_text_from_filepath(path)
+
+    assert text == "part 1 part 2 part 3 part 4"
+    assert max_running == 2
+    assert list(Path(tmp_path).iterdir()) == [path]
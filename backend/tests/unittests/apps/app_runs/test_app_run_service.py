@@ -1,5 +1,9 @@
 from unittest.mock import AsyncMock, MagicMock
 
+from intric.ai_models.completion_models.completion_model import (
+    CompletionModelResponse,
+    TokenUsage,
+)
 from intric.ai_models.completion_models.context_builder import count_tokens
 from intric.apps.app_runs.app_run_service import AppRunService
 
@@ -14,8 +18,10 @@ async def test_update_tokens_in_run():
     app_run_service.repo.get.return_value = app_run
 
     completion = "This is the output!"
-    app_run_service.app_service.run_app.return_value = MagicMock(
-        completion=completion, total_token_count=10
+    app_run_service.app_service.run_app.return_value = (
+        CompletionModelResponse.model_construct(
+            completion=completion, total_token_count=10
+        )
     )
 
     # Execute
@@ -28,3 +34,28 @@ async def test_update_tokens_in_run():
         num_tokens_input=10,
         num_tokens_output=num_tokens_output,
     )
+
+
+async def test_update_tokens_in_run_with_reported_usage():
+    app_run_service = AppRunService(
+        MagicMock(id=1), AsyncMock(), MagicMock(), AsyncMock(), AsyncMock(), AsyncMock()
+    )
+
+    app_run = MagicMock(user_id=1)
+    app_run_service.repo.get.return_value = app_run
+
+    app_run_service.app_service.run_app.return_value = (
+        CompletionModelResponse.model_construct(
+            completion="This is the output!",
+            total_token_count=10,
+            usage=TokenUsage(input_tokens=12, output_tokens=6),
+        )
+    )
+
+    await app_run_service.run_app(MagicMock(), MagicMock(), MagicMock(), MagicMock())
+
+    app_run.update.assert_called_once_with(
+        output="This is the output!",
+        num_tokens_input=12,
+        num_tokens_output=6,
+    )
@@ -13,7 +13,11 @@ from intric.assistants.api.assistant_models import (
     AssistantCreatePublic,
     AssistantUpdatePublic,
 )
-from intric.assistants.assistant_service import AssistantService
+from intric.assistants.assistant_service import (
+    AssistantService,
+    ReferenceTracker,
+    get_references,
+)
 from intric.main.config import get_settings
 from intric.main.exceptions import BadRequestException, UnauthorizedException
 from intric.main.models import ModelId
@@ -185,9 +189,9 @@ async def test_update_assistant_completion_model_in_space(setup: Setup):
 async def test_completion_model_disabled_in_space(setup: Setup):
     assistant = MagicMock(completion_model_id=uuid4(), space_id=uuid4())
     space = MagicMock()
-    space.get_assistant.return_value = assistant
     space.is_completion_model_in_space.return_value = False
-    setup.service.space_repo.get_space_by_assistant.return_value = space
+    setup.service.repo.get_by_id.return_value = assistant
+    setup.service.space_repo.get_sparse_space_by_assistant.return_value = space
 
     with pytest.raises(BadRequestException):
         await setup.service.ask(question="hello", assistant_id=MagicMock())
@@ -201,9 +205,9 @@ async def test_group_embedding_model_disabled_in_space(setup: Setup):
     )
 
     space = MagicMock()
-    space.get_assistant.return_value = assistant
     space.is_embedding_model_in_space.return_value = False
-    setup.service.space_repo.get_space_by_assistant.return_value = space
+    setup.service.repo.get_by_id.return_value = assistant
+    setup.service.space_repo.get_sparse_space_by_assistant.return_value = space
 
     with pytest.raises(BadRequestException):
         await setup.service.ask(question="hello", assistant_id=MagicMock())
@@ -217,9 +221,51 @@ async def test_website_embedding_model_disabled_in_space(setup: Setup):
     )
 
     space = MagicMock()
-    space.get_assistant.return_value = assistant
     space.is_embedding_model_in_space.return_value = False
-    setup.service.space_repo.get_space_by_assistant.return_value = space
+    setup.service.repo.get_by_id.return_value = assistant
+    setup.service.space_repo.get_sparse_space_by_assistant.return_value = space
 
     with pytest.raises(BadRequestException):
         await setup.service.ask(question="hello", assistant_id=MagicMock())
+
+
+@pytest.mark.parametrize(
+    ["is_default", "tool_space_id", "tool_is_default"],
+    [
+        (False, TEST_UUID, False),
+        (True, uuid4(), False),
+        (True, TEST_UUID, True),
+    ],
+)
+async def test_ask_tool_assistant_not_a_tool(
+    setup: Setup, is_default: bool, tool_space_id, tool_is_default: bool
+):
+    space = MagicMock(id=TEST_UUID)
+    space.is_completion_model_in_space.return_value = True
+    active_assistant = MagicMock(is_default=is_default, groups=[], websites=[])
+    tool_assistant = MagicMock(space_id=tool_space_id, is_default=tool_is_default)
+    setup.service.repo.get_by_id.side_effect = [active_assistant, tool_assistant]
+    setup.service.space_repo.get_sparse_space_by_assistant.return_value = space
+
+    with pytest.raises(BadRequestException):
+        await setup.service.ask(
+            question="hello", assistant_id=uuid4(), tool_assistant_id=uuid4()
+        )
+
+
+def test_reference_tracker_finds_references_split_between_chunks():
+    blobs = [MagicMock(id=uuid4()) for _ in range(3)]
+    prefixes = [str(blob.id)[:8] for blob in blobs]
+    answer = (
+        f'See <inref id="{prefixes[1]}"/> and <inref id="{prefixes[0]}"/>, '
+        f'again <inref id="{prefixes[1]}"/> and <inref id="ffffffff"/>.'
+    )
+    tracker = ReferenceTracker(info_blobs=blobs, version=2)
+
+    found = [
+        tracker.add(answer[start : start + 5]) for start in range(0, len(answer), 5)
+    ]
+
+    assert tracker.references == [blobs[1], blobs[0]]
+    assert tracker.references == get_references(answer, blobs, version=2)
+    assert sum(found) == 2
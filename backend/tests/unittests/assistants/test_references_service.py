@@ -4,7 +4,7 @@ from uuid import uuid4
 import pytest
 
 from intric.assistants.references import ReferencesService
-from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
+from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore, InfoBlobReference
 from tests.fixtures import TEST_UUID
 
 
@@ -61,6 +61,34 @@ def test_remove_duplicate_chunks_multiple_info_blobs():
     ]
 
 
+async def test_get_info_blobs_from_chunks_in_one_query():
+    info_blobs_repo = AsyncMock()
+    service = ReferencesService(info_blobs_repo, AsyncMock())
+
+    blob_2_id = uuid4()
+    missing_blob_id = uuid4()
+    info_blobs_repo.get_many.return_value = [
+        InfoBlobReference(id=blob_id, embedding_model_id=uuid4(), size=1)
+        for blob_id in (blob_2_id, TEST_UUID)
+    ]
+
+    chunks = [
+        _create_chunk_with_score(0.9),
+        _create_chunk_with_score(0.7, missing_blob_id),
+        _create_chunk_with_score(0.5, blob_2_id),
+    ]
+
+    info_blobs = await service._get_info_blobs_from_chunks(chunks)
+
+    info_blobs_repo.get_many.assert_awaited_once_with(
+        [TEST_UUID, missing_blob_id, blob_2_id]
+    )
+    assert [(blob.id, blob.score) for blob in info_blobs] == [
+        (TEST_UUID, 0.9),
+        (blob_2_id, 0.5),
+    ]
+
+
 @pytest.mark.parametrize(
     ("num_questions", "expected_answer"),
     (
@@ -94,3 +122,31 @@ def test_concatenate_session_is_null():
     service = ReferencesService(AsyncMock(), AsyncMock())
     concatenated_session = service._concatenate_conversation("next question", None)
     assert concatenated_session == "next question"
+
+
+async def test_embed_question_without_knowledge_is_none():
+    datastore = AsyncMock()
+    service = ReferencesService(AsyncMock(), datastore)
+
+    assert await service.embed_question("question") is None
+    datastore.embed_query.assert_not_called()
+
+
+async def test_get_references_searches_with_the_given_embedding():
+    datastore = AsyncMock()
+    datastore.semantic_search.return_value = []
+    service = ReferencesService(
+        AsyncMock(get_many=AsyncMock(return_value=[])), datastore
+    )
+    groups = [MagicMock()]
+
+    embedding = await service.embed_question("question", groups=groups)
+    await service.get_references(
+        "question", groups=groups, question_embedding=embedding
+    )
+
+    datastore.embed_query.assert_awaited_once_with("question")
+    assert (
+        datastore.semantic_search.call_args.kwargs["search_string_embedding"]
+        == datastore.embed_query.return_value
+    )
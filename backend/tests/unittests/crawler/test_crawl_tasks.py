@@ -0,0 +1,73 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from intric.crawler.crawler import Crawl
+from intric.crawler.parse_html import CrawledPage
+from intric.main.exceptions import CrawlerException
+from intric.websites.crawl_dependencies.crawl_models import CrawlTask
+from intric.worker import crawl_tasks
+
+NUM_PAGES = 20
+
+
+@asynccontextmanager
+async def _no_status():
+    yield
+
+
+@asynccontextmanager
+async def _session():
+    yield MagicMock()
+
+
+def _container(pages):
+    @asynccontextmanager
+    async def _crawl(**_):
+        yield Crawl(pages=pages, files=[])
+
+    container = MagicMock()
+    container.task_manager.return_value.set_status_on_exception = _no_status
+    container.crawler.return_value.crawl = _crawl
+    container.info_blob_repo.return_value = AsyncMock(
+        get_crawl_states_of_website=AsyncMock(return_value=[])
+    )
+
+    return container
+
+
+async def test_failed_crawl_gives_back_the_ingestion_slots():
+    async def _pages():
+        for i in range(NUM_PAGES):
+            yield CrawledPage(url=f"https://example.com/{i}", title="", content="")
+        raise CrawlerException("Crawl failed")
+
+    ingestion_container = MagicMock()
+    ingestion_container.text_processor.return_value.process_text = (
+        lambda **_: asyncio.sleep(0.01)
+    )
+    slots = crawl_tasks.ingestion_slots._value
+
+    with (
+        patch.object(crawl_tasks, "override_embedding_model_from_website"),
+        patch.object(crawl_tasks, "override_user"),
+        patch.object(crawl_tasks, "override_embedding_model"),
+        patch.object(crawl_tasks, "sessionmanager", MagicMock(session=_session)),
+        patch.object(crawl_tasks, "Container", return_value=ingestion_container),
+    ):
+        with pytest.raises(ExceptionGroup):
+            await crawl_tasks.crawl_task(
+                job_id=uuid4(),
+                params=CrawlTask(
+                    user_id=uuid4(),
+                    website_id=uuid4(),
+                    run_id=uuid4(),
+                    url="https://example.com",
+                ),
+                container=_container(_pages()),
+            )
+
+    assert crawl_tasks.ingestion_slots._value == slots
@@ -0,0 +1,72 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from intric.crawler.crawler import Crawler
+from intric.crawler.parse_html import CrawledPage
+from intric.main.exceptions import CrawlerException
+
+
+@pytest.fixture(autouse=True)
+def reactor():
+    with patch("intric.crawler.crawler.reactor", MagicMock()) as reactor:
+        yield reactor
+
+
+def _page(url: str):
+    return CrawledPage(url=url, title=url, content="content")
+
+
+async def test_pages_are_yielded_while_crawling():
+    first_page_received = threading.Event()
+
+    def _run(*, files_dir, on_page, on_crawler):
+        on_page(_page("https://example.com/1"))
+        assert first_page_received.wait(timeout=5)
+        on_page(_page("https://example.com/2"))
+
+    urls = []
+    async with Crawler()._crawl(_run) as crawl:
+        async for page in crawl.pages:
+            urls.append(page.url)
+            first_page_received.set()
+
+    assert urls == ["https://example.com/1", "https://example.com/2"]
+
+
+async def test_crawl_without_pages_fails():
+    def _run(*, files_dir, on_page, on_crawler):
+        pass
+
+    with pytest.raises(CrawlerException):
+        async with Crawler()._crawl(_run) as crawl:
+            async for _ in crawl.pages:
+                pass
+
+
+async def test_crawl_errors_are_raised():
+    def _run(*, files_dir, on_page, on_crawler):
+        on_page(_page("https://example.com/1"))
+        raise TimeoutError()
+
+    with pytest.raises(TimeoutError):
+        async with Crawler()._crawl(_run) as crawl:
+            async for _ in crawl.pages:
+                pass
+
+
+async def test_crawl_is_stopped_if_the_pages_are_not_all_taken(reactor: MagicMock):
+    reactor.callFromThread.side_effect = lambda func, *args: func(*args)
+    stopped = threading.Event()
+
+    def _run(*, files_dir, on_page, on_crawler):
+        on_crawler(MagicMock(stop=stopped.set))
+        on_page(_page("https://example.com/1"))
+        assert stopped.wait(timeout=5)
+
+    async with Crawler()._crawl(_run) as crawl:
+        async for _ in crawl.pages:
+            break
+
+    assert stopped.is_set()
@@ -0,0 +1,28 @@
+import struct
+from uuid import uuid4
+
+from intric.database import binary_copy
+
+
+def test_encode_vector():
+    encoded = binary_copy.encode_vector([1.0, -2.5])
+
+    assert encoded == struct.pack(">hhff", 2, 0, 1.0, -2.5)
+
+
+def test_encode_rows():
+    id = uuid4()
+
+    encoded = binary_copy.encode_rows(
+        [(binary_copy.encode_text("å"), binary_copy.encode_uuid(id), None)]
+    )
+
+    assert encoded.startswith(binary_copy.HEADER)
+    assert encoded.endswith(binary_copy.TRAILER)
+    assert encoded[len(binary_copy.HEADER) : -len(binary_copy.TRAILER)] == (
+        struct.pack(">hi", 3, 2)
+        + "å".encode()
+        + struct.pack(">i", 16)
+        + id.bytes
+        + struct.pack(">i", -1)
+    )
@@ -0,0 +1,63 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, call
+from uuid import uuid4
+
+from intric.database.vector_index import (
+    create_vector_index_statement,
+    drop_vector_index_statement,
+    vector_index_name,
+)
+from intric.worker.vector_index_tasks import create_missing_vector_indexes
+
+
+def test_create_vector_index_concurrently():
+    embedding_model_id = uuid4()
+
+    statement = create_vector_index_statement(
+        embedding_model_id=embedding_model_id, dimensions=3, concurrently=True
+    )
+
+    assert str(statement).startswith(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+        f"{vector_index_name(embedding_model_id)} "
+    )
+
+
+def test_drop_vector_index_concurrently():
+    embedding_model_id = uuid4()
+
+    statement = drop_vector_index_statement(embedding_model_id, concurrently=True)
+
+    assert str(statement) == (
+        f"DROP INDEX CONCURRENTLY IF EXISTS {vector_index_name(embedding_model_id)}"
+    )
+
+
+async def test_missing_and_invalid_vector_indexes_are_built_concurrently():
+    indexed, invalid, missing, unused = (
+        MagicMock(id=uuid4(), dimensions=None) for _ in range(4)
+    )
+    is_valid = {indexed.id: True, invalid.id: False, missing.id: None, unused.id: None}
+    dimensions = {indexed.id: 3, invalid.id: 3, missing.id: 3, unused.id: None}
+
+    @asynccontextmanager
+    async def _begin():
+        yield
+
+    container = MagicMock()
+    container.session.return_value.begin = _begin
+    container.embedding_model_repo.return_value.get_models = AsyncMock(
+        side_effect=[[indexed, invalid], [missing, unused]]
+    )
+    info_blob_chunk_repo = AsyncMock()
+    info_blob_chunk_repo.vector_index_is_valid.side_effect = is_valid.get
+    info_blob_chunk_repo.get_embedding_dimensions.side_effect = dimensions.get
+    container.info_blob_chunk_repo.return_value = info_blob_chunk_repo
+
+    await create_missing_vector_indexes(container=container)
+
+    info_blob_chunk_repo.drop_vector_index.assert_awaited_once_with(invalid.id)
+    assert info_blob_chunk_repo.create_vector_index.await_args_list == [
+        call(embedding_model_id=invalid.id, dimensions=3, concurrently=True),
+        call(embedding_model_id=missing.id, dimensions=3, concurrently=True),
+    ]
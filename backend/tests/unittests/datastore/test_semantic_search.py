@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from intric.ai_models.embedding_models.datastore.datastore import Datastore
+from intric.ai_models.embedding_models.datastore.datastore_models import SearchMode
 from tests.fixtures import TEST_GROUP
 
 
@@ -27,3 +28,28 @@ async def test_semantic_search(datastore: Datastore):
             search_string="giraffe", groups=[TEST_GROUP], autocut_cutoff=1
         )
         autocut_mock.assert_called_once()
+
+
+async def test_semantic_search_is_restricted_to_embedding_model(datastore: Datastore):
+    await datastore.semantic_search(search_string="giraffe", groups=[TEST_GROUP])
+
+    datastore.chunk_repo.semantic_search.assert_awaited_once()
+    assert (
+        datastore.chunk_repo.semantic_search.call_args.kwargs["embedding_model_id"]
+        == datastore.model_adapter.model.id
+    )
+
+
+async def test_hybrid_search_uses_keyword_search_string(datastore: Datastore):
+    await datastore.semantic_search(
+        search_string="previous answer\nwhat is case 2024-123?",
+        groups=[TEST_GROUP],
+        search_mode=SearchMode.HYBRID,
+        keyword_search_string="what is case 2024-123?",
+    )
+
+    datastore.chunk_repo.semantic_search.assert_not_called()
+    datastore.chunk_repo.hybrid_search.assert_awaited_once()
+    assert (
+        datastore.chunk_repo.hybrid_search.call_args.args[1] == "what is case 2024-123?"
+    )
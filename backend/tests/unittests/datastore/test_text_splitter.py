@@ -0,0 +1,63 @@
+import pytest
+
+from intric.ai_models.completion_models.context_builder import count_tokens
+from intric.ai_models.embedding_models.datastore.text_splitter import TextSplitter
+
+PARAGRAPH = (
+    "The giraffe is a large African hoofed mammal belonging to the genus "
+    "Giraffa. It is the tallest living terrestrial animal and the largest "
+    "ruminant on Earth."
+)
+
+
+@pytest.fixture
+def splitter():
+    return TextSplitter(chunk_size=50, chunk_overlap=10)
+
+
+def test_chunks_are_at_most_chunk_size(splitter: TextSplitter):
+    text = "\n\n".join([PARAGRAPH] * 20)
+
+    chunks = list(splitter.split(text))
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.token_count <= 50
+        assert chunk.token_count == count_tokens(chunk.text)
+
+
+def test_offsets_point_to_the_chunk_text(splitter: TextSplitter):
+    text = "\n\n".join(["Åäö café 日本語 🦒 " + PARAGRAPH] * 10)
+
+    for chunk in splitter.split(text):
+        assert text[chunk.start : chunk.end] == chunk.text
+
+
+def test_prefers_cutting_between_paragraphs(splitter: TextSplitter):
+    text = "\n\n".join([PARAGRAPH] * 20)
+
+    chunks = list(splitter.split(text))
+
+    assert all(chunk.text.endswith("Earth.") for chunk in chunks[:-1])
+
+
+def test_cuts_on_tokens_without_separators(splitter: TextSplitter):
+    text = "giraffe" * 200
+
+    chunks = list(splitter.split(text))
+
+    assert len(chunks) > 1
+    assert max(chunk.token_count for chunk in chunks) == 50
+
+
+def test_chunks_overlap(splitter: TextSplitter):
+    text = " ".join(f"word{i}" for i in range(200))
+
+    chunks = list(splitter.split(text))
+
+    assert chunks[1].start < chunks[0].end
+
+
+def test_whitespace_is_not_a_chunk(splitter: TextSplitter):
+    assert list(splitter.split("  \n\n ")) == []
+    assert [chunk.text for chunk in splitter.split(" giraffe\n")] == ["giraffe"]
@@ -0,0 +1,177 @@
+import hashlib
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from intric.files.blob_store import LocalBlobStore, S3BlobStore, load_image_blobs
+from intric.files.file_models import File, FileType
+from intric.main.exceptions import NotFoundException
+
+DATA = b"some bytes" * 1000
+CHECKSUM = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def local_store(tmp_path):
+    return LocalBlobStore(root=tmp_path / "blobs")
+
+
+class _Response:
+    def __init__(self, status: int, body: bytes = b""):
+        self.status = status
+        self.content = MagicMock()
+        self.content.iter_chunked = lambda _: self._iter_body(body)
+
+    @staticmethod
+    async def _iter_body(body: bytes):
+        yield body
+
+    def raise_for_status(self):
+        assert self.status < 400
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    with patch("intric.files.blob_store.aiohttp_client", return_value=session):
+        yield session
+
+
+@pytest.fixture
+def s3_store():
+    return S3BlobStore(
+        endpoint_url="http://minio:9000",
+        bucket="intric",
+        region="us-east-1",
+        access_key_id="access",
+        secret_access_key="secret",
+    )
+
+
+def _file(file_type: FileType, blob: bytes = None, checksum: str = CHECKSUM):
+    return File(
+        id=uuid4(),
+        name="file",
+        checksum=checksum,
+        size=len(DATA),
+        file_type=file_type,
+        text="text" if file_type == FileType.TEXT else None,
+        blob=blob,
+        user_id=uuid4(),
+        tenant_id=uuid4(),
+    )
+
+
+async def test_local_store_round_trip(local_store: LocalBlobStore):
+    await local_store.put(CHECKSUM, DATA)
+
+    assert await local_store.exists(CHECKSUM)
+    assert await local_store.get(CHECKSUM) == DATA
+    assert (local_store.root / CHECKSUM[:2] / CHECKSUM).read_bytes() == DATA
+
+    await local_store.delete(CHECKSUM)
+
+    assert not await local_store.exists(CHECKSUM)
+
+
+async def test_local_store_streams_files(local_store: LocalBlobStore, tmp_path):
+    source = tmp_path / "source"
+    source.write_bytes(DATA)
+    destination = tmp_path / "destination"
+
+    await local_store.put_file(CHECKSUM, source)
+    await local_store.download(CHECKSUM, destination)
+
+    assert destination.read_bytes() == DATA
+
+
+async def test_local_store_raises_not_found(local_store: LocalBlobStore):
+    with pytest.raises(NotFoundException):
+        await local_store.get(CHECKSUM)
+
+
+async def test_store_rejects_keys_that_are_not_checksums(local_store: LocalBlobStore):
+    with pytest.raises(ValueError):
+        await local_store.put("../../etc/passwd", DATA)
+
+
+def test_s3_signature_headers(s3_store: S3BlobStore):
+    now = datetime(2024, 5, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+    headers = s3_store._sign("PUT", f"/intric/files/{CHECKSUM}", CHECKSUM, now=now)
+
+    assert headers["host"] == "minio:9000"
+    assert headers["x-amz-date"] == "20240501T120000Z"
+    assert headers["x-amz-content-sha256"] == CHECKSUM
+    assert headers["authorization"].startswith(
+        "AWS4-HMAC-SHA256 Credential=access/20240501/us-east-1/s3/aws4_request, "
+        "SignedHeaders=host;x-amz-content-sha256;x-amz-date, Signature="
+    )
+    assert headers == s3_store._sign(
+        "PUT", f"/intric/files/{CHECKSUM}", CHECKSUM, now=now
+    )
+    assert headers != s3_store._sign(
+        "GET", f"/intric/files/{CHECKSUM}", CHECKSUM, now=now
+    )
+
+
+async def test_s3_store_requests(s3_store: S3BlobStore, session):
+    url = f"http://minio:9000/intric/files/{CHECKSUM}"
+    session.request.side_effect = [
+        _Response(200),
+        _Response(200, body=DATA),
+        _Response(404),
+    ]
+
+    await s3_store.put(CHECKSUM, DATA)
+    assert await s3_store.get(CHECKSUM) == DATA
+    assert not await s3_store.exists(CHECKSUM)
+
+    assert [call.args for call in session.request.call_args_list] == [
+        ("PUT", url),
+        ("GET", url),
+        ("HEAD", url),
+    ]
+    put_headers = session.request.call_args_list[0].kwargs["headers"]
+    assert put_headers["x-amz-content-sha256"] == CHECKSUM
+    assert put_headers["authorization"].startswith("AWS4-HMAC-SHA256")
+
+
+async def test_s3_store_raises_not_found(s3_store: S3BlobStore, session):
+    session.request.return_value = _Response(404)
+
+    with pytest.raises(NotFoundException):
+        await s3_store.get(CHECKSUM)
+
+
+async def test_load_image_blobs_only_loads_missing_image_blobs():
+    blob_store = MagicMock()
+    blob_store.get = AsyncMock(return_value=DATA)
+    other_checksum = hashlib.sha256(b"other").hexdigest()
+
+    image = _file(FileType.IMAGE)
+    same_image = _file(FileType.IMAGE)
+    image_in_db = _file(FileType.IMAGE, blob=b"other", checksum=other_checksum)
+    audio = _file(FileType.AUDIO, checksum=other_checksum)
+    text = _file(FileType.TEXT)
+
+    files = await load_image_blobs(
+        blob_store, [image, same_image, image_in_db, audio, text]
+    )
+
+    blob_store.get.assert_awaited_once_with(CHECKSUM)
+    assert [file.blob for file in files] == [DATA, DATA, b"other", None, None]
+
+
+async def test_load_image_blobs_without_blob_store():
+    files = [_file(FileType.IMAGE)]
+
+    assert await load_image_blobs(None, files) == files
@@ -0,0 +1,88 @@
+import hashlib
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.files.content_cache import ContentCache
+from intric.files.file_models import File, FileType
+from intric.files.text import TextMimeTypes
+from intric.files.text_extraction_service import TextExtractionService
+from intric.files.transcriber import Transcriber
+
+CHECKSUM = hashlib.sha256(b"content").hexdigest()
+
+
+@pytest.fixture
+def redis():
+    store = {}
+
+    async def _get(key):
+        return store.get(key)
+
+    async def _set(key, value, ex=None):
+        store[key] = value
+
+    return AsyncMock(get=AsyncMock(side_effect=_get), set=AsyncMock(side_effect=_set))
+
+
+@pytest.fixture
+def cache(redis: AsyncMock):
+    return ContentCache(redis=redis, ttl=60)
+
+
+async def test_miss_then_hit(cache: ContentCache):
+    assert await cache.get("text", "1", CHECKSUM) is None
+    await cache.set("text", "1", CHECKSUM, "some text")
+
+    assert await cache.get("text", "1", CHECKSUM) == "some text"
+    assert await cache.get("text", "2", CHECKSUM) is None
+    assert await cache.get("transcript", "1", CHECKSUM) is None
+
+
+async def test_redis_errors_are_misses(cache: ContentCache, redis: AsyncMock):
+    redis.get.side_effect = ConnectionError()
+    redis.set.side_effect = ConnectionError()
+
+    await cache.set("text", "1", CHECKSUM, "some text")
+
+    assert await cache.get("text", "1", CHECKSUM) is None
+
+
+async def test_extracted_text_is_cached(cache: ContentCache, tmp_path):
+    filepath = tmp_path / "file.txt"
+    filepath.write_bytes(b"content")
+    service = TextExtractionService(max_workers=1, timeout=5, cache=cache)
+    service.stream = MagicMock(side_effect=lambda *_: _aiter(["some text"]))
+
+    for _ in range(2):
+        assert await service.extract(filepath, TextMimeTypes.TXT) == "some text"
+
+    service.stream.assert_called_once()
+    assert await cache.get("text", f"1:{TextMimeTypes.TXT}", CHECKSUM) == "some text"
+
+
+async def test_transcripts_are_cached(cache: ContentCache):
+    transcriber = Transcriber(adapter=AsyncMock(), cache=cache)
+    transcriber._transcribe = AsyncMock(return_value="transcript")
+    file = File(
+        id=uuid4(),
+        name="meeting.mp3",
+        checksum=CHECKSUM,
+        size=7,
+        mimetype="audio/mpeg",
+        file_type=FileType.AUDIO,
+        blob=b"content",
+        user_id=uuid4(),
+        tenant_id=uuid4(),
+    )
+
+    assert await transcriber.transcribe(file) == "transcript"
+    assert await transcriber.transcribe(file) == "transcript"
+
+    transcriber._transcribe.assert_awaited_once()
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
@@ -0,0 +1,107 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.files.file_models import File, FileCreate, FileType
+from intric.files.file_repo import FileRepository
+from intric.main.exceptions import BadRequestException
+from intric.worker.blob_tasks import delete_unused_blobs
+
+CHECKSUM = "a" * 64
+
+
+@pytest.fixture
+def blob_store():
+    return AsyncMock()
+
+
+@pytest.fixture
+def repo(blob_store: AsyncMock):
+    return FileRepository(session=AsyncMock(), blob_store=blob_store)
+
+
+def _file_create(blob: bytes | None = None):
+    return FileCreate(
+        name="image.png",
+        checksum=CHECKSUM,
+        size=3,
+        mimetype="image/png",
+        file_type=FileType.IMAGE,
+        blob=blob,
+        user_id="00000000-0000-0000-0000-000000000000",
+        tenant_id="00000000-0000-0000-0000-000000000000",
+    )
+
+
+async def test_delete_keeps_the_blob_until_committed(
+    repo: FileRepository, blob_store: AsyncMock
+):
+    repo._delegate = AsyncMock()
+    repo._delegate.delete.return_value = _file_create()
+
+    await repo.delete("id")
+
+    blob_store.delete.assert_not_called()
+    repo.session.execute.assert_awaited_once()
+
+
+async def test_add_fails_if_the_uploaded_blob_was_removed(
+    repo: FileRepository, blob_store: AsyncMock
+):
+    repo._delegate = AsyncMock()
+    blob_store.exists.return_value = False
+
+    with pytest.raises(BadRequestException):
+        await repo.add(_file_create())
+
+    repo._delegate.add.assert_not_called()
+
+
+async def test_add_puts_the_blob_after_locking_the_checksum(
+    repo: FileRepository, blob_store: AsyncMock
+):
+    repo._delegate = AsyncMock()
+    calls = MagicMock()
+    repo.session.execute.side_effect = lambda *_: calls.lock()
+    blob_store.put.side_effect = lambda *_: calls.put()
+
+    await repo.add(_file_create(blob=b"png"))
+
+    assert [call[0] for call in calls.mock_calls] == ["lock", "put"]
+    assert repo._delegate.add.call_args.args[0].blob is None
+
+
+async def test_delete_unused_blobs():
+    file_repo = AsyncMock()
+    file_repo.get_deleted_blobs.return_value = ["used", "unused", "failing"]
+    file_repo.remove_deleted_blob.side_effect = lambda checksum: checksum != "used"
+    blob_store = AsyncMock()
+    blob_store.delete.side_effect = lambda checksum: checksum == "failing" and 1 / 0
+    container = MagicMock(
+        blob_store=MagicMock(return_value=blob_store),
+        file_repo=MagicMock(return_value=file_repo),
+    )
+
+    assert await delete_unused_blobs(container)
+
+    assert [call.args[0] for call in blob_store.delete.await_args_list] == [
+        "unused",
+        "failing",
+    ]
+
+
+async def test_load_images_takes_the_blobs_still_in_the_database_first(
+    repo: FileRepository, blob_store: AsyncMock
+):
+    in_db, in_blob_store = (
+        File(**_file_create().model_dump(), id=uuid4()) for _ in range(2)
+    )
+    in_blob_store = in_blob_store.model_copy(update={"checksum": "b" * 64})
+    repo.session.execute.return_value = [(in_db.id, b"from db")]
+    blob_store.get.return_value = b"from blob store"
+
+    files = await repo.load_images([in_db, in_blob_store])
+
+    assert [file.blob for file in files] == [b"from db", b"from blob store"]
+    blob_store.get.assert_awaited_once_with(in_blob_store.checksum)
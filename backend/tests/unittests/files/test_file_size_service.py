@@ -0,0 +1,38 @@
+import hashlib
+import io
+from unittest.mock import patch
+
+import pytest
+
+from intric.files.file_size_service import FileSizeService
+from intric.main.exceptions import FileTooLargeException
+
+# Binary content without newlines, read in more than one chunk
+DATA = bytes(range(256)) * 10000
+
+
+@pytest.fixture(autouse=True)
+def tmp_dir(tmp_path):
+    with patch("intric.files.file_size_service.TMP_DIR", str(tmp_path)):
+        yield tmp_path
+
+
+async def test_save_file_to_disk_computes_checksum_and_size():
+    file = io.BytesIO(DATA)
+
+    saved_file = await FileSizeService.save_file_to_disk(file, max_size=len(DATA))
+
+    assert saved_file.path.read_bytes() == DATA
+    assert saved_file.checksum == hashlib.sha256(DATA).hexdigest()
+    assert saved_file.size == len(DATA)
+    assert file.closed
+
+
+async def test_save_file_to_disk_removes_too_large_files(tmp_dir):
+    file = io.BytesIO(DATA)
+
+    with pytest.raises(FileTooLargeException):
+        await FileSizeService.save_file_to_disk(file, max_size=len(DATA) - 1)
+
+    assert list(tmp_dir.iterdir()) == []
+    assert file.closed
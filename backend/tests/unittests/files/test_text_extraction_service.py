@@ -0,0 +1,82 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+import pytest
+
+from intric.files.text import TextExtractor, TextMimeTypes
+from intric.files.text_extraction_service import TextExtractionService
+from intric.main.exceptions import FileTooLargeException
+
+
+@pytest.fixture
+def service():
+    service = TextExtractionService(max_workers=2, timeout=5)
+    yield service
+    service.shutdown()
+
+
+async def test_extracts_in_worker_processes(service: TextExtractionService, tmp_path):
+    filepath = tmp_path / "file.txt"
+    filepath.write_text("  some text\n")
+
+    assert await service.extract(filepath, TextMimeTypes.TXT) == "some text"
+
+
+async def test_pdf_pages_are_extracted_in_order(service: TextExtractionService):
+    def _extract_pages(filepath, start, stop):
+        # Later pages finish first
+        time.sleep(0.01 * (100 - start) / 20)
+        return f"{start}-{stop}"
+
+    service._pool = ThreadPoolExecutor(max_workers=2)
+    with (
+        patch.object(TextExtractor, "count_pdf_pages", return_value=50),
+        patch.object(TextExtractor, "extract_from_pdf_pages", _extract_pages),
+    ):
+        texts = [text async for text in service.stream("file.pdf", TextMimeTypes.PDF)]
+
+    assert texts == ["0-20", "20-40", "40-50"]
+
+
+async def test_extraction_times_out(service: TextExtractionService):
+    service.timeout = 0.05
+    service._pool = ThreadPoolExecutor(max_workers=1)
+
+    with patch.object(TextExtractor, "extract", lambda *_: time.sleep(0.5)):
+        with pytest.raises(FileTooLargeException):
+            await service.extract("file.txt", TextMimeTypes.TXT)
+
+    assert service._pool is None
+
+
+async def test_timeout_does_not_fail_other_extractions(service: TextExtractionService):
+    start = time.monotonic()
+
+    # Both tasks are in the pool when the first one times out
+    timed_out, other = await asyncio.gather(
+        service._run(start + 0.5, time.sleep, 10),
+        service._run(start + 10, time.sleep, 1),
+        return_exceptions=True,
+    )
+
+    assert isinstance(timed_out, FileTooLargeException)
+    assert other is None
+    assert time.monotonic() - start < 5
+
+
+async def test_broken_pool_is_too_large(service: TextExtractionService):
+    pool = ThreadPoolExecutor(max_workers=1)
+
+    with (
+        patch.object(service, "_get_pool", return_value=pool),
+        patch.object(
+            TextExtractor, "extract", side_effect=BrokenProcessPool()
+        ) as extract,
+    ):
+        with pytest.raises(FileTooLargeException):
+            await service.extract("file.txt", TextMimeTypes.TXT)
+
+    assert extract.call_count == 2
@@ -0,0 +1,71 @@
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from intric.info_blobs.info_blob_chunk_repo import InfoBlobChunkRepo
+from intric.main.config import get_settings
+
+
+@pytest.fixture
+def repo():
+    return InfoBlobChunkRepo(session=AsyncMock())
+
+
+def _statements(repo: InfoBlobChunkRepo) -> list[str]:
+    return [str(call.args[0]) for call in repo.session.execute.await_args_list]
+
+
+@pytest.mark.parametrize(
+    ("index_type", "expected"),
+    (
+        (
+            "hnsw",
+            [
+                "SET LOCAL hnsw.ef_search = 100;",
+                "SET LOCAL hnsw.iterative_scan = relaxed_order;",
+            ],
+        ),
+        (
+            "ivfflat",
+            [
+                "SET LOCAL ivfflat.probes = 10;",
+                "SET LOCAL ivfflat.iterative_scan = relaxed_order;",
+            ],
+        ),
+    ),
+)
+async def test_vector_index_is_scanned_until_enough_chunks_are_found(
+    repo: InfoBlobChunkRepo, index_type, expected
+):
+    with patch.object(get_settings(), "vector_index_type", index_type):
+        await repo.semantic_search(
+            [1.0, 0.0], embedding_model_id=uuid4(), group_ids=[uuid4()], limit=10
+        )
+
+    assert _statements(repo)[:2] == expected
+
+
+async def test_iterative_scan_can_be_turned_off(repo: InfoBlobChunkRepo):
+    with patch.object(get_settings(), "vector_iterative_scan", False):
+        await repo.semantic_search([1.0, 0.0], embedding_model_id=uuid4(), limit=10)
+
+    assert not any("iterative_scan" in statement for statement in _statements(repo))
+
+
+def test_keyword_search_matches_any_word_on_the_stored_vector(
+    repo: InfoBlobChunkRepo,
+):
+    query = repo._keyword_search_query(
+        "What is case 2024-123?", group_ids=[uuid4()], website_ids=[], limit=10
+    )
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "ts_rank_cd(info_blob_chunks.text_search_vector" in sql
+    assert "info_blob_chunks.text_search_vector @@" in sql
+
+    # Only the search string is parsed, the chunks use the stored vector
+    assert "to_tsvector('simple'::regconfig, %(to_tsvector_1)s)" in sql
+    assert "info_blob_chunks.text)" not in sql
+    assert "string_agg" in sql
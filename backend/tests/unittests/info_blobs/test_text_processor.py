@@ -0,0 +1,42 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from intric.info_blobs.text_processor import TextProcessor, hash_text
+from tests.fixtures import TEST_UUID
+
+
+@pytest.fixture
+def text_processor():
+    return TextProcessor(
+        user=MagicMock(id=TEST_UUID, tenant_id=TEST_UUID),
+        extractor=MagicMock(),
+        datastore=AsyncMock(),
+        info_blob_service=AsyncMock(),
+        session=AsyncMock(),
+    )
+
+
+async def test_process_text_stores_content_hash(text_processor: TextProcessor):
+    await text_processor.process_text(
+        text="text", title="title", website_id=TEST_UUID, etag='"abc"'
+    )
+
+    service = text_processor.info_blob_service
+    info_blob_add = service.add_info_blob_without_validation.call_args.args[0]
+    assert info_blob_add.content_hash == hash_text("text")
+    assert info_blob_add.etag == '"abc"'
+    text_processor.datastore.add.assert_awaited_once()
+
+
+async def test_process_text_skips_unchanged_text(text_processor: TextProcessor):
+    info_blob = await text_processor.process_text(
+        text="text",
+        title="title",
+        website_id=TEST_UUID,
+        previous_content_hash=hash_text("text"),
+    )
+
+    assert info_blob is None
+    text_processor.info_blob_service.add_info_blob_without_validation.assert_not_called()
+    text_processor.datastore.add.assert_not_called()
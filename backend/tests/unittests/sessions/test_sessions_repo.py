@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from intric.sessions.sessions_repo import SessionRepository
+
+CURSOR = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+async def test_later_pages_are_not_counted():
+    session = AsyncMock(execute=AsyncMock(return_value=[]))
+    repo = SessionRepository(session=session)
+
+    sessions, total_count = await repo.get_by_assistant(
+        assistant_id=uuid4(),
+        user_id=uuid4(),
+        limit=10,
+        cursor=CURSOR,
+        with_total_count=False,
+    )
+
+    assert (sessions, total_count) == ([], None)
+    session.scalar.assert_not_called()
+
+    # The cursor is applied to the sessions, not to all of them counted
+    sql = _sql(session.execute.call_args.args[0])
+    assert "OVER" not in sql
+    assert "sessions.created_at <= %(created_at_1)s" in sql
+
+
+async def test_first_page_is_counted():
+    session = AsyncMock(
+        execute=AsyncMock(return_value=[]), scalar=AsyncMock(return_value=3)
+    )
+    repo = SessionRepository(session=session)
+
+    _, total_count = await repo.get_by_assistant(assistant_id=uuid4(), limit=10)
+
+    assert total_count == 3
+    assert "count(*)" in _sql(session.scalar.call_args.args[0])
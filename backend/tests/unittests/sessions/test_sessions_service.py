@@ -1,4 +1,4 @@
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
@@ -78,6 +78,42 @@ async def test_succeeds_with_assistant_id(service: SessionService):
     assert session_in_db == session
 
 
+async def test_conversation_window_is_checked_like_the_session(
+    service: SessionService,
+):
+    service.session_repo.get_conversation_window.return_value = SessionInDB(
+        user_id=uuid4(),
+        name="test_session",
+        id=TEST_UUID,
+    )
+
+    with pytest.raises(UnauthorizedException, match="belongs to other user"):
+        await service.get_conversation_window(TEST_UUID)
+
+
+async def test_conversation_window_is_limited(service: SessionService):
+    session = SessionInDB(
+        user_id=TEST_USER.id,
+        name="test_session",
+        assistant=TEST_ASSISTANT,
+        id=TEST_UUID,
+    )
+    service.session_repo.get_conversation_window.return_value = session
+
+    with patch(
+        "intric.sessions.session_service.get_settings",
+        return_value=MagicMock(conversation_window_size=10),
+    ):
+        session_in_db = await service.get_conversation_window(
+            TEST_UUID, assistant_id=TEST_ASSISTANT.id
+        )
+
+    assert session_in_db == session
+    service.session_repo.get_conversation_window.assert_awaited_once_with(
+        id=TEST_UUID, num_questions=10
+    )
+
+
 async def test_update_error_when_session_does_not_exist(service: SessionService):
     service.session_repo.update.return_value = None
     session_upsert = SessionUpdate(name="new_test_name", id=TEST_UUID)
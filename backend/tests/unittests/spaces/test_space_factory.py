@@ -50,3 +50,22 @@ def test_create_space_with_assistants_and_default_assistant(factory: SpaceFactor
     # Assert
     assert space.assistants == [normal_assistant]
     assert space.default_assistant == default_assistant
+
+
+def test_create_sparse_space_from_db(factory: SpaceFactory):
+    user = MagicMock(deleted_at=None)
+    user.to_dict.return_value = dict(
+        id=TEST_UUID, username="test", email="test@test.com"
+    )
+    member_in_db = MagicMock(user_id=TEST_UUID, user=user, role="viewer")
+    space_in_db = MagicMock(user_id=None)
+
+    space = factory.create_sparse_space_from_db(
+        space_in_db=space_in_db, user=MagicMock(), members_in_db=[member_in_db]
+    )
+
+    assert list(space.members) == [TEST_UUID]
+    assert space.members[TEST_UUID].role == "viewer"
+    assert space.assistants == []
+    assert space.groups == []
+    assert space.websites == []
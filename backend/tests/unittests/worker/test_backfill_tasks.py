@@ -0,0 +1,41 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from intric.worker import backfill_tasks
+
+
+@asynccontextmanager
+async def _begin():
+    yield
+
+
+async def test_backfill_pages_through_the_info_blobs():
+    info_blob_ids = sorted((uuid4() for _ in range(5)), key=str)
+    pages = [info_blob_ids[:2], info_blob_ids[2:4], info_blob_ids[4:], []]
+
+    container = MagicMock()
+    container.session.return_value.begin = _begin
+    info_blob_chunk_repo = AsyncMock()
+    info_blob_chunk_repo.get_info_blob_ids_missing_token_counts.side_effect = pages
+    info_blob_chunk_repo.get_texts_by_info_blob.return_value = [(uuid4(), "text")]
+    container.info_blob_chunk_repo.return_value = info_blob_chunk_repo
+    container.info_blob_repo.return_value = AsyncMock(
+        get=AsyncMock(return_value=MagicMock(text="text"))
+    )
+
+    with patch.object(backfill_tasks, "BACKFILL_PAGE_SIZE", 2):
+        await backfill_tasks.backfill_chunk_token_counts(container=container)
+
+    assert [
+        call.kwargs
+        for call in (
+            info_blob_chunk_repo.get_info_blob_ids_missing_token_counts.call_args_list
+        )
+    ] == [
+        dict(limit=2, after_id=None),
+        dict(limit=2, after_id=info_blob_ids[1]),
+        dict(limit=2, after_id=info_blob_ids[3]),
+        dict(limit=2, after_id=info_blob_ids[4]),
+    ]
+    assert info_blob_chunk_repo.update_token_counts_and_offsets.await_count == 5
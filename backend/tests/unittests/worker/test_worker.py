@@ -0,0 +1,24 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from intric.worker import worker as worker_module
+from intric.worker.worker import Worker
+
+
+async def test_worker_starts_and_stops_the_model_clients():
+    with patch.multiple(
+        worker_module,
+        aiohttp_client=AsyncMock(start=MagicMock()),
+        model_clients=AsyncMock(start=MagicMock()),
+        sessionmanager=AsyncMock(init=MagicMock()),
+        job_manager=AsyncMock(),
+        text_extraction_service=MagicMock(),
+        lifespan=AsyncMock(),
+        crochet=MagicMock(),
+    ):
+        worker = Worker()
+        await worker.startup({})
+        worker_module.model_clients.start.assert_called_once()
+
+        await worker.shutdown({})
+        worker_module.model_clients.stop.assert_awaited_once()
+        worker_module.text_extraction_service.shutdown.assert_called_once()